@@ -1,24 +1,79 @@
-from typing import List, Dict, Optional
-import openai
+from typing import List, Dict, Iterator, Optional, Tuple
+from .context import ContextBuilder, get_context_builder
 from .prompts import SYSTEM_PROMPT
-from .functions import functions, function_map
-import json
-import os
-from dotenv import load_dotenv
+from .functions import get_plan_version, tool_registry
+from .llm import ChatChunk, ChatMessage, LLMClient, LLMError, collect_tool_calls, create_llm_client
+from .response_cache import ResponseCache, get_response_cache
+from .tools import ToolRegistry, ToolResult
+import re
+import threading
 import traceback
 
-# Load environment variables
-load_dotenv()
+# Model turns that may call tools before the model has to answer with what it has
+MAX_TOOL_ROUNDS = 3
 
-# Configure OpenAI with API key
-openai.api_key = os.getenv("OPENAI_API_KEY")
-
-print(f"OpenAI API Key Loaded: {openai.api_key}")
+class RecipeAgent:
+    def __init__(
+        self,
+        client: Optional[LLMClient] = None,
+        response_cache: Optional[ResponseCache] = None,
+        tools: Optional[ToolRegistry] = None,
+        context: Optional[ContextBuilder] = None
+    ):
+        """
+        Args:
+            client (Optional[LLMClient]): Model backend; defaults to the one selected by LLM_BACKEND,
+                created on first use so the app starts without an API key.
+            response_cache (Optional[ResponseCache]): Cache of answers; defaults to the shared cache.
+            tools (Optional[ToolRegistry]): Tools offered to the model; defaults to RecipeAgent.functions.
+            context (Optional[ContextBuilder]): Fits the conversation into the prompt token budget.
+        """
+        self._client = client
+        self._client_lock = threading.Lock()
+        self.response_cache = response_cache or get_response_cache()
+        self.tools = tools or tool_registry
+        self.context = context or get_context_builder()
+
+    @property
+    def client(self) -> LLMClient:
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = create_llm_client()
+        return self._client
+
+    def _build_messages(self, message: str, conversation_history: Optional[List[Dict]]) -> List[Dict]:
+        """Prepend the system prompt to the conversation, compacted to the token budget, and append the new user message."""
+        return self.context.build(SYSTEM_PROMPT, conversation_history, message)
+
+    @staticmethod
+    def _build_response(reply: Optional[str], results: List[ToolResult]) -> Dict:
+        """
+        Assemble the agent's response from the final reply and the tool results it used.
 
-if not openai.api_key:
-    raise ValueError("No OpenAI API key found. Please set OPENAI_API_KEY environment variable.")
+        `data` holds the result of the only tool used if that is a dictionary (such
+        as the meal plan), otherwise a dictionary of results by tool name; `tools`
+        lists every call.
+        """
+        succeeded = [result for result in results if result.ok]
+        names = list(dict.fromkeys(result.call.name for result in results))
+        if len(succeeded) == 1 and isinstance(succeeded[0].data, dict):
+            data = succeeded[0].data
+        elif succeeded:
+            data = {result.call.name: result.data for result in succeeded}
+        else:
+            data = None
+        return {
+            "reply": reply,
+            "reasoning": f"Used {', '.join(names)} to process your request" if names else None,
+            "data": data,
+            "tools": [
+                {"name": result.call.name, "data": result.data} if result.ok
+                else {"name": result.call.name, "error": result.error}
+                for result in results
+            ]
+        }
 
-class RecipeAgent:
     def process_message(
         self,
         message: str,
@@ -26,89 +81,146 @@ class RecipeAgent:
     ) -> Dict:
         """
         Process a user message and return a response without any database logic.
-        """
-        if conversation_history is None:
-            conversation_history = []
-
-        messages = [
-            {"role": "system", "content": SYSTEM_PROMPT}
-        ]
-
-        # Add conversation history
-        messages.extend(conversation_history)
-
-        # Add the current message
-        messages.append({"role": "user", "content": message})
 
+        The model may call several tools per turn; they run concurrently. Answers
+        are cached per message and conversation state for as long as the meal
+        plan they were answered from stays current.
+        """
+        plan_version = get_plan_version()
+        if plan_version is not None:
+            cached = self.response_cache.get(message, conversation_history, plan_version)
+            if cached is not None:
+                return cached
+
+        response, cacheable = self._respond(self._build_messages(message, conversation_history))
+        if cacheable and plan_version is not None:
+            self.response_cache.put(message, conversation_history, plan_version, response)
+        return response
+
+    def _respond(self, messages: List[Dict]) -> Tuple[Dict, bool]:
+        """Ask the model, running the tools it calls; also tell whether the response may be cached."""
+        results: List[ToolResult] = []
         try:
-            completion = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=messages,
-                functions=functions,
-                function_call="auto"
-            )
-
-            response_message = completion.choices[0].message
-
-            if response_message.get("function_call"):
-                # Execute the function
-                function_name = response_message["function_call"]["name"]
-                function_args = json.loads(response_message["function_call"]["arguments"])
-
-                # Get the appropriate function from the function map
-                function_to_call = function_map[function_name]
-
-                try:
-                    # Execute the function
-                    results = function_to_call(**function_args)
-                    results_str = json.dumps(results, indent=2)
-                except Exception as e:
-                    print(f"Error executing function {function_name}: {e}")
-                    traceback.print_exc()
-                    return {
-                        "reply": f"I apologize, but I encountered an error executing {function_name}: {str(e)}",
-                        "reasoning": None,
-                        "data": None
-                    }
-
-                # Get final response from GPT
-                messages.append(response_message)
-                messages.append({
-                    "role": "function",
-                    "name": function_name,
-                    "content": results_str
-                })
-
-                final_response = openai.ChatCompletion.create(
-                    model="gpt-4",  # Use "gpt-3.5-turbo" or "gpt-4" if you have access
-                    messages=messages
-                )
-
-                final_message = final_response.choices[0].message
-
-                return {
-                    "reply": final_message.content,
-                    "reasoning": f"Used {function_name} to process your request",
-                    "data": results  # Return the function results directly
-                }
-
-            return {
-                "reply": response_message.content,
-                "reasoning": None,
-                "data": None
-            }
-
-        except openai.error.OpenAIError as e:
-            print(f"OpenAI API error: {e}")
-            print(f"Status code: {getattr(e, 'http_status', 'N/A')}")
-            print(f"Error details: {getattr(e, 'error', 'N/A')}")
+            for _ in range(MAX_TOOL_ROUNDS):
+                response_message = self.client.complete(messages, self.tools.specs())
+                if not response_message.tool_calls:
+                    break
+
+                # Execute every requested tool at once and hand the results back to the model
+                round_results = self.tools.run(response_message.tool_calls)
+                results.extend(round_results)
+                messages.append(response_message.to_dict())
+                messages.extend(result.to_message() for result in round_results)
+            else:
+                # Out of tool rounds: answer from the results so far
+                response_message = self.client.complete(messages)
+
+            response = self._build_response(response_message.content, results)
+            return response, all(result.ok for result in results)
+
+        except LLMError as e:
+            print(f"LLM API error: {e}")
             traceback.print_exc()
             return {
                 "reply": f"I apologize, but I encountered an error: {str(e)}",
                 "reasoning": None,
-                "data": None
+                "data": None,
+                "tools": []
+            }, False
+
+    def stream_message(
+        self,
+        message: str,
+        conversation_history: List[Dict] = None
+    ) -> Iterator[Dict]:
+        """
+        Process a user message and yield the response as it is generated.
+
+        Tokens are yielded as soon as the model produces them. When the model
+        calls tools, a `function_call` event is yielded per call and a
+        `function_result` event per result before the follow-up completion
+        starts streaming. Cached answers (see `process_message`) are replayed
+        as the same events.
+
+        Yields:
+            Dict: Events with a `type` of "token" (`content`), "function_call" (`name`),
+            "function_result" (`name` and `data` or `error`), "error" (`message`) or,
+            last, "done" (`reply`, `reasoning`).
+        """
+        plan_version = get_plan_version()
+        if plan_version is not None:
+            cached = self.response_cache.get(message, conversation_history, plan_version)
+            if cached is not None:
+                yield from self._replay_events(cached)
+                return
+
+        for event in self._stream_events(self._build_messages(message, conversation_history)):
+            if event["type"] == "done":
+                response = event.pop("response")
+                if event.pop("cacheable") and plan_version is not None:
+                    self.response_cache.put(message, conversation_history, plan_version, response)
+            yield event
+
+    @staticmethod
+    def _replay_events(response: Dict) -> Iterator[Dict]:
+        """Turn a cached response back into the events `stream_message` emits."""
+        for tool in response["tools"]:
+            yield {"type": "function_call", "name": tool["name"]}
+        for tool in response["tools"]:
+            yield dict(tool, type="function_result")
+        for token in re.findall(r"\S+\s*|\s+", response["reply"] or ""):
+            yield {"type": "token", "content": token}
+        yield {"type": "done", "reply": response["reply"], "reasoning": response["reasoning"]}
+
+    def _stream_events(self, messages: List[Dict]) -> Iterator[Dict]:
+        """Stream the model's answer; the "done" event also carries the full `response` and whether it is `cacheable`."""
+        results: List[ToolResult] = []
+        try:
+            for round_number in range(MAX_TOOL_ROUNDS + 1):
+                # Out of tool rounds: answer from the results so far
+                tools = self.tools.specs() if round_number < MAX_TOOL_ROUNDS else None
+
+                reply = []
+                chunks: List[ChatChunk] = []
+                for chunk in self.client.stream(messages, tools):
+                    if chunk.tool_index is not None:
+                        # Tool calls arrive in pieces
+                        chunks.append(chunk)
+                    elif chunk.content:
+                        reply.append(chunk.content)
+                        yield {"type": "token", "content": chunk.content}
+
+                tool_calls = collect_tool_calls(chunks)
+                if not tool_calls:
+                    break
+
+                for call in tool_calls:
+                    yield {"type": "function_call", "name": call.name}
+                round_results = self.tools.run(tool_calls)
+                for result in round_results:
+                    if result.ok:
+                        yield {"type": "function_result", "name": result.call.name, "data": result.data}
+                    else:
+                        yield {"type": "function_result", "name": result.call.name, "error": result.error}
+                results.extend(round_results)
+
+                messages.append(ChatMessage(content="".join(reply) or None, tool_calls=tool_calls).to_dict())
+                messages.extend(result.to_message() for result in round_results)
+
+            response = self._build_response("".join(reply), results)
+            yield {
+                "type": "done",
+                "reply": response["reply"],
+                "reasoning": response["reasoning"],
+                "response": response,
+                "cacheable": all(result.ok for result in results)
             }
 
+        except LLMError as e:
+            print(f"LLM API error: {e}")
+            traceback.print_exc()
+            yield {"type": "error", "message": f"I apologize, but I encountered an error: {str(e)}"}
+
 # Global instance
 recipe_agent = RecipeAgent()
 
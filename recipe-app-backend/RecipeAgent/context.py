@@ -0,0 +1,188 @@
+import hashlib
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+from config import AGENT_CONTEXT_TOKENS, AGENT_SUMMARY_TOKENS, LLM_MODEL
+
+# Tokens the chat format adds around every message
+MESSAGE_OVERHEAD = 4
+
+# Content shorter than this is never worth deduplicating
+MIN_DEDUPE_LENGTH = 200
+
+_PIECE = re.compile(r"\w+|[^\w\s]")
+
+
+def _estimate_tokens(text: str) -> int:
+    """Approximate BPE token count: one per punctuation mark, about one per four word characters."""
+    return sum((len(piece) + 3) // 4 for piece in _PIECE.findall(text))
+
+
+def _load_tokenizer(model: str) -> Callable[[str], int]:
+    try:
+        import tiktoken
+    except ImportError:
+        return _estimate_tokens
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except KeyError:
+        encoding = tiktoken.get_encoding("cl100k_base")
+    return lambda text: len(encoding.encode(text))
+
+
+# Uses the model's tokenizer when tiktoken is installed, otherwise a local estimate
+count_text_tokens = _load_tokenizer(LLM_MODEL)
+
+
+def count_tokens(message: Dict[str, Any]) -> int:
+    """Tokens a chat message takes up in the prompt, including its tool calls."""
+    tokens = MESSAGE_OVERHEAD + count_text_tokens(message.get("content") or "")
+    for call in message.get("tool_calls") or []:
+        tokens += count_text_tokens(call["function"]["name"]) + count_text_tokens(call["function"]["arguments"])
+    return tokens
+
+
+def _canonical_json(content: str) -> Optional[str]:
+    """Key-sorted, whitespace-free form of JSON content, or None if the content is not JSON."""
+    if not content.lstrip().startswith(("{", "[")):
+        return None
+    try:
+        return json.dumps(json.loads(content), sort_keys=True, separators=(",", ":"))
+    except ValueError:
+        return None
+
+
+def dedupe_results(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Replace repeated JSON blobs, such as the same meal plan returned by several
+    function calls, with a short reference; only the latest copy is kept in full.
+
+    Args:
+        messages (List[Dict[str, Any]]): Conversation messages, oldest first.
+
+    Returns:
+        List[Dict[str, Any]]: The messages, with earlier duplicates shortened.
+    """
+    seen = set()
+    deduped = []
+    for message in reversed(messages):
+        content = message.get("content") or ""
+        canonical = _canonical_json(content) if len(content) >= MIN_DEDUPE_LENGTH else None
+        if canonical is not None:
+            digest = hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+            if digest in seen:
+                message = dict(message, content="[Same data as returned again later in this conversation]")
+            seen.add(digest)
+        deduped.append(message)
+    deduped.reverse()
+    return deduped
+
+
+def _group_turns(messages: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Group messages so an assistant tool call always stays together with its results."""
+    groups: List[List[Dict[str, Any]]] = []
+    for message in messages:
+        if message.get("role") == "tool" and groups:
+            groups[-1].append(message)
+        else:
+            groups.append([message])
+    return groups
+
+
+def summarize(messages: List[Dict[str, Any]], max_tokens: int) -> Optional[str]:
+    """
+    Extractive summary of dropped messages: the first sentence of each user and
+    assistant message, most recent kept when the summary runs over budget.
+
+    Args:
+        messages (List[Dict[str, Any]]): The dropped messages, oldest first.
+        max_tokens (int): Token budget of the summary.
+
+    Returns:
+        Optional[str]: The summary, or None if nothing fits.
+    """
+    lines = []
+    tokens = count_text_tokens("Summary of the earlier conversation:")
+    for message in reversed(messages):
+        if message.get("role") not in ("user", "assistant") or not message.get("content"):
+            continue
+        if _canonical_json(message["content"]) is not None:
+            continue
+        sentence = re.split(r"(?<=[.!?])\s", message["content"].strip(), maxsplit=1)[0][:200]
+        line = f"- {message['role']}: {sentence}"
+        line_tokens = count_text_tokens(line)
+        if tokens + line_tokens > max_tokens:
+            break
+        lines.append(line)
+        tokens += line_tokens
+    if not lines:
+        return None
+    return "\n".join(["Summary of the earlier conversation:"] + lines[::-1])
+
+
+class ContextBuilder:
+    """
+    Builds the model prompt from the system prompt, conversation history and
+    new message within a token budget.
+
+    The system prompt and the new message are always sent. Repeated JSON
+    results are deduplicated first; then the most recent turns are kept while
+    they fit, and the older ones are replaced by a short summary.
+    """
+
+    def __init__(self, max_tokens: int = AGENT_CONTEXT_TOKENS, summary_tokens: int = AGENT_SUMMARY_TOKENS):
+        self.max_tokens = max_tokens
+        self.summary_tokens = summary_tokens
+
+    def build(
+        self,
+        system_prompt: str,
+        conversation_history: Optional[List[Dict[str, Any]]],
+        message: str,
+    ) -> List[Dict[str, Any]]:
+        """
+        Args:
+            system_prompt (str): Instructions sent first in every prompt.
+            conversation_history (Optional[List[Dict[str, Any]]]): Earlier messages, oldest first.
+            message (str): The new user message.
+
+        Returns:
+            List[Dict[str, Any]]: Messages to send to the model.
+        """
+        system = {"role": "system", "content": system_prompt}
+        current = {"role": "user", "content": message}
+
+        # The system prompt is added here; clients echoing it back would send it twice
+        history = [m for m in conversation_history or [] if m.get("role") != "system"]
+        history = dedupe_results(history)
+
+        budget = self.max_tokens - count_tokens(system) - count_tokens(current)
+        total = sum(count_tokens(m) for m in history)
+        if total <= budget:
+            return [system] + history + [current]
+
+        budget -= self.summary_tokens + MESSAGE_OVERHEAD
+        kept: List[Dict[str, Any]] = []
+        groups = _group_turns(history)
+        while groups:
+            group_tokens = sum(count_tokens(m) for m in groups[-1])
+            if group_tokens > budget:
+                break
+            budget -= group_tokens
+            kept[:0] = groups.pop()
+
+        dropped = [m for group in groups for m in group]
+        summary = summarize(dropped, self.summary_tokens)
+        prefix = [system]
+        if summary:
+            prefix.append({"role": "system", "content": summary})
+        return prefix + kept + [current]
+
+
+# Global instance
+context_builder = ContextBuilder()
+
+def get_context_builder() -> ContextBuilder:
+    """Getter function for the shared prompt context builder"""
+    return context_builder
@@ -1,34 +1,160 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Hashable, Optional
 # functions.py
-from routes.meal_plan import create_meal_plan
-
-# Define the OpenAI function specifications
-functions = [
-    {
-        "name": "get_meal_plan",
-        "description": "Retrieve the current weekly meal plan for the user.",
-        "parameters": {
-            "type": "object",
-            "properties": {}
-        }
-    }
-]
+import math
+import numpy as np
+from routes.ingredients import compute_grocery_list, load_available_ingredients
+from routes.meal_plan import generate_meal_plan, get_meal_plan_version
+from routes.nutrition import resolve_meals
+from routes.recipes import get_recipe_snapshot, rank_recipes
+from services.nutrition_matrix import NutritionMatrix
+from .tools import ToolRegistry
+
+# Tools the agent offers the model
+tool_registry = ToolRegistry()
+
+RECIPE_NAMES_SCHEMA = {
+    "type": "array",
+    "items": {"type": "string"},
+    "description": "Recipe names; list a recipe once per portion.",
+}
 
 
 # Function implementation
+@tool_registry.register(
+    description="Retrieve the current weekly meal plan for the user.",
+    timeout=30,
+)
 def get_meal_plan() -> Dict[str, Dict[str, Any]]:
     """
-    Retrieves the current weekly meal plan for the user by calling the create_meal_plan function.
+    Retrieves the current weekly meal plan for the user by calling the generate_meal_plan function.
 
     Returns:
         Dict[str, Dict[str, Any]]: The meal plan organized by days and meals.
     """
-    meal_plan_response = create_meal_plan()
+    meal_plan_response = generate_meal_plan()
     meal_plan = meal_plan_response.get("meal_plan", {})
     return meal_plan
 
 
-# Map function names to actual functions
-function_map = {
-    "get_meal_plan": get_meal_plan
-}
\ No newline at end of file
+def get_meal_plan_recipes() -> List[str]:
+    """Recipe names of the current meal plan, one entry per portion."""
+    return [
+        serving["name"]
+        for meals in get_meal_plan().values()
+        for serving in meals.values()
+        for _ in range(serving.get("portions", 1))
+    ]
+
+
+@tool_registry.register(
+    description="Get the calories, protein, carbs and fat of recipes, per recipe and in total.",
+    parameters={
+        "type": "object",
+        "properties": {"recipe_names": RECIPE_NAMES_SCHEMA},
+        "required": ["recipe_names"],
+    },
+    timeout=5,
+)
+def get_nutrition(recipe_names: List[str]) -> Dict[str, Any]:
+    """
+    Look up the nutrition of recipes.
+
+    Args:
+        recipe_names (List[str]): Recipe names, listed once per portion; close
+            misspellings resolve to the recipe they name.
+
+    Returns:
+        Dict[str, Any]: Nutrition per known recipe, the `total`, the `unknown` names
+        and `suggestions` of recipe names for them.
+    """
+    snapshot = get_recipe_snapshot()
+    nutrition = snapshot.nutrition
+    # Names the model extracted from chat are often slightly off; only close misspellings are resolved
+    rows, _, suggestions = resolve_meals(recipe_names, snapshot)
+    known = rows >= 0
+    return {
+        "recipes": {
+            nutrition.names[row]: NutritionMatrix.as_dict(nutrition.values[row])
+            for row in np.unique(rows[known])
+        },
+        "total": NutritionMatrix.as_dict(nutrition.totals(rows[known])),
+        "unknown": [name for name, ok in zip(recipe_names, known) if not ok],
+        "suggestions": suggestions,
+    }
+
+
+@tool_registry.register(
+    description="List the ingredients (in grams) the pantry is missing for the given recipes, "
+                "or for the current meal plan if no recipes are given.",
+    parameters={
+        "type": "object",
+        "properties": {"recipe_names": RECIPE_NAMES_SCHEMA},
+    },
+    timeout=30,
+)
+def get_grocery_list(recipe_names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Compute the grocery list without touching the grocery list files.
+
+    Args:
+        recipe_names (Optional[List[str]]): Recipes to shop for; defaults to the current meal plan.
+
+    Returns:
+        List[Dict[str, Any]]: Missing ingredients, see routes.ingredients.compute_grocery_list.
+    """
+    return compute_grocery_list(recipe_names or get_meal_plan_recipes())
+
+
+@tool_registry.register(
+    description="Find recipes that can be cooked with the given ingredients, best covered first.",
+    parameters={
+        "type": "object",
+        "properties": {
+            "ingredients": {"type": "array", "items": {"type": "string"}},
+            "diet": {"type": "string", "description": "Only return recipes of this diet."},
+            "limit": {"type": "integer", "description": "Maximum number of recipes.", "default": 5},
+        },
+        "required": ["ingredients"],
+    },
+    timeout=5,
+)
+def search_recipes(ingredients: List[str], diet: Optional[str] = None, limit: int = 5) -> List[Dict[str, Any]]:
+    """
+    Rank recipes by the share of their ingredients (by weight) among the given ones.
+
+    Args:
+        ingredients (List[str]): Ingredient names (case-insensitive), treated as plentiful.
+        diet (Optional[str]): Only return recipes of this diet.
+        limit (int): Maximum number of recipes.
+
+    Returns:
+        List[Dict[str, Any]]: Recipes with their `name`, `diet`, `coverage` and `missing` ingredients.
+    """
+    return rank_recipes({name.lower(): math.inf for name in ingredients}, limit=limit, diet=diet)
+
+
+@tool_registry.register(
+    description="List the ingredients currently in the user's pantry with their quantities and units.",
+    timeout=5,
+)
+def get_pantry() -> List[Dict[str, str]]:
+    """
+    Read the user's available ingredients.
+
+    Returns:
+        List[Dict[str, str]]: Ingredients with `name`, `quantity` and `unit`.
+    """
+    return load_available_ingredients()
+
+
+def get_plan_version() -> Optional[Hashable]:
+    """
+    Version of the data the functions answer from; agent responses are cached per version.
+
+    Returns:
+        Optional[Hashable]: The current meal plan version, or None if it cannot be determined.
+    """
+    try:
+        return get_meal_plan_version()
+    except Exception:
+        return None
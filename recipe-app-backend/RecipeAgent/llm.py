@@ -0,0 +1,303 @@
+import json
+import os
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+from config import LLM_BACKEND, LLM_FIXTURES, LLM_MODEL, LLM_RECORD_PATH
+
+
+class LLMError(Exception):
+    """Raised when the language model backend fails to produce a completion."""
+
+
+@dataclass
+class ToolCall:
+    id: str
+    name: str
+    arguments: str  # JSON-encoded keyword arguments
+
+
+@dataclass
+class ChatMessage:
+    """A completed assistant message: text content and/or tool calls."""
+    content: Optional[str] = None
+    tool_calls: List[ToolCall] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Encode the message for the next request's `messages` list."""
+        message = {"role": "assistant", "content": self.content}
+        if self.tool_calls:
+            message["tool_calls"] = [
+                {"id": call.id, "type": "function", "function": {"name": call.name, "arguments": call.arguments}}
+                for call in self.tool_calls
+            ]
+        return message
+
+
+@dataclass
+class ChatChunk:
+    """
+    One streamed piece of an assistant message.
+
+    Tool calls arrive in pieces too; `tool_index` tells which call of the
+    message a piece of name or arguments belongs to.
+    """
+    content: Optional[str] = None
+    tool_index: Optional[int] = None
+    tool_call_id: Optional[str] = None
+    function_name: Optional[str] = None
+    function_arguments: Optional[str] = None
+
+
+def collect_tool_calls(chunks: List[ChatChunk]) -> List[ToolCall]:
+    """Assemble the streamed pieces of tool calls into complete calls, in call order."""
+    calls: Dict[int, List[str]] = {}
+    for chunk in chunks:
+        if chunk.tool_index is None:
+            continue
+        call = calls.setdefault(chunk.tool_index, ["", "", ""])
+        call[0] += chunk.tool_call_id or ""
+        call[1] += chunk.function_name or ""
+        call[2] += chunk.function_arguments or ""
+    return [ToolCall(id=call_id, name=name, arguments=arguments) for _, (call_id, name, arguments) in sorted(calls.items())]
+
+
+class LLMClient(ABC):
+    """Chat completion backend used by RecipeAgent."""
+
+    @abstractmethod
+    def complete(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict]] = None) -> ChatMessage:
+        """
+        Generate the next assistant message.
+
+        Args:
+            messages (List[Dict[str, Any]]): The conversation so far.
+            tools (Optional[List[Dict]]): Tool specifications the model may call, see ToolRegistry.specs.
+
+        Returns:
+            ChatMessage: The assistant's reply or tool calls.
+
+        Raises:
+            LLMError: If the backend fails.
+        """
+
+    @abstractmethod
+    def stream(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict]] = None) -> Iterator[ChatChunk]:
+        """Like `complete`, but yield the message in pieces as they are generated."""
+
+
+class OpenAIClient(LLMClient):
+    """Backend for the OpenAI chat completions API."""
+
+    def __init__(self, model: str = LLM_MODEL, api_key: Optional[str] = None):
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise LLMError("No OpenAI API key found. Please set OPENAI_API_KEY environment variable.")
+
+        import openai
+
+        self._openai = openai
+        self._client = openai.OpenAI(api_key=api_key)
+        self.model = model
+
+    def _create(self, messages, tools, stream):
+        kwargs = {"model": self.model, "messages": messages, "stream": stream}
+        if tools:
+            kwargs.update(tools=tools, tool_choice="auto")
+        try:
+            return self._client.chat.completions.create(**kwargs)
+        except self._openai.OpenAIError as e:
+            raise LLMError(str(e)) from e
+
+    def complete(self, messages, tools=None):
+        message = self._create(messages, tools, stream=False).choices[0].message
+        tool_calls = [
+            ToolCall(id=call.id, name=call.function.name, arguments=call.function.arguments)
+            for call in message.tool_calls or []
+        ]
+        return ChatMessage(content=message.content, tool_calls=tool_calls)
+
+    def stream(self, messages, tools=None):
+        try:
+            for chunk in self._create(messages, tools, stream=True):
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                for call in delta.tool_calls or []:
+                    yield ChatChunk(
+                        tool_index=call.index,
+                        tool_call_id=call.id,
+                        function_name=call.function.name if call.function else None,
+                        function_arguments=call.function.arguments if call.function else None,
+                    )
+                if delta.content:
+                    yield ChatChunk(content=delta.content)
+        except self._openai.OpenAIError as e:
+            raise LLMError(str(e)) from e
+
+
+class ReplayClient(LLMClient):
+    """
+    Deterministic offline backend driven by recorded fixtures.
+
+    The fixture file holds a list of rules, each with a `when` clause matched
+    against the last message and the `response` to give:
+
+        {"when": {"role": "user", "contains": "meal"},
+         "response": {"tool_calls": [{"name": "get_meal_plan", "arguments": "{}"}]}}
+        {"when": {"role": "tool", "name": "get_meal_plan"},
+         "response": {"content": "Here is your plan."}}
+
+    `contains` is matched case-insensitively and `when` may be omitted for a
+    catch-all rule; the first matching rule wins. A tool rule matches when any
+    of the tool results that end the conversation came from the named tool.
+    `latency` (seconds before the first token) and `token_delay` (seconds
+    between streamed tokens) simulate model timing for load tests.
+    """
+
+    def __init__(self, rules: List[Dict[str, Any]], latency: float = 0.0, token_delay: float = 0.0):
+        self.rules = rules
+        self.latency = latency
+        self.token_delay = token_delay
+
+    @classmethod
+    def from_file(cls, path: str = LLM_FIXTURES, **kwargs) -> "ReplayClient":
+        """Load replay rules from a JSON fixture file."""
+        with open(path, "r", encoding="utf-8") as f:
+            fixtures = json.load(f)
+        kwargs.setdefault("latency", fixtures.get("latency", 0.0))
+        kwargs.setdefault("token_delay", fixtures.get("token_delay", 0.0))
+        return cls(fixtures["rules"], **kwargs)
+
+    @staticmethod
+    def _trailing_tool_names(messages: List[Dict[str, Any]]) -> List[str]:
+        """Names of the tools whose results end the conversation."""
+        names = {
+            call["id"]: call["function"]["name"]
+            for message in messages if message.get("role") == "assistant"
+            for call in message.get("tool_calls") or []
+        }
+        trailing = []
+        for message in reversed(messages):
+            if message.get("role") != "tool":
+                break
+            trailing.append(names.get(message.get("tool_call_id"), message.get("name")))
+        return trailing
+
+    @staticmethod
+    def _matches(when: Dict[str, Any], message: Dict[str, Any], tool_names: List[str]) -> bool:
+        if "role" in when and message.get("role") != when["role"]:
+            return False
+        if "name" in when and when["name"] not in tool_names:
+            return False
+        if "contains" in when and when["contains"].lower() not in (message.get("content") or "").lower():
+            return False
+        return True
+
+    def _respond(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict]]) -> ChatMessage:
+        last = messages[-1] if messages else {}
+        tool_names = self._trailing_tool_names(messages)
+        available = {tool["function"]["name"] for tool in tools or []}
+        for rule in self.rules:
+            if not self._matches(rule.get("when", {}), last, tool_names):
+                continue
+            response = rule["response"]
+            calls = response.get("tool_calls")
+            if calls is None and response.get("function_call") is not None:
+                calls = [response["function_call"]]  # Fixtures recorded before tool calls
+            if calls:
+                if not {call["name"] for call in calls} <= available:
+                    continue  # The tools cannot be called in this request
+                return ChatMessage(tool_calls=[
+                    ToolCall(id=f"call_{len(messages)}_{i}", name=call["name"], arguments=call.get("arguments", "{}"))
+                    for i, call in enumerate(calls)
+                ])
+            return ChatMessage(content=response.get("content", ""))
+        raise LLMError(f"No replay fixture matches the {last.get('role', 'empty')} message")
+
+    def complete(self, messages, tools=None):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._respond(messages, tools)
+
+    def stream(self, messages, tools=None):
+        message = self.complete(messages, tools)
+        for index, call in enumerate(message.tool_calls):
+            yield ChatChunk(tool_index=index, tool_call_id=call.id, function_name=call.name, function_arguments=call.arguments)
+        # Split after whitespace so the tokens join back into the exact reply
+        for token in re.findall(r"\S+\s*|\s+", message.content or ""):
+            if self.token_delay:
+                time.sleep(self.token_delay)
+            yield ChatChunk(content=token)
+
+
+class RecordingClient(LLMClient):
+    """
+    Wraps a live backend and appends every exchange to a fixture file as a replay rule.
+
+    Recorded rules match on the exact text of the last message; edit them into
+    broader `contains` rules before committing them as fixtures.
+    """
+
+    def __init__(self, inner: LLMClient, path: str):
+        self.inner = inner
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _record(self, messages: List[Dict[str, Any]], message: ChatMessage) -> None:
+        last = messages[-1]
+        when = {"role": last["role"]}
+        if last["role"] == "tool":
+            when["name"] = ReplayClient._trailing_tool_names(messages)[0]
+        else:
+            when["contains"] = last.get("content") or ""
+        response = {"content": message.content} if message.content else {}
+        if message.tool_calls:
+            response["tool_calls"] = [{"name": call.name, "arguments": call.arguments} for call in message.tool_calls]
+        with self._lock:
+            fixtures = {"rules": []}
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    fixtures = json.load(f)
+            fixtures["rules"].append({"when": when, "response": response})
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(fixtures, f, indent=2)
+
+    def complete(self, messages, tools=None):
+        message = self.inner.complete(messages, tools)
+        self._record(messages, message)
+        return message
+
+    def stream(self, messages, tools=None):
+        chunks = []
+        for chunk in self.inner.stream(messages, tools):
+            chunks.append(chunk)
+            yield chunk
+        content = "".join(chunk.content or "" for chunk in chunks)
+        self._record(messages, ChatMessage(content=content or None, tool_calls=collect_tool_calls(chunks)))
+
+
+def create_llm_client(backend: str = LLM_BACKEND) -> LLMClient:
+    """
+    Create the configured LLM backend.
+
+    Args:
+        backend (str): "openai" for the live API or "replay" for the offline fixture backend.
+
+    Returns:
+        LLMClient: The backend, wrapped in a RecordingClient when LLM_RECORD_PATH is set.
+    """
+    if backend == "replay":
+        client = ReplayClient.from_file()
+    elif backend == "openai":
+        client = OpenAIClient()
+    else:
+        raise LLMError(f"Unknown LLM backend '{backend}'")
+
+    if LLM_RECORD_PATH:
+        client = RecordingClient(client, LLM_RECORD_PATH)
+    return client
@@ -0,0 +1,226 @@
+import copy
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from config import AGENT_CACHE_SEMANTIC, AGENT_CACHE_SIMILARITY, AGENT_CACHE_SIZE, AGENT_CACHE_TTL
+
+# Words that change the answer even when the rest of a message is the same;
+# semantically similar messages only share an answer if these match exactly
+GUARD_WORDS = frozenset({
+    "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday",
+    "today", "tomorrow", "yesterday", "week", "weekend",
+    "breakfast", "lunch", "dinner", "snack",
+    "not", "no", "without", "more", "less",
+})
+
+# Number of earlier conversation messages that make up the conversation-state fingerprint
+HISTORY_WINDOW = 6
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase a message and reduce it to its words, so trivial variations share a key."""
+    message = message.lower().replace("'s ", " is ").replace("’s ", " is ")
+    return " ".join(re.findall(r"[a-z0-9]+", message))
+
+
+def history_fingerprint(conversation_history: Optional[List[Dict]]) -> str:
+    """Digest of the recent conversation, so answers are only reused in the same context."""
+    recent = [
+        (message.get("role"), normalize_message(message.get("content") or ""))
+        for message in (conversation_history or [])[-HISTORY_WINDOW:]
+    ]
+    return hashlib.sha1(json.dumps(recent).encode("utf-8")).hexdigest()
+
+
+def guard_tokens(normalized: str) -> FrozenSet[str]:
+    return frozenset(word for word in normalized.split() if word in GUARD_WORDS or word.isdigit())
+
+
+class HashingEmbedder:
+    """
+    Local text embedding: hashed character n-gram counts, L2-normalized.
+
+    Cheap and dependency-free; it catches rephrasings and typos rather than
+    synonyms, which is what near-identical chat messages need.
+    """
+
+    def __init__(self, dim: int = 1024, ngram: int = 3):
+        self.dim = dim
+        self.ngram = ngram
+
+    def __call__(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        padded = f" {text} "
+        for i in range(max(len(padded) - self.ngram + 1, 1)):
+            digest = hashlib.blake2b(padded[i:i + self.ngram].encode("utf-8"), digest_size=4).digest()
+            vector[int.from_bytes(digest, "little") % self.dim] += 1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+@dataclass
+class _Entry:
+    expires: float
+    plan_version: Hashable
+    response: Dict[str, Any]
+    fingerprint: str
+    guards: FrozenSet[str]
+    slot: int
+
+
+class ResponseCache:
+    """
+    Cache of agent responses keyed on the normalized message and conversation state.
+
+    Every entry records the meal plan version it was answered from and is
+    only returned while the plan still has that version. Entries expire after
+    `ttl` seconds and the least recently used ones are evicted beyond
+    `max_entries`. With `semantic` enabled, a miss falls back to the most
+    similar cached message of the same conversation state, using a local
+    vector index of message embeddings.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl: float = 600.0,
+        semantic: bool = False,
+        similarity: float = 0.85,
+        embedder: Optional[Callable[[str], np.ndarray]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.semantic = semantic
+        self.similarity = similarity
+        self.embedder = embedder or HashingEmbedder()
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._vectors: Optional[np.ndarray] = None
+        self._free_slots: List[int] = list(range(max_entries))
+        self._lock = threading.Lock()
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        entry = self._entries.pop(key)
+        self._free_slots.append(entry.slot)
+
+    def _semantic_lookup(self, normalized: str, fingerprint: str, plan_version: Hashable, now: float) -> Optional[_Entry]:
+        guards = guard_tokens(normalized)
+        candidates = [
+            entry for entry in self._entries.values()
+            if entry.fingerprint == fingerprint and entry.plan_version == plan_version
+            and entry.guards == guards and entry.expires > now
+        ]
+        if not candidates or self._vectors is None:
+            return None
+        scores = self._vectors[[entry.slot for entry in candidates]] @ self.embedder(normalized)
+        best = int(np.argmax(scores))
+        return candidates[best] if scores[best] >= self.similarity else None
+
+    def get(
+        self,
+        message: str,
+        conversation_history: Optional[List[Dict]],
+        plan_version: Hashable,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Look up the cached response to a message.
+
+        Args:
+            message (str): The user's message.
+            conversation_history (Optional[List[Dict]]): Earlier messages of the conversation.
+            plan_version (Hashable): Current meal plan version, see routes.meal_plan.get_meal_plan_version.
+
+        Returns:
+            Optional[Dict[str, Any]]: A copy of the cached response, or None on a miss.
+        """
+        normalized = normalize_message(message)
+        key = (normalized, history_fingerprint(conversation_history))
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry.expires <= now or entry.plan_version != plan_version):
+                self._remove(key)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry.response)
+            if self.semantic:
+                entry = self._semantic_lookup(normalized, key[1], plan_version, now)
+                if entry is not None:
+                    self.semantic_hits += 1
+                    return copy.deepcopy(entry.response)
+            self.misses += 1
+            return None
+
+    def put(
+        self,
+        message: str,
+        conversation_history: Optional[List[Dict]],
+        plan_version: Hashable,
+        response: Dict[str, Any],
+    ) -> None:
+        """Store the response to a message, answered from the given meal plan version."""
+        normalized = normalize_message(message)
+        key = (normalized, history_fingerprint(conversation_history))
+        vector = self.embedder(normalized) if self.semantic else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            while len(self._entries) >= self.max_entries:
+                self._remove(next(iter(self._entries)))
+            slot = self._free_slots.pop()
+            if vector is not None:
+                if self._vectors is None:
+                    self._vectors = np.zeros((self.max_entries, vector.size), dtype=np.float32)
+                self._vectors[slot] = vector
+            self._entries[key] = _Entry(
+                expires=self._clock() + self.ttl,
+                plan_version=plan_version,
+                response=copy.deepcopy(response),
+                fingerprint=key[1],
+                guards=guard_tokens(normalized),
+                slot=slot,
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._free_slots = list(range(self.max_entries))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the hit and miss counters and the current size."""
+        with self._lock:
+            lookups = self.hits + self.semantic_hits + self.misses
+            return {
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.semantic_hits) / lookups if lookups else 0.0,
+                "size": len(self._entries),
+            }
+
+
+# Global instance
+response_cache = ResponseCache(
+    max_entries=AGENT_CACHE_SIZE,
+    ttl=AGENT_CACHE_TTL,
+    semantic=AGENT_CACHE_SEMANTIC,
+    similarity=AGENT_CACHE_SIMILARITY,
+)
+
+def get_response_cache() -> ResponseCache:
+    """Getter function for the shared agent response cache"""
+    return response_cache
@@ -0,0 +1,130 @@
+import asyncio
+import functools
+import json
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from config import TOOL_THREADS, TOOL_TIMEOUT
+from .llm import ToolCall
+
+
+@dataclass(frozen=True)
+class Tool:
+    """A function the model may call, with its JSON schema and time budget."""
+    name: str
+    description: str
+    parameters: Dict[str, Any]
+    func: Callable[..., Any]
+    timeout: float
+
+    def spec(self) -> Dict[str, Any]:
+        """Tool specification in the chat completions `tools` format."""
+        return {
+            "type": "function",
+            "function": {"name": self.name, "description": self.description, "parameters": self.parameters},
+        }
+
+
+@dataclass
+class ToolResult:
+    """Outcome of one tool call: its data, or the error the model is told about."""
+    call: ToolCall
+    data: Any = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_message(self) -> Dict[str, Any]:
+        """Encode the result as the `tool` message answering the call."""
+        content = self.data if self.ok else {"error": self.error}
+        return {"role": "tool", "tool_call_id": self.call.id, "content": json.dumps(content, separators=(",", ":"))}
+
+
+class ToolRegistry:
+    """
+    Registry of the agent's tools and the engine that runs them.
+
+    All tool calls of one model turn run concurrently on a bounded thread
+    pool, each under its own timeout. A call that fails, times out, or names
+    an unknown tool produces an error result instead of failing the turn, so
+    the model can still answer from the other results.
+    """
+
+    def __init__(self, executor: Optional[ThreadPoolExecutor] = None):
+        self._tools: Dict[str, Tool] = {}
+        self._executor = executor or ThreadPoolExecutor(max_workers=TOOL_THREADS, thread_name_prefix="tool")
+
+    def register(
+        self,
+        description: str,
+        parameters: Optional[Dict[str, Any]] = None,
+        name: Optional[str] = None,
+        timeout: float = TOOL_TIMEOUT,
+    ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """
+        Decorator that registers a function as a tool.
+
+        Args:
+            description (str): What the tool does, shown to the model.
+            parameters (Optional[Dict[str, Any]]): JSON schema of the keyword arguments.
+            name (Optional[str]): Tool name; defaults to the function's name.
+            timeout (float): Seconds the tool may run before its call fails.
+        """
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+            tool_name = name or func.__name__
+            self._tools[tool_name] = Tool(
+                name=tool_name,
+                description=description,
+                parameters=parameters or {"type": "object", "properties": {}},
+                func=func,
+                timeout=timeout,
+            )
+            return func
+        return decorator
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+    def get(self, name: str) -> Optional[Tool]:
+        return self._tools.get(name)
+
+    def specs(self) -> List[Dict[str, Any]]:
+        """Specifications of every registered tool, for the model request."""
+        return [tool.spec() for tool in self._tools.values()]
+
+    async def execute(self, call: ToolCall) -> ToolResult:
+        """Run one tool call on the tool pool, enforcing the tool's timeout."""
+        started = time.perf_counter()
+        tool = self._tools.get(call.name)
+        if tool is None:
+            return ToolResult(call, error=f"Unknown tool '{call.name}'")
+        try:
+            kwargs = json.loads(call.arguments or "{}")
+            loop = asyncio.get_running_loop()
+            data = await asyncio.wait_for(
+                loop.run_in_executor(self._executor, functools.partial(tool.func, **kwargs)),
+                timeout=tool.timeout,
+            )
+        except asyncio.TimeoutError:
+            return ToolResult(call, error=f"{call.name} timed out after {tool.timeout:g}s",
+                              elapsed=time.perf_counter() - started)
+        except Exception as e:
+            print(f"Error executing tool {call.name}: {e}")
+            traceback.print_exc()
+            # Route helpers report failures as HTTPException; their detail is the useful message
+            return ToolResult(call, error=str(getattr(e, "detail", e)), elapsed=time.perf_counter() - started)
+        return ToolResult(call, data=data, elapsed=time.perf_counter() - started)
+
+    async def execute_all(self, calls: Sequence[ToolCall]) -> List[ToolResult]:
+        """Run the tool calls of one model turn concurrently; results are in call order."""
+        return list(await asyncio.gather(*(self.execute(call) for call in calls)))
+
+    def run(self, calls: Sequence[ToolCall]) -> List[ToolResult]:
+        """Blocking variant of `execute_all` for synchronous callers such as RecipeAgent."""
+        return asyncio.run(self.execute_all(calls))
@@ -3,4 +3,56 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-DATABASE_URL = os.getenv("DB_URL")
\ No newline at end of file
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Defaults to a local SQLite file so the SQL-backed stores work without extra setup
+DATABASE_URL = os.getenv("DB_URL", f"sqlite:///{os.path.join(BASE_DIR, 'recipe_app.db')}")
+
+# Storage backend for user data: "json" (user_data.json, for development) or "sql"
+USER_STORE = os.getenv("USER_STORE", "json")
+
+# File of the "json" user store
+USER_DATA_PATH = os.getenv("USER_DATA_PATH", os.path.join(BASE_DIR, "user_data.json"))
+
+# Storage backend for pantries: "csv" (one shared user_available_ingredients.csv) or "sql" (one pantry per user)
+PANTRY_STORE = os.getenv("PANTRY_STORE", "csv")
+
+# Pantries kept parsed in memory per process
+PANTRY_CACHE_SIZE = int(os.getenv("PANTRY_CACHE_SIZE", "1024"))
+
+# Worker processes used for batch meal planning (defaults to one per CPU)
+PLANNER_WORKERS = int(os.getenv("PLANNER_WORKERS", "0")) or None
+
+# Threads reserved for meal planning and for agent (LLM) calls made from async routes
+PLANNER_THREADS = int(os.getenv("PLANNER_THREADS", "4"))
+AGENT_THREADS = int(os.getenv("AGENT_THREADS", "8"))
+
+# Generated meal plans kept per process, and how long (seconds) a cached plan stays valid
+PLAN_CACHE_SIZE = int(os.getenv("PLAN_CACHE_SIZE", "256"))
+PLAN_CACHE_TTL = float(os.getenv("PLAN_CACHE_TTL", "3600"))
+
+# Export plans and grocery lists to meal_plan.txt and grocery_list.csv/.txt in PLAN_EXPORT_DIR, in the background
+PLAN_EXPORT = os.getenv("PLAN_EXPORT", "true").lower() in ("1", "true", "yes")
+PLAN_EXPORT_DIR = os.getenv("PLAN_EXPORT_DIR", ".")
+
+# Chat model backend: "openai" (needs OPENAI_API_KEY) or "replay" (offline, answers from LLM_FIXTURES)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4")
+LLM_FIXTURES = os.getenv("LLM_FIXTURES", os.path.join(BASE_DIR, "RecipeAgent", "fixtures", "chat.json"))
+
+# When set, every model exchange is appended to this file as a replay fixture
+LLM_RECORD_PATH = os.getenv("LLM_RECORD_PATH")
+
+# Agent response cache: size, lifetime (seconds), and the optional embedding-similarity tier
+AGENT_CACHE_SIZE = int(os.getenv("AGENT_CACHE_SIZE", "512"))
+AGENT_CACHE_TTL = float(os.getenv("AGENT_CACHE_TTL", "600"))
+AGENT_CACHE_SEMANTIC = os.getenv("AGENT_CACHE_SEMANTIC", "false").lower() in ("1", "true", "yes")
+AGENT_CACHE_SIMILARITY = float(os.getenv("AGENT_CACHE_SIMILARITY", "0.85"))
+
+# Threads running agent tool calls, and the default time budget (seconds) of one call
+TOOL_THREADS = int(os.getenv("TOOL_THREADS", "8"))
+TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT", "15"))
+
+# Prompt token budget of one agent request, and the part of it given to the summary of dropped turns
+AGENT_CONTEXT_TOKENS = int(os.getenv("AGENT_CONTEXT_TOKENS", "3000"))
+AGENT_SUMMARY_TOKENS = int(os.getenv("AGENT_SUMMARY_TOKENS", "300"))
@@ -5,6 +5,7 @@ from fastapi.openapi.utils import get_openapi
 from routes.ingredients import router as ingredients_router
 from routes.recipes import router as recipes_router
 from routes.meal_plan import router as meal_plan_router
+from routes.nutrition import router as nutrition_router
 from routes.agent import router as agent_router
 from routes.user_input import router as users_router
 
@@ -27,6 +28,7 @@ app.add_middleware(
 app.include_router(ingredients_router, prefix="/api", tags=["Ingredients"])
 app.include_router(recipes_router, prefix="/api", tags=["Recipes"])
 app.include_router(meal_plan_router, prefix="/api", tags=["Meal Plan"])
+app.include_router(nutrition_router, prefix="/api", tags=["Nutrition"])
 app.include_router(agent_router, prefix="/api", tags=["Recipe Agent"])
 
 app.include_router(users_router, prefix="/api", tags=["Users"])
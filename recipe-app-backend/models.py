@@ -0,0 +1,41 @@
+from sqlalchemy import BigInteger, Column, DateTime, Float, Integer, JSON, String, UniqueConstraint, func
+from db import Base
+from services.user_store import DEFAULT_USER_ID
+
+
+class User(Base):
+    __tablename__ = 'users'
+
+    id = Column(String, primary_key=True)
+    name = Column(String, nullable=False, default="")
+    dietary_goal = Column(String, nullable=True)
+    current_meal_plan = Column(JSON, nullable=False, default=dict)
+    updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "dietaryGoal": self.dietary_goal,
+            "currentMealPlan": self.current_meal_plan or {},
+        }
+
+
+class Ingredient(Base):
+    __tablename__ = 'ingredients'
+    # Also serves lookups of a whole pantry, as user_id is its leading column
+    __table_args__ = (UniqueConstraint('user_id', 'name', name='uq_ingredients_user_name'),)
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(String, nullable=False, default=DEFAULT_USER_ID)
+    name = Column(String, nullable=False)  # Canonical name, see services.ingredient_registry
+    quantity = Column(Float, nullable=False)
+    unit = Column(String, nullable=False)
+    revision = Column(BigInteger, nullable=False, default=0)  # Time of the last write, in nanoseconds
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "quantity": f"{self.quantity:g}",
+            "unit": self.unit,
+        }
@@ -1,205 +1,224 @@
-import csv
-from typing import List, Tuple
-import re
-import sys
-
-def validate_ingredient_name(ingredient: str) -> bool:
-    """
-    Validate ingredient name contains only letters, spaces, and common punctuation.
-    
-    Args:
-        ingredient: The ingredient name to validate
-        
-    Returns:
-        bool: True if valid, False otherwise
-    """
-    # Allow letters, spaces, and basic punctuation
-    pattern = r'^[a-zA-Z\s\'-]+$'
-    return bool(re.match(pattern, ingredient))
-
-def validate_unit(unit: str, valid_units: set) -> bool:
-    """
-    Validate that the unit is in our accepted list.
-    
-    Args:
-        unit: The unit to validate
-        valid_units: Set of valid units
-        
-    Returns:
-        bool: True if valid, False otherwise
-    """
-    return unit.lower() in valid_units
-
-def validate_quantity(quantity_str: str) -> tuple[bool, int, str]:
-    """
-    Validate quantity is a positive integer.
-    
-    Args:
-        quantity_str: The quantity string to validate
-        
-    Returns:
-        Tuple of (is_valid, quantity, error_message)
-    """
-    try:
-        quantity = int(quantity_str)
-        if quantity <= 0:
-            return False, 0, "Quantity must be a positive number"
-        if quantity > 10000:
-            return False, 0, "Quantity seems too large (max: 10000)"
-        return True, quantity, ""
-    except ValueError:
-        return False, 0, "Quantity must be a whole number"
-
-def get_piped_input() -> List[Tuple[str, int, str]]:
-    """
-    Get ingredient entries from piped input with validation and status messages.
-    
-    Returns:
-        List of tuples containing (ingredient, quantity, unit)
-    """
-    valid_units = {'tablespoons', 'cups', 'pieces', 'grams', 'ml'}
-    ingredients_data = []
-    total_lines = 0
-    successful_adds = 0
-    failed_adds = 0
-    
-    print("\n=== Processing Piped Input ===\n")
-    
-    for line in sys.stdin:
-        total_lines += 1
-        line = line.strip()
-        if not line:  # Skip empty lines
-            continue
-            
-        # Split and clean input
-        parts = [part.strip() for part in line.split(',')]
-        
-        # Validate input
-        if len(parts) != 3:
-            failed_adds += 1
-            print(f"❌ Line {total_lines}: Invalid format in '{line}'")
-            print("  → Required format: ingredient, quantity, unit")
-            continue
-        
-        ingredient, quantity_str, unit = parts
-        
-        # Validate ingredient name
-        if not ingredient or not validate_ingredient_name(ingredient):
-            failed_adds += 1
-            print(f"❌ Line {total_lines}: Invalid ingredient name '{ingredient}'")
-            print("  → Use only letters, spaces, and hyphens")
-            continue
-        
-        # Validate quantity
-        is_valid, quantity, error_msg = validate_quantity(quantity_str)
-        if not is_valid:
-            failed_adds += 1
-            print(f"❌ Line {total_lines}: Invalid quantity in '{line}'")
-            print(f"  → {error_msg}")
-            continue
-        
-        # Validate unit
-        if not validate_unit(unit, valid_units):
-            failed_adds += 1
-            print(f"❌ Line {total_lines}: Invalid unit '{unit}'")
-            print(f"  → Valid units are: {', '.join(valid_units)}")
-            continue
-        
-        # All validations passed, add to our list
-        unit = unit.lower()  # Normalize unit
-        ingredients_data.append((ingredient.lower(), quantity, unit))
-        successful_adds += 1
-        print(f"✅ Line {total_lines}: Successfully added {ingredient} ({quantity} {unit})")
-        print(f"  → Progress: {successful_adds} ingredients processed successfully\n")
-    
-    # Print final summary
-    print("\n=== Input Processing Summary ===")
-    print(f"Total lines processed: {total_lines}")
-    print(f"Successful additions: {successful_adds}")
-    print(f"Failed additions: {failed_adds}")
-    print("=" * 30)
-    
-    return ingredients_data
-
-def get_interactive_input() -> List[Tuple[str, int, str]]:
-    """
-    Get ingredient entries from interactive user input with validation.
-    
-    Returns:
-        List of tuples containing (ingredient, quantity, unit)
-    """
-    valid_units = {'tablespoons', 'cups', 'pieces', 'grams', 'ml'}
-    
-    print("\n=== Available Ingredients Input ===")
-    print("\nInstructions:")
-    print("1. Enter each ingredient in the format: ingredient name, quantity, unit")
-    print("2. Press Enter twice when you're finished")
-    print("3. Use whole numbers for quantity")
-    print("\nValid units:", ", ".join(valid_units))
-    print("Example inputs:")
-    print("- tomatoes, 500, grams")
-    print("- chicken breast, 2, pieces")
-    
-    ingredients_data = []
-    
-    while True:
-        try:
-            entry = input("\nEnter ingredient (or press Enter to finish): ").strip()
-            
-            if entry == "":
-                if ingredients_data:
-                    confirm = input("Are you done entering ingredients? (yes/no): ").strip().lower()
-                    if confirm in ['y', 'yes']:
-                        break
-                    else:
-                        continue
-                else:
-                    print("⚠️ Please enter at least one ingredient.")
-                    continue
-            
-            # Rest of the validation logic...
-            # [Previous validation code remains the same]
-            
-        except KeyboardInterrupt:
-            print("\n\nInput cancelled by user.")
-            if ingredients_data:
-                confirm = input("Would you like to save the ingredients entered so far? (yes/no): ").strip().lower()
-                if confirm in ['y', 'yes']:
-                    break
-            return []
-            
-    return ingredients_data
-
-def write_ingredients_csv(filename: str = "user_available_ingredients.csv"):
-    """
-    Get ingredients from input and write to a CSV file.
-    
-    Args:
-        filename: Name of the output CSV file
-    """
-    try:
-        # Check if input is piped or interactive
-        is_piped = not sys.stdin.isatty()
-        
-        # Get ingredient data from appropriate input method
-        ingredients_data = get_piped_input() if is_piped else get_interactive_input()
-        
-        if not ingredients_data:
-            print("\n❌ No ingredients were saved.")
-            return
-        
-        # Write to CSV file
-        with open(filename, 'w', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(["Ingredient", "Quantity", "Unit"])
-            writer.writerows(ingredients_data)
-            
-        print(f"\n✅ Successfully saved {len(ingredients_data)} ingredients to {filename}!")
-        
-    except PermissionError:
-        print(f"\n❌ Error: Unable to write to {filename}. Please check file permissions.")
-    except Exception as e:
-        print(f"\n❌ Error saving file: {str(e)}")
-
-if __name__ == "__main__":
-    write_ingredients_csv()
\ No newline at end of file
+import argparse
+import csv
+import os
+import tempfile
+import time
+from typing import IO, Dict, List, Optional, Tuple
+import sys
+import pandas as pd
+from services.ingredient_input import (
+    CHUNK_LINES,
+    ERROR_FIELDS,
+    validate_entry,
+    validate_stream,
+)
+from services.pantry_store import format_quantity
+from services.units import UNITS
+
+def print_summary(total_lines: int, successful_adds: int, failed_adds: int, elapsed: float) -> None:
+    """Print the totals of a piped input run."""
+    print("\n=== Input Processing Summary ===")
+    print(f"Total lines processed: {total_lines}")
+    print(f"Successful additions: {successful_adds}")
+    print(f"Failed additions: {failed_adds}")
+    print(f"Throughput: {total_lines / max(elapsed, 1e-9):,.0f} lines/s")
+    print("=" * 30)
+
+def print_errors(errors: pd.DataFrame) -> None:
+    """Print one line per rejected entry."""
+    if len(errors):
+        print("\n".join(f"❌ Line {line}: {error} in '{text}'" for line, text, error in
+                        zip(errors["line"], errors["input"], errors["error"])))
+
+def get_piped_input(stream: Optional[IO[str]] = None, quiet: bool = False) -> List[Tuple[str, float, str]]:
+    """
+    Get ingredient entries from piped input with validation and status messages.
+
+    Args:
+        stream: Input to read; defaults to stdin
+        quiet: Only print the summary, not one line per rejected entry
+
+    Returns:
+        List of tuples containing (ingredient, quantity, unit)
+    """
+    ingredients_data = []
+    total_lines = failed_adds = 0
+    started = time.perf_counter()
+    for lines, valid, errors in validate_stream(stream or sys.stdin):
+        total_lines += lines
+        failed_adds += len(errors)
+        ingredients_data.extend(valid.itertuples(index=False, name=None))
+        if not quiet:
+            print_errors(errors)
+    print_summary(total_lines, len(ingredients_data), failed_adds, time.perf_counter() - started)
+    return [(ingredient, float(quantity), unit) for ingredient, quantity, unit in ingredients_data]
+
+def write_piped_csv(
+    filename: str = "user_available_ingredients.csv",
+    errors_filename: str = "ingredient_errors.csv",
+    quiet: bool = False,
+    chunk_lines: int = CHUNK_LINES,
+    stream: Optional[IO[str]] = None,
+) -> Dict[str, float]:
+    """
+    Validate piped input chunk by chunk, streaming valid entries to a CSV file
+    and rejected lines to an error report.
+
+    The output file is replaced only once all input is read, and only if at
+    least one entry was valid. The error report is only written when some
+    lines were rejected.
+
+    Args:
+        filename: Name of the output CSV file
+        errors_filename: Name of the error report (CSV with line, input, field and error)
+        quiet: Only print the summary
+        chunk_lines: Lines read and validated together
+        stream: Input to read; defaults to stdin
+
+    Returns:
+        Dict with the number of lines read, accepted and rejected, and the seconds taken
+    """
+    started = time.perf_counter()
+    total_lines = successful_adds = failed_adds = 0
+    directory = os.path.dirname(os.path.abspath(filename))
+    errors_file = None
+    with tempfile.NamedTemporaryFile("w", dir=directory, suffix=".tmp", delete=False, newline="") as csvfile:
+        temp_path = csvfile.name
+        csvfile.write("Ingredient,Quantity,Unit\n")
+        try:
+            for lines, valid, errors in validate_stream(stream or sys.stdin, chunk_lines):
+                total_lines += lines
+                successful_adds += len(valid)
+                failed_adds += len(errors)
+                valid.assign(quantity=valid["quantity"].map(format_quantity)).to_csv(csvfile, header=False, index=False)
+                if len(errors):
+                    if errors_file is None:
+                        errors_file = open(errors_filename, "w", newline="", encoding="utf-8")
+                        errors_file.write(",".join(ERROR_FIELDS) + "\n")
+                    errors.to_csv(errors_file, header=False, index=False)
+                if not quiet:
+                    print_errors(errors)
+                    print(f"→ Progress: {total_lines} lines, {successful_adds} ingredients processed successfully")
+        finally:
+            if errors_file is not None:
+                errors_file.close()
+
+    if successful_adds:
+        os.replace(temp_path, filename)
+    else:
+        os.remove(temp_path)
+    elapsed = time.perf_counter() - started
+    print_summary(total_lines, successful_adds, failed_adds, elapsed)
+    if failed_adds:
+        print(f"Rejected lines were written to {errors_filename}")
+    return {"lines": total_lines, "accepted": successful_adds, "rejected": failed_adds, "seconds": elapsed}
+
+def get_interactive_input() -> List[Tuple[str, float, str]]:
+    """
+    Get ingredient entries from interactive user input with validation.
+    
+    Returns:
+        List of tuples containing (ingredient, quantity, unit)
+    """
+    print("\n=== Available Ingredients Input ===")
+    print("\nInstructions:")
+    print("1. Enter each ingredient in the format: ingredient name, quantity, unit")
+    print("2. Press Enter twice when you're finished")
+    print("3. Quantities may be whole numbers, decimals or fractions (2, 0.5, 1 1/2)")
+    print("\nValid units:", ", ".join(UNITS), "(singular or plural, e.g. grams, cups, pieces)")
+    print("Example inputs:")
+    print("- tomatoes, 500, grams")
+    print("- chicken breast, 2, pieces")
+    print("- flour, 1 1/2, cups")
+    
+    ingredients_data = []
+    
+    while True:
+        try:
+            entry = input("\nEnter ingredient (or press Enter to finish): ").strip()
+            
+            if entry == "":
+                if ingredients_data:
+                    confirm = input("Are you done entering ingredients? (yes/no): ").strip().lower()
+                    if confirm in ['y', 'yes']:
+                        break
+                    else:
+                        continue
+                else:
+                    print("⚠️ Please enter at least one ingredient.")
+                    continue
+            
+            parsed, _, error_msg = validate_entry(entry)
+            if parsed is None:
+                print(f"❌ {error_msg}")
+                print("→ Example: tomatoes, 500, grams")
+                continue
+            
+            ingredients_data.append(parsed)
+            ingredient, quantity, unit = parsed
+            print(f"✅ Added: {ingredient} ({format_quantity(quantity)} {unit})")
+            
+        except KeyboardInterrupt:
+            print("\n\nInput cancelled by user.")
+            if ingredients_data:
+                confirm = input("Would you like to save the ingredients entered so far? (yes/no): ").strip().lower()
+                if confirm in ['y', 'yes']:
+                    break
+            return []
+            
+    return ingredients_data
+
+def write_ingredients_csv(
+    filename: str = "user_available_ingredients.csv",
+    errors_filename: str = "ingredient_errors.csv",
+    quiet: bool = False,
+    chunk_lines: int = CHUNK_LINES,
+):
+    """
+    Get ingredients from input and write to a CSV file.
+
+    Piped input is validated and written in chunks, see write_piped_csv.
+
+    Args:
+        filename: Name of the output CSV file
+        errors_filename: Name of the error report for piped input
+        quiet: Only print the summary for piped input
+        chunk_lines: Lines of piped input validated together
+    """
+    try:
+        # Check if input is piped or interactive
+        if not sys.stdin.isatty():
+            summary = write_piped_csv(filename, errors_filename, quiet, chunk_lines)
+            if summary["accepted"]:
+                print(f"\n✅ Successfully saved {summary['accepted']} ingredients to {filename}!")
+            else:
+                print("\n❌ No ingredients were saved.")
+            return
+
+        ingredients_data = get_interactive_input()
+
+        if not ingredients_data:
+            print("\n❌ No ingredients were saved.")
+            return
+
+        # Write to CSV file
+        with open(filename, 'w', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(["Ingredient", "Quantity", "Unit"])
+            writer.writerows((ingredient, format_quantity(quantity), unit) for ingredient, quantity, unit in ingredients_data)
+
+        print(f"\n✅ Successfully saved {len(ingredients_data)} ingredients to {filename}!")
+
+    except PermissionError:
+        print(f"\n❌ Error: Unable to write to {filename}. Please check file permissions.")
+    except Exception as e:
+        print(f"\n❌ Error saving file: {str(e)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate ingredient entries and save them as a CSV file.")
+    parser.add_argument("--output", default="user_available_ingredients.csv", help="CSV file to write")
+    parser.add_argument("--errors", default="ingredient_errors.csv", help="Report of rejected lines (piped input)")
+    parser.add_argument("--quiet", action="store_true", help="Only print the summary (piped input)")
+    parser.add_argument("--chunk-lines", type=int, default=CHUNK_LINES, help="Lines validated together (piped input)")
+    args = parser.parse_args()
+    write_ingredients_csv(args.output, args.errors, args.quiet, args.chunk_lines)
@@ -1,7 +1,11 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Optional
+from typing import AsyncIterator, List, Dict, Optional
+import json
 from RecipeAgent.agent import get_agent
+from RecipeAgent.response_cache import get_response_cache
+from services.executors import agent_executor, iterate_in_executor, run_in_executor
 
 router = APIRouter()
 
@@ -19,9 +23,12 @@ class ChatResponse(BaseModel):
     chart: Optional[Dict] = None
 
 @router.post("/chat") # Changed from "/api/chat" since the prefix is already added in main.py
-def chat(request: ChatRequest):
+async def chat(request: ChatRequest):
     """
     Process a chat message and return a response
+
+    The agent's blocking LLM calls run on the bounded agent executor, so a slow
+    chat holds neither the event loop nor the threads other routes use.
     """
     try:
         # Convert the conversation history to the format expected by the agent
@@ -31,7 +38,9 @@ def chat(request: ChatRequest):
         ]
 
         agent = get_agent()
-        response = agent.process_message(
+        response = await run_in_executor(
+            agent_executor,
+            agent.process_message,
             request.message,
             conversation_history
         )
@@ -48,3 +57,46 @@ def chat(request: ChatRequest):
             status_code=500,
             detail=str(e)
         )
+
+@router.get("/chat/cache-stats")
+async def get_chat_cache_stats():
+    """
+    Report the agent response cache's hit and miss counters.
+    """
+    return get_response_cache().stats()
+
+def format_sse(event: str, data: Dict) -> str:
+    """Encode one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Process a chat message and stream the response as server-sent events
+
+    Emits `token` events while the reply is generated, `function_call` and
+    `function_result` events when the agent uses a function, and a final
+    `done` event with the full reply (or an `error` event).
+    """
+    conversation_history = [
+        {"role": msg.role, "content": msg.content}
+        for msg in request.conversation_history
+    ]
+
+    agent = get_agent()
+    events = agent.stream_message(request.message, conversation_history)
+
+    async def stream() -> AsyncIterator[str]:
+        try:
+            async for event in iterate_in_executor(agent_executor, events):
+                payload = {key: value for key, value in event.items() if key != "type"}
+                yield format_sse(event["type"], payload)
+        except Exception as e:
+            print(f"Error in chat stream: {str(e)}")  # For debugging
+            yield format_sse("error", {"message": str(e)})
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,152 +1,312 @@
 import csv
-import os
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Any
-from collections import defaultdict
-from .recipes import get_recipe_by_name  # Changed to relative import
+import json
+import anyio
+import threading
+from collections import OrderedDict
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
+from pydantic import BaseModel, Field
+from typing import AsyncIterator, List, Dict, Any, Hashable, Optional, Tuple
+import numpy as np
+from config import PANTRY_CACHE_SIZE
+from services.ingredient_matrix import IngredientMatrix
+from services.ingredient_input import CHUNK_LINES, validate_batch
+from services.ingredient_registry import get_ingredient_registry
+from services.pantry_store import format_quantity, get_pantry_repository
+from services.plan_store import export_paths, load_saved_plan
+from services.units import get_conversion_table, normalize_unit, unit_codes
+from services.user_store import DEFAULT_USER_ID
+from .recipes import get_recipe_snapshot
 router = APIRouter()
 
-# Define the path to your CSV file
-CSV_FILE_PATH = os.path.join(os.path.dirname(__file__), '../user_available_ingredients.csv')
+class PantryItem(BaseModel):
+    name: str = Field(..., min_length=1)
+    quantity: float = Field(..., ge=0)
+    unit: str = Field(..., min_length=1)
 
 @router.get("/ingredients", response_model=List[Dict[str, str]])
-def get_available_ingredients():
+async def get_available_ingredients(user_id: Optional[str] = None):
     """
-    Retrieve a list of available ingredients from a CSV file.
+    Retrieve a user's available ingredients from the pantry store.
+
+    Args:
+        user_id (Optional[str]): Owner of the pantry; defaults to the default user.
+
+    Returns:
+        A list of dictionaries containing ingredient details.
+    """
+    return await run_in_threadpool(load_available_ingredients, user_id)
+
+@router.put("/ingredients")
+async def upsert_available_ingredients(items: List[PantryItem], user_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Add ingredients to a user's pantry, replacing the amounts of those already in it.
+
+    Args:
+        items (List[PantryItem]): Ingredients with their quantity and unit.
+        user_id (Optional[str]): Owner of the pantry; defaults to the default user.
+
+    Returns:
+        Dict[str, Any]: The number of `upserted` ingredients.
+
+    Raises:
+        HTTPException: If a unit is unknown.
+    """
+    for item in items:
+        if normalize_unit(item.unit) is None:
+            raise HTTPException(status_code=400, detail=f"Unknown unit '{item.unit}' for ingredient '{item.name}'")
+    count = await run_in_threadpool(
+        get_pantry_repository().upsert, user_id or DEFAULT_USER_ID, [item.model_dump() for item in items]
+    )
+    return {"upserted": count}
+
+@router.delete("/ingredients/{name}")
+async def delete_available_ingredient(name: str, user_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Remove an ingredient from a user's pantry.
+
+    Args:
+        name (str): Ingredient name, in any spelling.
+        user_id (Optional[str]): Owner of the pantry; defaults to the default user.
+
+    Returns:
+        Dict[str, Any]: The number of `deleted` ingredients.
+    """
+    count = await run_in_threadpool(get_pantry_repository().delete, user_id or DEFAULT_USER_ID, [name])
+    if not count:
+        raise HTTPException(status_code=404, detail=f"Ingredient '{name}' is not in the pantry.")
+    return {"deleted": count}
+
+@router.post("/ingredients/bulk")
+async def bulk_upsert_ingredients(request: Request, user_id: Optional[str] = None) -> Response:
+    """
+    Add ingredients to a user's pantry from "ingredient, quantity, unit" lines, as the input scripts accept them.
+
+    The request body is plain text, one entry per line (a CSV header line is
+    skipped); quantities may be fractional ("0.5", "1 1/2"). The body is read
+    as it arrives and validated CHUNK_LINES lines at a time (see
+    services.ingredient_input); the valid entries of each chunk are upserted
+    before the next chunk is read, so at most one chunk of lines is held. The
+    response lists every rejected line, so it grows with the number of errors.
+
+    Args:
+        request (Request): Request with the text body.
+        user_id (Optional[str]): Owner of the pantry; defaults to the default user.
+
+    Returns:
+        Response: Newline-delimited JSON, one object per chunk with the `lines` read, the
+        `accepted` entries and the rejected `errors` (line, input, field, error), then a last object
+        with the `summary` of the whole body.
+    """
+    user = user_id or DEFAULT_USER_ID
+
+    def load_chunk(lines: List[str], first_line: int) -> Dict[str, Any]:
+        valid, errors = validate_batch(lines, first_line)
+        if len(valid):
+            records = valid.rename(columns={"ingredient": "name"}).to_dict("records")
+            get_pantry_repository().upsert(user, records)
+        return {"lines": len(lines), "accepted": len(valid), "errors": errors.to_dict("records")}
+
+    results = []
+    totals = {"lines": 0, "accepted": 0, "rejected": 0}
+    async for lines in _read_lines(request, CHUNK_LINES):
+        result = await run_in_threadpool(load_chunk, lines, totals["lines"] + 1)
+        totals["lines"] += result["lines"]
+        totals["accepted"] += result["accepted"]
+        totals["rejected"] += len(result["errors"])
+        results.append(json.dumps(result, default=int))
+    results.append(json.dumps({"summary": totals}))
+    return Response("\n".join(results) + "\n", media_type="application/x-ndjson")
+
+async def _read_lines(request: Request, chunk_lines: int) -> AsyncIterator[List[str]]:
+    """Split a streamed request body into lists of at most `chunk_lines` lines."""
+    lines: List[str] = []
+    pending = b""
+    async for data in request.stream():
+        *complete, pending = (pending + data).split(b"\n")
+        lines.extend(line.decode("utf-8", errors="replace") for line in complete)
+        while len(lines) >= chunk_lines:
+            yield lines[:chunk_lines]
+            lines = lines[chunk_lines:]
+    if pending:
+        lines.append(pending.decode("utf-8", errors="replace"))
+    if lines:
+        yield lines
+
+def load_available_ingredients(user_id: Optional[str] = None) -> List[Dict[str, str]]:
+    """
+    Blocking variant of get_available_ingredients for code that runs off the event loop.
+
+    Args:
+        user_id (Optional[str]): Owner of the pantry; defaults to the default user.
 
     Returns:
         A list of dictionaries containing ingredient details.
     """
     try:
-        ingredients = []
-        with open(CSV_FILE_PATH, mode='r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                ingredient = {
-                    "name": row.get("Ingredient", "").strip(),
-                    "quantity": row.get("Quantity", "").strip(),
-                    "unit": row.get("Unit", "").strip()
-                }
-                if not ingredient["name"]:
-                    continue  # Skip entries without a name
-                ingredients.append(ingredient)
-        return ingredients
+        return get_pantry_repository().list_items(user_id or DEFAULT_USER_ID)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Ingredients CSV file not found.")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"An error occurred while reading the CSV file: {e}")
+        raise HTTPException(status_code=500, detail=f"An error occurred while reading the pantry: {e}")
+
+def get_pantry_version(user_id: Optional[str] = None) -> Hashable:
+    """Version stamp of a user's available ingredients; it changes whenever their pantry does."""
+    return get_pantry_repository().version(user_id or DEFAULT_USER_ID)
 
-def get_ingredients_dict() -> Dict[str, tuple]:
+def get_ingredients_dict(user_id: Optional[str] = None) -> Dict[str, tuple]:
     """
     Get available ingredients as a dictionary for easier lookup.
 
+    Args:
+        user_id (Optional[str]): Owner of the pantry; defaults to the default user.
+
     Returns:
-        Dict[str, tuple]: Dictionary with ingredient names as keys and (quantity, unit) as values
+        Dict[str, tuple]: Dictionary with canonical ingredient names (see services.ingredient_registry)
+        as keys and (quantity, unit) as values
     """
-    ingredients_list = get_available_ingredients()
+    registry = get_ingredient_registry()
+    ingredients_list = load_available_ingredients(user_id)
     return {
-        ingredient["name"].lower(): (float(ingredient["quantity"]), ingredient["unit"])
+        registry.canonical(ingredient["name"]): (float(ingredient["quantity"]), ingredient["unit"])
         for ingredient in ingredients_list
     }
 
 @router.post("/ingredients/grocery-list")
-def output_grocery_list():
-    #reads list from grocery_list.csv and returns
-    grocery_list = {}
-    with open('grocery_list.csv', 'r', encoding='utf-8') as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            grocery_list[row["ingredient"]] = row["missing_amount"]
-    return grocery_list
-            
-            
+async def output_grocery_list(user_id: Optional[str] = None) -> Dict[str, str]:
+    """
+    Return the grocery list of a user's current meal plan.
 
+    The list is saved with the user's plan by GET /meal-plan (see
+    services.plan_store.load_saved_plan). When the user has no saved plan,
+    the last exported grocery_list.csv is read instead.
 
+    Args:
+        user_id (Optional[str]): User whose list is returned; defaults to the default user.
+
+    Returns:
+        Dict[str, str]: Missing amount (in grams) keyed by ingredient.
+    """
+    saved = await run_in_threadpool(load_saved_plan, user_id)
+    if saved is not None and "grocery_list" in saved:
+        return {item["ingredient"]: format_quantity(item["missing_amount"]) for item in saved["grocery_list"]}
+
+    try:
+        async with await anyio.open_file(export_paths(user_id or DEFAULT_USER_ID)["grocery_csv"], 'r', encoding='utf-8') as file:
+            content = await file.read()
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="No grocery list yet, generate a meal plan first.")
+    # skipinitialspace also reads files exported with ", "-separated headers
+    reader = csv.DictReader(content.splitlines(), skipinitialspace=True)
+    return {row["ingredient"]: row["missing_amount"].strip() for row in reader}
+
+# Pantry stock per user, parsed for the current version of their pantry: user -> (version, ingredient ids, grams)
+_pantry_stock: "OrderedDict[str, Tuple[Hashable, np.ndarray, np.ndarray]]" = OrderedDict()
+_pantry_stock_lock = threading.Lock()
+
+def get_pantry_stock(user_id: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get available ingredients as interned ingredient ids and grams on hand.
 
-def get_grocery_list(recipes: List[str]) -> List[Dict[str, Any]]:
+    A pantry is read, its names canonicalized and its amounts converted once
+    per version of the pantry; later calls reuse the arrays. The stock of the
+    `PANTRY_CACHE_SIZE` most recently used pantries is kept.
+
+    Args:
+        user_id (Optional[str]): Owner of the pantry; defaults to the default user.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Ingredient ids and the grams on hand of each.
+    """
+    user = user_id or DEFAULT_USER_ID
+    version = get_pantry_version(user)
+    with _pantry_stock_lock:
+        cached = _pantry_stock.get(user)
+        if version is not None and cached is not None and cached[0] == version:
+            _pantry_stock.move_to_end(user)
+            return cached[1], cached[2]
+
+    registry = get_ingredient_registry()
+    available_ingredients = get_ingredients_dict(user)
+    ids = registry.intern_all(available_ingredients.keys())
+    quantities = np.fromiter((amount for amount, _ in available_ingredients.values()), dtype=np.float64)
+    units = [unit for _, unit in available_ingredients.values()]
+    # One vectorized lookup in the (ingredient, unit) conversion table for the whole pantry
+    grams = get_conversion_table().to_grams(quantities, ids, unit_codes(units))
+    unknown = np.isnan(grams)
+    for i in np.flatnonzero(unknown):
+        print(f"Warning: Unknown unit '{units[i]}' for ingredient '{registry.name(ids[i])}', ignoring it")
+    ids, grams = ids[~unknown], grams[~unknown]
+
+    with _pantry_stock_lock:
+        _pantry_stock[user] = (version, ids, grams)
+        _pantry_stock.move_to_end(user)
+        while len(_pantry_stock) > PANTRY_CACHE_SIZE:
+            _pantry_stock.popitem(last=False)
+    return ids, grams
+
+def get_pantry_grams(user_id: Optional[str] = None) -> Dict[str, float]:
     """
-    Determine missing and insufficient ingredients based on a list of recipes.
+    Get available ingredients in grams.
+
+    Args:
+        user_id (Optional[str]): Owner of the pantry; defaults to the default user.
+
+    Returns:
+        Dict[str, float]: Grams on hand keyed by canonical ingredient name.
+    """
+    registry = get_ingredient_registry()
+    ids, grams = get_pantry_stock(user_id)
+    return {registry.name(ingredient_id): float(amount) for ingredient_id, amount in zip(ids, grams)}
+
+def get_pantry_vector(matrix: IngredientMatrix, user_id: Optional[str] = None) -> np.ndarray:
+    """
+    Get available ingredients in grams, aligned with the ingredient matrix columns.
+
+    Args:
+        matrix (IngredientMatrix): Ingredient matrix of the current recipe catalog.
+        user_id (Optional[str]): Owner of the pantry; defaults to the default user.
+
+    Returns:
+        np.ndarray: Grams on hand per ingredient column.
+    """
+    return matrix.pantry_vector_from_ids(*get_pantry_stock(user_id))
+
+def compute_grocery_list(recipes: List[str], user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Determine missing and insufficient ingredients based on a list of recipes, without writing any files.
 
     Args:
         recipes (List[str]): List of recipe names.
+        user_id (Optional[str]): Owner of the pantry to shop against; defaults to the default user.
 
     Returns:
         List[Dict[str, Any]]: A list of dictionaries, each containing:
             - ingredient: Name of the ingredient.
             - missing_amount: Quantity missing (in grams).
     """
-    # Convert list of recipe names to list of recipe data dictionaries
-    recipe_data = [get_recipe_by_name(recipe) for recipe in recipes]
-
-    # Aggregate required ingredients
-    required_ingredients = defaultdict(int)
-    for recipe in recipe_data:
-        for ingredient, amount in recipe['ingredients'].items():
-            try:
-                amount_value = float(amount) if isinstance(amount, str) else amount
-                required_ingredients[ingredient.lower()] += amount_value
-            except (ValueError, TypeError):
-                print(f"Warning: Could not convert amount '{amount}' for ingredient '{ingredient}'")
-                continue
-
-    # Load available ingredients
-    available_ingredients = get_ingredients_dict()
-
-    missing_ingredients = []
-
-    for ingredient, required_amount in required_ingredients.items():
-        if ingredient not in available_ingredients:
-            # Convert to grams
-            required_amount = convert_to_grams(required_amount, "grams")
-            # Ingredient is completely missing
-            missing_ingredients.append({
-                "ingredient": ingredient,
-                "missing_amount": required_amount,
-                "unit": "grams"  # Assuming default unit; adjust if necessary
-            })
-            continue
-
-        available_amount, unit = available_ingredients[ingredient]
-        available_grams = convert_to_grams(float(available_amount), unit)
-        required_grams = convert_to_grams(float(required_amount), "grams")
-
-        if available_grams < required_grams:
-            # Calculate the additional amount needed
-            additional_amount = required_grams - available_grams
-            missing_ingredients.append({
-                "ingredient": ingredient,
-                "missing_amount": additional_amount,
-                "unit": "grams"  # Assuming default unit; adjust if necessary
-            })
-            
-    #write missing ingredients to a csv file 
-    with open('grocery_list.csv', 'w', encoding='utf-8') as file:
-        file.write("ingredient, missing_amount, unit\n")
-        for ingredient in missing_ingredients:
-            file.write(f"{ingredient['ingredient']}, {ingredient['missing_amount']}, {ingredient['unit']}\n")
-    
-    #write missing ingredients to a txt file 
-    with open('grocery_list.txt', 'w', encoding='utf-8') as file:
-        for ingredient in missing_ingredients:
-            file.write(f"{ingredient['ingredient']}: {ingredient['missing_amount']} {ingredient['unit']}\n")
-    return missing_ingredients
+    snapshot = get_recipe_snapshot()
+    matrix = snapshot.ingredients
 
-def convert_to_grams(quantity: float, unit: str) -> float:
-    """
-    Convert various units to grams for comparison.
+    # Resolve recipe names to catalog rows; a recipe listed twice counts as two portions
+    rows = snapshot.nutrition.rows(recipes)
+    if (rows < 0).any():
+        unknown = recipes[int(np.flatnonzero(rows < 0)[0])]
+        raise HTTPException(status_code=404, detail=f"Recipe '{unknown}' not found.")
 
-    Args:
-        quantity: Amount of ingredient
-        unit: Unit of measurement
+    # Load available ingredients aligned with the matrix columns (in grams)
+    pantry = get_pantry_vector(matrix, user_id)
 
-    Returns:
-        Equivalent amount in grams
-    """
-    conversion_rates = {
-        "grams": 1,
-        "ml": 1,  # Assuming density of 1g/ml for liquids
-        "pieces": 100,  # Rough approximation
-        "cups": 240,
-        "tablespoons": 15
-    }
-    return quantity * conversion_rates.get(unit.lower(), 1)
+    # Required grams minus pantry stock, for every ingredient at once
+    shortfall = matrix.shortfall(matrix.counts(rows), pantry)
+
+    missing_ingredients = [
+        {
+            "ingredient": matrix.vocabulary[column],
+            "missing_amount": float(shortfall[column]),
+            "unit": "grams"  # Recipe quantities are stored in grams
+        }
+        for column in np.flatnonzero(shortfall > 0)
+    ]
+    return missing_ingredients
@@ -1,198 +1,645 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+import asyncio
 import json
 import os
-from typing import Dict, Any, List, Optional, Set
-import csv
-import random
-from .recipes import get_recipes, get_recipe_by_name
-from .ingredients import get_grocery_list
+import threading
+import zlib
+from typing import Dict, Any, AsyncIterator, Hashable, List, Optional, Tuple
+import numpy as np
+from config import PLAN_EXPORT
+from services.catalog import RecipeSnapshot
+from services.executors import planner_executor, run_in_executor
+from services.nutrition_matrix import NutritionMatrix
+from services.plan_pool import get_planner_pool
+from services.plan_cache import file_version, get_plan_cache
+from services.plan_store import apply_grocery_delta, get_plan_exporter
+from services.planner import PlannerError, plan_meals, swap_meal
+from services.user_store import DEFAULT_USER_ID, get_user_repository
+from .recipes import get_recipe_snapshot
+from .ingredients import compute_grocery_list, get_pantry_vector, get_pantry_version
 
 router = APIRouter()
 
+DAYS_OF_WEEK = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+MEAL_TYPES = ["Breakfast", "Lunch", "Dinner"]
+
+# Share of the daily protein goal every planned day must reach
+PROTEIN_GOAL_RATIO = 0.8
+
+# Locks serializing the updates of a user's saved plan; users are spread over a fixed number of them
+PLAN_LOCK_STRIPES = 64
+_plan_locks = [threading.RLock() for _ in range(PLAN_LOCK_STRIPES)]
+
+# Determine the paths to JSON files
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+DIET_PREFERENCES_PATH = os.path.join(CURRENT_DIR, "../diet_preferences.json")
+
 class MealPlanResponse(BaseModel):
     meal_plan: Dict[str, Dict[str, Any]]
+    objective: Optional[float] = None
+    status: Optional[str] = None
+
+class DietProfile(BaseModel):
+    dietaryGoal: str
+    nutritionalGoals: Optional[Dict[str, float]] = None  # Defaults to the goals in diet_preferences.json
+    id: Optional[str] = None
+
+class MealSwapRequest(BaseModel):
+    recipe: Optional[str] = None  # Recipe to serve instead; the best fitting one is chosen when omitted
+
+class BatchMealPlanRequest(BaseModel):
+    user_ids: List[str] = []
+    profiles: List[DietProfile] = []
+    seed: Optional[int] = None  # Overrides the per-user seed, so plans differ from GET /meal-plan
+
+def scale_recipe(recipe: Dict[str, Any], portions: int) -> Dict[str, Any]:
+    """
+    Return a copy of a catalog recipe scaled to the given number of portions.
+
+    Args:
+        recipe (Dict[str, Any]): Recipe from the shared catalog; it is not modified.
+        portions (int): Number of portions served.
+
+    Returns:
+        Dict[str, Any]: The recipe with nutrition and ingredient amounts multiplied,
+        and the number of `portions`.
+    """
+    serving = dict(recipe, portions=portions)
+    serving["ingredients"] = {
+        ingredient: amount * portions if isinstance(amount, (int, float)) else amount
+        for ingredient, amount in recipe["ingredients"].items()
+    }
+    for field in ("calories", "protein_g", "carbs_g", "fat_g"):
+        serving[field] = recipe[field] * portions
+    return serving
+
+def load_diet_preferences() -> Dict[str, Any]:
+    """Load the nutritional goals of every supported diet from diet_preferences.json."""
+    with open(DIET_PREFERENCES_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def get_nutritional_goals(dietary_goal: str, diet_preferences: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Look up the nutritional goals of a diet.
+
+    Args:
+        dietary_goal (str): Name of the diet (case-insensitive).
+        diet_preferences (Dict[str, Any]): Contents of diet_preferences.json.
+
+    Returns:
+        Dict[str, float]: The diet's nutritional goals.
+
+    Raises:
+        HTTPException: If the diet is unknown or lacks a calorie or protein goal.
+    """
+    user_pref = next(
+        (pref for pref in diet_preferences.get("user_preferences", [])
+         if pref["diet"].lower() == dietary_goal.lower()),
+        None
+    )
+
+    if not user_pref:
+        raise HTTPException(status_code=400, detail=f"No nutritional goals found for diet '{dietary_goal}'")
+
+    nutritional_goals = user_pref.get("nutritional_goals", {})
+    if not nutritional_goals.get("calories") or not nutritional_goals.get("protein"):
+        raise HTTPException(status_code=400, detail="Incomplete nutritional goals for the user's diet")
+    return nutritional_goals
+
+def build_meal_plan(
+    recipes: Dict[str, Dict[str, Any]],
+    nutrition: NutritionMatrix,
+    rows: np.ndarray,
+    portions: np.ndarray,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Turn the planner's recipe rows and portions into the API's day -> meal -> recipe shape.
+
+    Args:
+        recipes (Dict[str, Dict[str, Any]]): Recipes of the catalog snapshot the plan was made from.
+        nutrition (NutritionMatrix): Nutrition matrix of the same snapshot.
+        rows (np.ndarray): Catalog row per (day, meal).
+        portions (np.ndarray): Portions per (day, meal).
+
+    Returns:
+        Dict[str, Dict[str, Any]]: The weekly meal plan.
+    """
+    return {
+        day: {
+            meal: scale_recipe(recipes[nutrition.names[rows[d][m]]], int(portions[d][m]))
+            for m, meal in enumerate(MEAL_TYPES)
+        }
+        for d, day in enumerate(DAYS_OF_WEEK)
+    }
+
+def load_user(user_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Load a user from the user repository.
+
+    Args:
+        user_id (Optional[str]): User to load; defaults to the default user.
+
+    Returns:
+        Dict[str, Any]: The stored user.
+
+    Raises:
+        HTTPException: If the user does not exist.
+    """
+    repository = get_user_repository()
+    user = repository.get(user_id) if user_id else repository.get_default()
+    if user is None:
+        detail = f"User '{user_id}' not found" if user_id else "No users found in the user store"
+        raise HTTPException(status_code=404, detail=detail)
+    return user
+
+def plan_lock(user_id: Optional[str]) -> threading.RLock:
+    """
+    Lock held while a user's saved plan is read, changed and written back.
+
+    Reentrant, so a swap can generate the plan it changes under the same lock.
+    """
+    return _plan_locks[zlib.crc32((user_id or DEFAULT_USER_ID).encode("utf-8")) % PLAN_LOCK_STRIPES]
+
+def plan_seed(user_id: Optional[str]) -> int:
+    """Planner seed of a user; the same user always gets the same plan for the same inputs."""
+    return zlib.crc32((user_id or DEFAULT_USER_ID).encode("utf-8"))
+
+def plan_inputs(user_id: Optional[str], dietary_goal: str, snapshot: RecipeSnapshot) -> Tuple[Hashable, ...]:
+    """
+    Version stamp of every input of a user's meal plan.
+
+    Plans are deterministic per user, so the same inputs always give the same
+    plan. The catalog is stamped by its file signature rather than its
+    in-process version, so the stamp of a saved plan stays valid across restarts.
+
+    Args:
+        user_id (Optional[str]): User the plan is for; None is the default user.
+        dietary_goal (str): The user's dietary goal.
+        snapshot (RecipeSnapshot): Catalog snapshot the plan is made from.
+
+    Returns:
+        Tuple[Hashable, ...]: (user, dietary goal, goals version, catalog file signature, version of the user's pantry).
+    """
+    return (
+        user_id or DEFAULT_USER_ID,
+        dietary_goal.lower(),
+        file_version(DIET_PREFERENCES_PATH),
+        (snapshot.mtime_ns, snapshot.size),
+        get_pantry_version(user_id),
+    )
+
+def stored_plan(user: Dict[str, Any], inputs: Tuple[Hashable, ...]) -> Optional[Dict[str, Any]]:
+    """
+    The plan saved in a user's record (`currentMealPlan`), if it was made from the given inputs.
+
+    Args:
+        user (Dict[str, Any]): The stored user.
+        inputs (Tuple[Hashable, ...]): Current inputs of the user's plan, see `plan_inputs`.
+
+    Returns:
+        Optional[Dict[str, Any]]: The saved `meal_plan`, `objective`, `status` and `revision`, or None.
+    """
+    stored = user.get("currentMealPlan") or {}
+    if stored.get("meal_plan") and stored.get("inputs") == json.loads(json.dumps(inputs, default=str)):
+        return stored
+    return None
+
+def plan_version(user_id: Optional[str], user: Dict[str, Any], snapshot: RecipeSnapshot) -> Tuple[Hashable, ...]:
+    """
+    Version stamp of a user's meal plan: its inputs and the revision of the saved plan.
+
+    The revision counts the meals swapped since the plan was generated, so the
+    version changes on every swap as well as on every change of the inputs.
+    It is used as the meal plan cache key and versions the user's nutrition
+    ledger and the agent's cached answers.
+
+    Args:
+        user_id (Optional[str]): User the plan is for; None is the default user.
+        user (Dict[str, Any]): The stored user.
+        snapshot (RecipeSnapshot): Catalog snapshot the plan is made from.
+
+    Returns:
+        Tuple[Hashable, ...]: The `plan_inputs` followed by the plan's revision (0 until a meal is swapped).
+    """
+    inputs = plan_inputs(user_id, user.get("dietaryGoal") or "", snapshot)
+    stored = stored_plan(user, inputs)
+    return inputs + (stored.get("revision", 0) if stored else 0,)
+
+def save_plan(
+    user_id: Optional[str],
+    user: Dict[str, Any],
+    version: Tuple[Hashable, ...],
+    result: Dict[str, Any],
+    grocery_list: List[Dict[str, Any]],
+) -> None:
+    """
+    Save a plan and its grocery list in the user's record, so they outlive the plan cache and process restarts.
+
+    Args:
+        user_id (Optional[str]): User the plan is for; None is the default user.
+        user (Dict[str, Any]): The stored user; its `currentMealPlan` is replaced.
+        version (Tuple[Hashable, ...]): The plan's version, see `plan_version`.
+        result (Dict[str, Any]): The `meal_plan`, `objective` and `status`.
+        grocery_list (List[Dict[str, Any]]): Missing ingredients, see routes.ingredients.compute_grocery_list.
+    """
+    user["currentMealPlan"] = {
+        "inputs": json.loads(json.dumps(version[:-1], default=str)),
+        "revision": version[-1],
+        "meal_plan": result["meal_plan"],
+        "objective": result.get("objective"),
+        "status": result.get("status"),
+        "grocery_list": grocery_list,
+    }
+    get_user_repository().save(user, user_id)
+
+def get_meal_plan_version(user_id: Optional[str] = None) -> Tuple[Hashable, ...]:
+    """
+    Current version of a user's meal plan, without generating it.
+
+    Args:
+        user_id (Optional[str]): User to look up; defaults to the default user.
+
+    Returns:
+        Tuple[Hashable, ...]: See `plan_version`.
+    """
+    return plan_version(user_id, load_user(user_id), get_recipe_snapshot())
+
+def plan_recipes(meal_plan: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Recipe names of every serving of a plan; a double portion is listed twice."""
+    return [
+        serving["name"]
+        for day in DAYS_OF_WEEK
+        for serving in meal_plan[day].values()
+        for _ in range(serving.get("portions", 1))
+    ]
+
+def generate_meal_plan(user_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Generates a weekly meal plan (3 meals per day) based on the user's dietary goals.
+
+    All 21 meals are chosen together by the constraint-solver planner, which keeps
+    every day under the calorie goal and above the protein floor. Plans are cached
+    per user until the dietary goal, nutritional goals, recipe catalog or pantry
+    change, and the planner is seeded per user, so repeated requests get the same
+    plan. The plan and its grocery list are saved in the user's record (see
+    services.plan_store.load_saved_plan), which is read before planning again,
+    so a plan and its swapped meals survive cache expiry and restarts; no files
+    are written. The plan is made and saved under the user's `plan_lock`, so
+    it cannot overwrite a concurrent swap. This blocks on the solver, so async
+    code runs it on the planner executor.
+
+    Args:
+        user_id (Optional[str]): User to plan for; defaults to the default user.
+
+    Returns:
+        Dict[str, Any]: The `meal_plan`, `objective` and `status` returned by GET /meal-plan.
+    """
+    with plan_lock(user_id):
+        try:
+            # Load user data
+            user = load_user(user_id)
+
+            dietary_goal = user.get("dietaryGoal")
+            if not dietary_goal:
+                raise HTTPException(status_code=400, detail="User does not have a dietary goal set")
+
+            # Load recipes from the shared catalog
+            snapshot = get_recipe_snapshot()
+            nutrition = snapshot.nutrition
+
+            # Reuse the plan while none of its inputs changed
+            cache_key = plan_version(user_id, user, snapshot)
+            cached = get_plan_cache().get(cache_key)
+            if cached is not None:
+                return cached
+
+            # The saved plan keeps the user's swapped meals
+            stored = stored_plan(user, cache_key[:-1])
+            if stored is not None:
+                result = {key: stored.get(key) for key in ("meal_plan", "objective", "status")}
+                get_plan_cache().put(cache_key, result)
+                return result
+
+            nutritional_goals = get_nutritional_goals(dietary_goal, load_diet_preferences())
+
+            if not nutrition.diet_mask(dietary_goal).any():
+                raise HTTPException(status_code=404, detail=f"No recipes found for diet '{dietary_goal}'")
+
+            # Prefer recipes the user's pantry already covers
+            coverage = snapshot.ingredients.coverage(get_pantry_vector(snapshot.ingredients, user_id))
+
+            try:
+                plan = plan_meals(
+                    nutrition,
+                    dietary_goal,
+                    max_calories=nutritional_goals["calories"],
+                    protein_floor=PROTEIN_GOAL_RATIO * nutritional_goals["protein"],
+                    coverage=coverage,
+                    days=len(DAYS_OF_WEEK),
+                    meals_per_day=len(MEAL_TYPES),
+                    seed=plan_seed(user_id),
+                )
+            except PlannerError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+            meal_plan = build_meal_plan(snapshot.recipes, nutrition, plan.rows, plan.portions)
+            result = {"meal_plan": meal_plan, "objective": plan.objective, "status": plan.status}
+            save_plan(user_id, user, cache_key, result, compute_grocery_list(plan_recipes(meal_plan), user_id))
+            get_plan_cache().put(cache_key, result)
+            return result
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/meal-plan", response_model=MealPlanResponse)
-def create_meal_plan():
+async def create_meal_plan(background_tasks: BackgroundTasks, user_id: Optional[str] = None):
     """
     Generates a weekly meal plan (3 meals per day) based on the user's dietary goals.
 
+    Planning runs on the bounded planner executor, so slow plans do not block the
+    event loop and slow chat calls cannot take the planner's threads. When
+    PLAN_EXPORT is set, the plan and grocery list files are written after the
+    response is sent.
+
+    Args:
+        background_tasks (BackgroundTasks): Tasks run after the response is sent.
+        user_id (Optional[str]): User to plan for; defaults to the default user.
+
     Returns:
-        MealPlanResponse: A dictionary mapping each day to its breakfast, lunch, and dinner recipes.
+        MealPlanResponse: A dictionary mapping each day to its breakfast, lunch, and dinner recipes,
+        together with the planner's objective value and status.
     """
-    # Define days of the week and meal types
-    days_of_week = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-    meal_types = ["Breakfast", "Lunch", "Dinner"]
+    result = await run_in_executor(planner_executor, generate_meal_plan, user_id)
+    if PLAN_EXPORT:
+        background_tasks.add_task(get_plan_exporter().export, user_id)
+    return result
 
-    # Define maximum number of attempts to generate a valid meal plan per day
-    MAX_ATTEMPTS_PER_DAY = 5
+def swap_planned_meal(day: str, meal: str, recipe: Optional[str] = None, user_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Replace one meal of a user's current plan, keeping every other meal fixed.
 
-    # Determine the paths to JSON files and CSV
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    user_data_path = os.path.join(current_dir, "../user_data.json")
-    diet_preferences_path = os.path.join(current_dir, "../diet_preferences.json")
-    recipes_csv_path = os.path.join(current_dir, "../recipes.csv")  # Ensure this path is correct
+    Only the recipes that fit what the day's other meals leave of the calorie
+    and protein budget are searched (see services.planner.swap_meal), and the
+    grocery list is updated for the ingredients of the two recipes involved
+    only. The new plan and grocery list are saved in the user's record with
+    the revision increased, which gives the plan a new version: the plan
+    cache is updated under it, and the user's nutrition ledger and the
+    agent's cached answers, keyed by the old version, are rebuilt on next use.
+    All of it happens under the user's `plan_lock`, so concurrent swaps of one
+    user apply one after the other instead of overwriting each other.
 
-    try:
-        # Load user data
-        with open(user_data_path, "r") as f:
-            user_data = json.load(f)
+    Args:
+        day (str): Day of the week (case-insensitive).
+        meal (str): Breakfast, Lunch or Dinner (case-insensitive).
+        recipe (Optional[str]): Recipe to serve instead; defaults to the best fitting one.
+        user_id (Optional[str]): User whose plan is changed; defaults to the default user.
 
-        # Assuming a single user for simplicity. Modify as needed for multiple users.
-        if not user_data.get("users"):
-            raise HTTPException(status_code=404, detail="No users found in user_data.json")
+    Returns:
+        Dict[str, Any]: The `day` and `meal`, the `previous` and new `serving`, the
+        slot's `objective`, the day's new `day_totals` and the `grocery_delta`.
 
-        user = user_data["users"][0]  # Modify to select specific user if multiple exist
+    Raises:
+        HTTPException: If the day, meal or recipe is unknown, or no recipe fits the day.
+    """
+    days = {name.lower(): d for d, name in enumerate(DAYS_OF_WEEK)}
+    meals = {name.lower(): m for m, name in enumerate(MEAL_TYPES)}
+    if day.lower() not in days or meal.lower() not in meals:
+        raise HTTPException(status_code=404, detail=f"Unknown meal slot {day} {meal}")
+    d, m = days[day.lower()], meals[meal.lower()]
+    day, meal = DAYS_OF_WEEK[d], MEAL_TYPES[m]
 
+    # Held from reading the saved plan to caching the new one, so concurrent swaps never lose one another
+    with plan_lock(user_id):
+        user = load_user(user_id)
         dietary_goal = user.get("dietaryGoal")
         if not dietary_goal:
             raise HTTPException(status_code=400, detail="User does not have a dietary goal set")
+        snapshot = get_recipe_snapshot()
+        nutrition = snapshot.nutrition
+        matrix = snapshot.ingredients
 
-        # Load dietary preferences
-        with open(diet_preferences_path, "r", encoding="utf-8") as f:
-            diet_preferences = json.load(f)
-
-        user_pref = next(
-            (pref for pref in diet_preferences.get("user_preferences", []) 
-             if pref["diet"].lower() == dietary_goal.lower()), 
-            None
-        )
-
-        if not user_pref:
-            raise HTTPException(status_code=400, detail=f"No nutritional goals found for diet '{dietary_goal}'")
-
-        nutritional_goals = user_pref.get("nutritional_goals", {})
-        max_calories = nutritional_goals.get("calories")
-        protein_goal = nutritional_goals.get("protein")
-
-        if not max_calories or not protein_goal:
-            raise HTTPException(status_code=400, detail="Incomplete nutritional goals for the user's diet")
-
-        # Load recipes from recipes.csv
-        recipes = get_recipes()
-        
-        print(recipes)
-
-        # Filter recipes that match the user's dietary goal
-        matching_recipes = [recipe for recipe in recipes.values() if recipe["diet"].lower() == dietary_goal.lower()]
-
-        if not matching_recipes:
-            raise HTTPException(status_code=404, detail=f"No recipes found for diet '{dietary_goal}'")
-
-        # Shuffle recipes to ensure diversity
-        random.shuffle(matching_recipes)
-
-        # Initialize meal plan
-        meal_plan = {day: {} for day in days_of_week}
-
-        # Set to track globally used recipes for ensuring diversity across days
-        globally_used_recipes: Set[str] = set()
-
-        for day in days_of_week:
-            daily_calories = 0
-            daily_protein = 0
-            used_recipes_today: Set[str] = set()
-
-            for meal in meal_types:
-                # Attempt to find a suitable recipe
-                suitable_recipe = None
-                for recipe in matching_recipes:
-                    recipe_name = recipe["name"]
-                    if (recipe_name not in used_recipes_today) and (recipe_name not in globally_used_recipes):
-                        if daily_calories + recipe["calories"] <= max_calories:
-                            suitable_recipe = recipe
-                            break
-
-                # If no suitable recipe found without duplication, allow reuse across days
-                if not suitable_recipe:
-                    for recipe in matching_recipes:
-                        recipe_name = recipe["name"]
-                        if recipe_name not in used_recipes_today:
-                            if daily_calories + recipe["calories"] <= max_calories:
-                                suitable_recipe = recipe
-                                break
-
-                # If still no suitable recipe, try doubling a recipe
-                if not suitable_recipe:
-                    for recipe in matching_recipes:
-                        if (recipe["name"] not in used_recipes_today) and (recipe["name"] not in globally_used_recipes):
-                            doubled_calories = recipe["calories"] * 2
-                            if daily_calories + doubled_calories <= max_calories:
-                                suitable_recipe = recipe.copy()
-                                suitable_recipe["calories"] *= 2
-                                suitable_recipe["protein_g"] *= 2
-                                suitable_recipe["carbs_g"] *= 2
-                                suitable_recipe["fat_g"] *= 2
-                                suitable_recipe["ingredients"] *= 2
-                                break
-
-                if suitable_recipe:
-                    meal_plan[day][meal] = suitable_recipe
-                    daily_calories += suitable_recipe["calories"]
-                    daily_protein += suitable_recipe["protein_g"]
-                    used_recipes_today.add(suitable_recipe["name"].replace(" (Double Portion)", ""))
-                    globally_used_recipes.add(suitable_recipe["name"].replace(" (Double Portion)", ""))
-                else:
-                    meal_plan[day][meal] = "No suitable recipe found"
-
-            # Check if protein goal is met (80% of protein_goal)
-            if daily_protein < (0.8 * protein_goal):
-                # Attempt to adjust by finding high-protein recipes to double
-                for meal in meal_types:
-                    recipe = meal_plan[day][meal]
-                    if isinstance(recipe, dict):
-                        additional_protein = recipe["protein_g"]
-                        additional_calories = recipe["calories"]
-                        if daily_calories + additional_calories <= max_calories:
-                            # Double the portion
-                            doubled_recipe = recipe.copy()
-                            doubled_recipe["calories"] *= 2
-                            doubled_recipe["protein_g"] *= 2
-                            doubled_recipe["carbs_g"] *= 2
-                            doubled_recipe["fat_g"] *= 2   
-                            # Update meal plan
-                            meal_plan[day][meal] = doubled_recipe
-                            daily_calories += recipe["calories"]
-                            daily_protein += additional_protein
-                            
-                            if daily_protein >= (0.8 * protein_goal):
-                                break
-
-                # Final check
-                if daily_protein < (0.8 * protein_goal):
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Unable to meet protein goals for {day}. Consider adding more high-protein recipes or increasing calorie limit."
-                    )
-        
-        #write meal plan to a txt file 
-        with open('meal_plan.txt', 'w', encoding='utf-8') as file:
-            for day in days_of_week:
-                file.write(f"{day}:\n")
-                for meal in meal_types:
-                    file.write(f"  {meal}: {meal_plan[day][meal]}\n")
-        
-        #aggregate all recipes into one list of recipe names, but if a recipe is a double portion, add it twice
-        all_recipes = []
-        for day in days_of_week:
-            for meal in meal_types:
-                recipe = meal_plan[day][meal]
-                if isinstance(recipe, dict):
-                    if(meal_plan[day][meal]["calories"] != get_recipe_by_name(meal_plan[day][meal]["name"])["calories"]):
-                        all_recipes.append(recipe["name"])
-                        all_recipes.append(recipe["name"])
-                        #iterate through meal_plan double the quantity of each ingredient
-                        for ingredient in meal_plan[day][meal]["ingredients"]:
-                            meal_plan[day][meal]["ingredients"][ingredient] *= 2
-                    else:
-                        all_recipes.append(recipe["name"])
-        
-        #call generate grocery list function 
-        get_grocery_list(all_recipes)
-        
-        return {"meal_plan": meal_plan}  # Wrap the meal_plan in an object
+        # The current plan, generated first if the user has none yet
+        cache_key = plan_version(user_id, user, snapshot)
+        plan = get_plan_cache().get(cache_key) or generate_meal_plan(user_id)
+        servings = plan["meal_plan"]
+        rows = np.array([[nutrition.index[servings[name][slot]["name"].lower()] for slot in MEAL_TYPES]
+                         for name in DAYS_OF_WEEK], dtype=np.int64)
+        portions = np.array([[servings[name][slot].get("portions", 1) for slot in MEAL_TYPES]
+                             for name in DAYS_OF_WEEK], dtype=np.int64)
+
+        recipe_row = None
+        if recipe is not None:
+            recipe_row = nutrition.index.get(recipe.lower())
+            if recipe_row is None:
+                raise HTTPException(status_code=404, detail=f"Recipe '{recipe}' not found.")
+
+        goals = get_nutritional_goals(dietary_goal, load_diet_preferences())
+        pantry = get_pantry_vector(matrix, user_id)
+        try:
+            choice = swap_meal(
+                nutrition,
+                dietary_goal,
+                max_calories=goals["calories"],
+                protein_floor=PROTEIN_GOAL_RATIO * goals["protein"],
+                day_rows=rows[d],
+                day_portions=portions[d],
+                slot=m,
+                week_rows=rows.ravel(),
+                coverage_of=lambda candidates: matrix.coverage(pantry, candidates),
+                recipe_row=recipe_row,
+            )
+        except PlannerError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        # Grocery delta: only the ingredients of the outgoing and incoming recipes can change
+        old_row, old_portions = int(rows[d, m]), int(portions[d, m])
+        columns = matrix.recipe_columns([old_row, choice.row])
+        counts = matrix.counts(np.repeat(rows.ravel(), portions.ravel()))
+        missing_before = np.maximum(matrix.requirements(counts, columns) - pantry[columns], 0.0)
+        counts[old_row] -= old_portions
+        counts[choice.row] += choice.portions
+        missing_after = np.maximum(matrix.requirements(counts, columns) - pantry[columns], 0.0)
+        grocery_delta = [
+            {
+                "ingredient": matrix.vocabulary[column],
+                "missing_amount": float(after),
+                "change": float(after - before),
+                "unit": "grams",
+            }
+            for column, before, after in zip(columns, missing_before, missing_after)
+            if after != before
+        ]
+
+        previous = servings[day][meal]
+        serving = scale_recipe(snapshot.recipes[nutrition.names[choice.row]], choice.portions)
+        servings[day][meal] = serving
+
+        # The saved grocery list only needs the delta, unless it belongs to another plan
+        stored = stored_plan(user, cache_key[:-1])
+        if stored is not None and stored.get("revision", 0) == cache_key[-1] and "grocery_list" in stored:
+            grocery_list = apply_grocery_delta(stored["grocery_list"], grocery_delta)
+        else:
+            grocery_list = compute_grocery_list(plan_recipes(servings), user_id)
+        version = cache_key[:-1] + (cache_key[-1] + 1,)
+        save_plan(user_id, user, version, plan, grocery_list)
+        get_plan_cache().put(version, plan)
+
+        rows[d, m], portions[d, m] = choice.row, choice.portions
+        return {
+            "day": day,
+            "meal": meal,
+            "previous": previous,
+            "serving": serving,
+            "objective": choice.objective,
+            "day_totals": nutrition.as_dict(nutrition.totals(rows[d], portions[d])),
+            "grocery_delta": grocery_delta,
+        }
+
+@router.post("/meal-plan/{day}/{meal}/swap")
+async def swap_meal_plan_meal(day: str, meal: str, background_tasks: BackgroundTasks,
+                              request: Optional[MealSwapRequest] = None, user_id: Optional[str] = None):
+    """
+    Swap one meal of the user's weekly plan without re-planning the week.
+
+    Args:
+        day (str): Day of the week.
+        meal (str): Breakfast, Lunch or Dinner.
+        background_tasks (BackgroundTasks): Tasks run after the response is sent.
+        request (Optional[MealSwapRequest]): Recipe to serve instead; the best fitting one when omitted.
+        user_id (Optional[str]): User whose plan is changed; defaults to the default user.
+
+    Returns:
+        Dict[str, Any]: See `swap_planned_meal`.
+    """
+    recipe = request.recipe if request else None
+    result = await run_in_executor(planner_executor, swap_planned_meal, day, meal, recipe, user_id)
+    if PLAN_EXPORT:
+        background_tasks.add_task(get_plan_exporter().export, user_id)
+    return result
+
+@router.get("/meal-plan/cache-stats")
+async def get_meal_plan_cache_stats():
+    """
+    Report the meal plan cache's hit and miss counters.
+
+    Returns:
+        Dict[str, Any]: `hits`, `misses`, `hit_rate`, `size`, `max_entries` and `ttl`.
+    """
+    return get_plan_cache().stats()
+
+def resolve_batch_jobs(
+    request: BatchMealPlanRequest,
+) -> Tuple[RecipeSnapshot, List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Resolve the users of a batch request to planning jobs.
+
+    Every job is scored against its own user's pantry and seeded like GET
+    /meal-plan (unless the request gives a seed), so a user gets the same
+    plan from both endpoints.
+
+    Args:
+        request (BatchMealPlanRequest): User ids and/or diet profiles to plan for.
+
+    Returns:
+        Tuple: The catalog snapshot, the planning jobs and the error lines of
+        users that cannot be planned.
+    """
+    try:
+        diet_preferences = load_diet_preferences()
+        repository = get_user_repository()
+        users = {user_id: repository.get(user_id) for user_id in dict.fromkeys(request.user_ids)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    snapshot = get_recipe_snapshot()
+    coverages: Dict[str, np.ndarray] = {}
+
+    def pantry_coverage(user_id: str) -> np.ndarray:
+        if user_id not in coverages:
+            coverages[user_id] = snapshot.ingredients.coverage(get_pantry_vector(snapshot.ingredients, user_id))
+        return coverages[user_id]
+
+    # Resolve every requested user to a planning job; invalid ones are reported without planning
+    jobs = []
+    errors = []
+    entries = [(user_id, users.get(user_id), None) for user_id in request.user_ids]
+    entries += [(profile.id or f"profile-{i}", profile.model_dump(), profile.nutritionalGoals)
+                for i, profile in enumerate(request.profiles)]
+    for key, user, goals in entries:
+        if not user:
+            errors.append({"user_id": key, "error": f"User '{key}' not found"})
+            continue
+        dietary_goal = user.get("dietaryGoal")
+        if not dietary_goal:
+            errors.append({"user_id": key, "error": "User does not have a dietary goal set"})
+            continue
+        try:
+            goals = goals or get_nutritional_goals(dietary_goal, diet_preferences)
+        except HTTPException as e:
+            errors.append({"user_id": key, "dietaryGoal": dietary_goal, "error": e.detail})
+            continue
+        if not goals.get("calories") or not goals.get("protein"):
+            errors.append({"user_id": key, "dietaryGoal": dietary_goal,
+                           "error": "Incomplete nutritional goals for the user's diet"})
+            continue
+        jobs.append({
+            "key": len(jobs),
+            "user_id": key,
+            "diet": dietary_goal,
+            "max_calories": goals["calories"],
+            "protein_floor": PROTEIN_GOAL_RATIO * goals["protein"],
+            "days": len(DAYS_OF_WEEK),
+            "meals_per_day": len(MEAL_TYPES),
+            "seed": plan_seed(key) if request.seed is None else request.seed,
+            "coverage": pantry_coverage(key),
+        })
+    return snapshot, jobs, errors
+
+@router.post("/meal-plan/batch")
+async def create_meal_plans_batch(request: BatchMealPlanRequest):
+    """
+    Generate weekly meal plans for many users in one call.
+
+    Users are given either by id (as stored in the user repository) or as inline
+    diet profiles. Planning runs on a process pool that shares the loaded catalog's
+    nutrition matrix, and each plan is streamed back as one NDJSON line as soon as
+    it is ready, so results arrive in completion order rather than request order.
+
+    Args:
+        request (BatchMealPlanRequest): User ids and/or diet profiles to plan for.
+
+    Returns:
+        StreamingResponse: NDJSON lines with `user_id`, `dietaryGoal` and either
+        `meal_plan`, `objective` and `status`, or an `error`.
+    """
+    if not request.user_ids and not request.profiles:
+        raise HTTPException(status_code=400, detail="Provide at least one user id or diet profile")
+
+    snapshot, jobs, errors = await run_in_threadpool(resolve_batch_jobs, request)
+
+    futures = []
+    if jobs:
+        futures = await run_in_threadpool(get_planner_pool().submit, snapshot.version, snapshot.nutrition, jobs)
+
+    async def stream() -> AsyncIterator[str]:
+        for error in errors:
+            yield json.dumps(error) + "\n"
+        for next_chunk in asyncio.as_completed([asyncio.wrap_future(future) for future in futures]):
+            for result in await next_chunk:
+                job = jobs[result["key"]]
+                line = {"user_id": job["user_id"], "dietaryGoal": job["diet"]}
+                if "error" in result:
+                    line["error"] = result["error"]
+                else:
+                    line["meal_plan"] = build_meal_plan(
+                        snapshot.recipes, snapshot.nutrition, result["rows"], result["portions"]
+                    )
+                    line["objective"] = result["objective"]
+                    line["status"] = result["status"]
+                yield json.dumps(line) + "\n"
 
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
@@ -1,62 +1,117 @@
-import csv 
 from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Tuple
-from recipes import RECIPES_DATABASE, get_recipe_by_name
+from pydantic import BaseModel, Field
+from typing import Any, List, Dict, Optional, Tuple, Union
+from .meal_plan import (
+    DAYS_OF_WEEK, MEAL_TYPES, generate_meal_plan, get_meal_plan_version, get_nutritional_goals,
+    load_diet_preferences, load_user
+)
+from .recipes import get_recipe_snapshot
 from collections import defaultdict
+import numpy as np
+from services.catalog import RecipeSnapshot
+from services.nutrition_ledger import NutritionLedger, get_ledger_store
+from services.nutrition_matrix import NutritionMatrix, NUTRIENTS, RECIPE_FIELDS
+from services.user_store import DEFAULT_USER_ID
+from services.units import convert_to_grams
 
 router = APIRouter()
 
-def calculate_nutritional_value(meals: List[str]) -> Dict[str, float]:
+# Longest meal list accepted in one request (90 days of three meals fit comfortably)
+MAX_MEALS = 5000
+
+class NutritionRequest(BaseModel):
+    meals: List[str] = Field(..., max_length=MAX_MEALS)
+    meals_per_day: int = Field(len(MEAL_TYPES), ge=1, le=12)
+
+def resolve_meals(meals: List[str], snapshot: RecipeSnapshot) -> Tuple[np.ndarray, Dict[str, str], Dict[str, List[str]]]:
     """
-    Calculate the total nutritional values for a list of meals.
+    Resolve meal names to nutrition matrix rows.
+
+    Exact (case-insensitive) names are looked up directly; the others are
+    taken for a recipe only when they are a close misspelling of its name
+    (see RecipeNameIndex.resolve), once per distinct name. Names that do not
+    resolve get suggestions instead.
+
+    Args:
+        meals (List[str]): Meal names.
+        snapshot (RecipeSnapshot): Catalog snapshot to resolve against.
+
+    Returns:
+        Tuple[np.ndarray, Dict[str, str], Dict[str, List[str]]]: Row per meal (-1 when unknown),
+        the recipe name each misspelled meal was resolved to, and suggested names per unknown meal.
+    """
+    rows = snapshot.nutrition.rows(meals)
+    resolved = {}
+    suggestions = {}
+    unknown = np.flatnonzero(rows < 0)
+    if unknown.size:
+        names, inverse = np.unique(np.asarray(meals, dtype=object)[unknown], return_inverse=True)
+        matches = [snapshot.names.resolve(name) for name in names]
+        for name, match in zip(names, matches):
+            if match is not None:
+                resolved[name] = snapshot.names.names[match]
+            else:
+                suggestions[name] = snapshot.names.suggest(name)
+        rows[unknown] = np.array([-1 if match is None else match for match in matches], dtype=np.int64)[inverse]
+    return rows, resolved, suggestions
+
+def calculate_nutritional_value(meals: List[str], meals_per_day: int = len(MEAL_TYPES)) -> Dict[str, Any]:
+    """
+    Calculate the nutritional values of a list of meals, in total, per day and per meal of the day.
+
+    Meals are taken in order, `meals_per_day` to a day; all sums come from a
+    single (days x meals x nutrients) array built from the nutrition matrix.
 
     Args:
         meals (List[str]): List of meal names.
+        meals_per_day (int): Meals per day; with three, they are breakfast, lunch and dinner.
 
     Returns:
-        Dict[str, float]: Total nutritional values (calories, protein, carbs, fat).
-    """
-    # Initialize total nutritional values
-    total_nutrition = {
-        "calories": 0.0,
-        "protein": 0.0,
-        "carbs": 0.0,
-        "fat": 0.0,
-    }
+        Dict[str, Any]: The totals (calories, protein, carbs, fat), `per_day` totals,
+        `per_meal` totals by meal of the day, the `unknown` meals (left out) and the
+        meals `resolved` to a differently spelled recipe and `suggestions` for the unknown ones.
+    """
+    snapshot = get_recipe_snapshot()
+    rows, resolved, suggestions = resolve_meals(meals, snapshot)
+    known = rows >= 0
 
-    missing_recipes = []
-
-    for meal in meals:
-        recipe = get_recipe_by_name(meal.lower())
-        if recipe:
-            print(total_nutrition["calories"])
-            total_nutrition["calories"] += total_nutrition["calories"] + recipe.get("calories")
-            total_nutrition["protein"] += total_nutrition["protein"] + recipe.get("protein_g")
-            total_nutrition["carbs"] += total_nutrition["carbs"] + recipe.get("carbs_g")
-            total_nutrition["fat"] += total_nutrition["fat"] + recipe.get("fat_g")
-        else:
-            missing_recipes.append(meal)
-        #print name + nutrition
-        
+    days = -(-len(meals) // meals_per_day)
+    values = np.zeros((days * meals_per_day, len(NUTRIENTS)), dtype=np.float64)
+    values[np.flatnonzero(known)] = snapshot.nutrition.values[rows[known]]
+    values = values.reshape(days, meals_per_day, len(NUTRIENTS))
+
+    per_day = values.sum(axis=1)
+    per_meal = values.sum(axis=0)
+    meal_names = MEAL_TYPES if meals_per_day == len(MEAL_TYPES) else [f"Meal {m + 1}" for m in range(meals_per_day)]
 
-    if missing_recipes:
-        missing = ", ".join(missing_recipes)
-        print(f"⚠️ Recipes not found in the database: {missing}")
-    return total_nutrition
+    unknown = [meal for meal, ok in zip(meals, known) if not ok]
+
+    return {
+        **NutritionMatrix.as_dict(per_day.sum(axis=0)),
+        "per_day": [NutritionMatrix.as_dict(day) for day in per_day],
+        "per_meal": {meal: NutritionMatrix.as_dict(total) for meal, total in zip(meal_names, per_meal)},
+        "unknown": unknown,
+        "resolved": resolved,
+        "suggestions": suggestions,
+    }
 
-@router.post("/calculate-nutrition", response_model=Dict[str, float])
-def get_total_nutrition(meals: List[str]):
+@router.post("/calculate-nutrition")
+def get_total_nutrition(request: Union[NutritionRequest, List[str]]) -> Dict[str, Any]:
     """
-    Endpoint to calculate total nutritional values for a list of meals.
+    Endpoint to calculate nutritional values for a list of meals.
 
     Args:
-        meals (List[str]): List of meal names.
+        request (Union[NutritionRequest, List[str]]): The meal names and meals per day,
+            or just the list of meal names.
 
     Returns:
-        Dict[str, float]: Total nutritional values.
+        Dict[str, Any]: Total, per-day and per-meal nutritional values, see `calculate_nutritional_value`.
     """
-    total_nutrition = calculate_nutritional_value(meals)
-    return total_nutrition
+    if isinstance(request, list):
+        if len(request) > MAX_MEALS:
+            raise HTTPException(status_code=422, detail=f"At most {MAX_MEALS} meals are accepted.")
+        request = NutritionRequest(meals=request)
+    return calculate_nutritional_value(request.meals, request.meals_per_day)
 
 
 
@@ -78,34 +133,37 @@ def check_recipes_compatibility(
     Returns:
         Tuple of (is_compatible, reason, total_nutrition)
     """
-    # Initialize total required ingredients and nutrition
+    # Initialize total required ingredients
     total_required_ingredients = defaultdict(int)
-    total_nutrition = {
-        "calories": 0.0,
-        "protein": 0.0,
-        "carbs": 0.0,
-        "fat": 0.0,
-    }
-    
-    is_diet_compatible = True
-    diet_incompatibilities = []
-    
-    for recipe in recipes:
-        # Check diet type compatibility for each recipe
-        if recipe['diet'].lower() != diet_type.lower():
-            is_diet_compatible = False
-            diet_incompatibilities.append(f"Recipe '{recipe['name']}' is not suitable for {diet_type} diet.")
-            continue  # Skip incompatible recipes
-        
-        # Aggregate ingredients
-        for ingredient, amount in recipe['ingredients'].items():
+
+    # Catalog recipes are read from the snapshot's nutrition matrix by row; recipes not in the
+    # catalog (row -1) fall back to their own fields
+    nutrition = get_recipe_snapshot().nutrition
+    rows = nutrition.rows(recipe['name'] for recipe in recipes)
+    known = rows >= 0
+    values = np.zeros((len(recipes), len(NUTRIENTS)), dtype=np.float64)
+    values[known] = nutrition.values[rows[known]]
+    compatible = np.zeros(len(recipes), dtype=bool)
+    compatible[known] = nutrition.diet_mask(diet_type)[rows[known]]
+    for i in np.flatnonzero(~known):
+        values[i] = [recipes[i].get(field, 0) for field in RECIPE_FIELDS]
+        compatible[i] = recipes[i]['diet'].lower() == diet_type.lower()
+
+    # Check diet type compatibility for all recipes at once
+    is_diet_compatible = bool(compatible.all())
+    diet_incompatibilities = [
+        f"Recipe '{recipes[i]['name']}' is not suitable for {diet_type} diet."
+        for i in np.flatnonzero(~compatible)
+    ]
+
+    # Aggregate nutrition of the compatible recipes in one pass
+    nutrition_vector = values[compatible].sum(axis=0)
+    total_nutrition = NutritionMatrix.as_dict(nutrition_vector)
+
+    # Aggregate ingredients
+    for i in np.flatnonzero(compatible):
+        for ingredient, amount in recipes[i]['ingredients'].items():
             total_required_ingredients[ingredient] += amount
-        
-        # Aggregate nutrition
-        total_nutrition["calories"] += recipe.get("calories", 0)
-        total_nutrition["protein"] += recipe.get("protein_g", 0)
-        total_nutrition["carbs"] += recipe.get("carbs_g", 0)
-        total_nutrition["fat"] += recipe.get("fat_g", 0)
     
     # Check if any recipes were incompatible
     if not is_diet_compatible:
@@ -122,7 +180,7 @@ def check_recipes_compatibility(
             continue
         
         available_amount, unit = available_ingredients[ingredient]
-        available_grams = convert_to_grams(available_amount, unit)
+        available_grams = convert_to_grams(available_amount, unit, ingredient)
         
         if available_grams < required_amount:
             insufficient_ingredients.append(ingredient)
@@ -141,16 +199,12 @@ def check_recipes_compatibility(
                      if d['diet'].lower() == diet_type.lower()), None)
     if diet_info:
         goals = diet_info['nutritional_goals']
-        nutrition = total_nutrition
-        
-        if nutrition['calories'] > goals.get('calories', 0) * 0.4:
-            reasons.append("Total calories exceed 40% of daily goals.")
-        
-        for key in ['protein', 'carbs', 'fat']:
-            goal_key = f"{key}_goal" if f"{key}_goal" in goals else key
-            if key in goals and key in nutrition:
-                if nutrition[key] > goals[key] * 0.4:
-                    reasons.append(f"Total {key} exceeds 40% of daily goals.")
+
+        for key in NutritionMatrix.exceeded(nutrition_vector, goals, 0.4):
+            if key == 'calories':
+                reasons.append("Total calories exceed 40% of daily goals.")
+            else:
+                reasons.append(f"Total {key} exceeds 40% of daily goals.")
         
         if reasons:
             return False, " ".join(reasons), total_nutrition
@@ -158,26 +212,114 @@ def check_recipes_compatibility(
     # If all checks pass
     return True, "All recipes are compatible.", total_nutrition
 
+class LedgerMeal(BaseModel):
+    recipe: str
+    portions: int = Field(1, ge=1, le=10)
+
+def serving_nutrients(snapshot: RecipeSnapshot, row: int, portions: int) -> np.ndarray:
+    """Nutrients of `portions` servings of a recipe, in the ledger's order (catalog nutrients, then fiber)."""
+    return np.append(snapshot.nutrition.values[row], snapshot.fiber[row]) * portions
+
+def build_ledger(user_id: Optional[str]) -> NutritionLedger:
+    """
+    Build a user's nutrition ledger from their current meal plan and diet goals.
+
+    Args:
+        user_id (Optional[str]): User to build for; defaults to the default user.
 
+    Returns:
+        NutritionLedger: The ledger with every planned meal entered.
+    """
+    user = load_user(user_id)
+    goals = get_nutritional_goals(user.get("dietaryGoal") or "", load_diet_preferences())
+    meal_plan = generate_meal_plan(user_id)["meal_plan"]
+    snapshot = get_recipe_snapshot()
 
+    ledger = NutritionLedger(DAYS_OF_WEEK, MEAL_TYPES, goals)
+    for day, meals in meal_plan.items():
+        for meal, serving in meals.items():
+            row = snapshot.nutrition.index.get(serving["name"].lower())
+            if row is not None:
+                portions = serving.get("portions", 1)
+                ledger.set_meal(day, meal, serving["name"], serving_nutrients(snapshot, row, portions), portions)
+    return ledger
 
+def get_ledger(user_id: Optional[str] = None) -> NutritionLedger:
+    """
+    Get a user's nutrition ledger, rebuilding it when their meal plan changed.
 
-def convert_to_grams(quantity: int, unit: str) -> float:
+    Args:
+        user_id (Optional[str]): User to look up; defaults to the default user.
+
+    Returns:
+        NutritionLedger: The user's ledger.
     """
-    Convert various units to grams for comparison.
-    
+    version = get_meal_plan_version(user_id)
+    return get_ledger_store().get(user_id or DEFAULT_USER_ID, version, lambda: build_ledger(user_id))
+
+@router.get("/nutrition/ledger")
+def get_nutrition_ledger(user_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Report a user's daily and weekly nutrition totals and their deviation from the diet's goals.
+
+    Fiber is estimated from the recipes' ingredients.
+
     Args:
-        quantity: Amount of ingredient
-        unit: Unit of measurement
-        
+        user_id (Optional[str]): User to report on; defaults to the default user.
+
     Returns:
-        Equivalent amount in grams
-    """
-    conversion_rates = {
-        "grams": 1,
-        "ml": 1,  # Assuming density of 1g/ml for liquids
-        "pieces": 100,  # Rough approximation
-        "cups": 240,
-        "tablespoons": 15
-    }
-    return quantity * conversion_rates.get(unit, 1)
\ No newline at end of file
+        Dict[str, Any]: The daily `goals`, a report per day and the `week` report.
+    """
+    return get_ledger(user_id).report()
+
+@router.put("/nutrition/ledger/{day}/{meal}")
+def set_ledger_meal(day: str, meal: str, request: LedgerMeal, user_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Add or swap one meal in a user's ledger; only that day's and the week's totals are updated.
+
+    Args:
+        day (str): Day of the week.
+        meal (str): Breakfast, Lunch or Dinner.
+        request (LedgerMeal): The recipe and its portions.
+        user_id (Optional[str]): User to update; defaults to the default user.
+
+    Returns:
+        Dict[str, Any]: The updated `day` report and `week` report.
+
+    Raises:
+        HTTPException: If the recipe, day or meal is unknown.
+    """
+    ledger = get_ledger(user_id)
+    snapshot = get_recipe_snapshot()
+    row = snapshot.nutrition.index.get(request.recipe.lower())
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Recipe '{request.recipe}' not found.")
+    recipe = snapshot.recipes[snapshot.nutrition.names[row]]["name"]
+    try:
+        ledger.set_meal(day, meal, recipe, serving_nutrients(snapshot, row, request.portions), request.portions)
+        return {"day": ledger.day_report(day), "week": ledger.week_report()}
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+@router.delete("/nutrition/ledger/{day}/{meal}")
+def remove_ledger_meal(day: str, meal: str, user_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Remove one meal from a user's ledger.
+
+    Args:
+        day (str): Day of the week.
+        meal (str): Breakfast, Lunch or Dinner.
+        user_id (Optional[str]): User to update; defaults to the default user.
+
+    Returns:
+        Dict[str, Any]: The updated `day` report and `week` report.
+
+    Raises:
+        HTTPException: If the day or meal is unknown.
+    """
+    ledger = get_ledger(user_id)
+    try:
+        ledger.set_meal(day, meal, None, np.zeros(len(ledger.goals)))
+        return {"day": ledger.day_report(day), "week": ledger.week_report()}
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
@@ -1,65 +1,43 @@
-import csv
-import os
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
+import math
+from fastapi import APIRouter, HTTPException, Query
+from typing import Dict, Any, List, Mapping, Optional
+import numpy as np
+from services.catalog import RecipeSnapshot, get_catalog
+from services.ingredient_registry import get_ingredient_registry
 
 
 router = APIRouter()
 
-def get_recipes() -> Dict[str, Dict[str, Any]]:
+def get_recipe_snapshot() -> RecipeSnapshot:
     """
-    Retrieve recipes from the recipes.csv file and organize them by recipe name.
+    Retrieve the current snapshot of the shared recipe catalog.
+
+    The catalog is parsed once and only reloaded when recipes.csv changes, so this
+    call does not re-parse the CSV file on every request.
 
     Returns:
-        A dictionary where each key is a recipe name (lowercased) and the value is the recipe details.
-    """
-    recipes_dict = {}
-    # Determine the path to the CSV file relative to this script
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    csv_path = os.path.join(current_dir, "../recipes.csv")  # Adjusted path to 'data' directory
+        RecipeSnapshot: The parsed recipes together with their derived views.
 
+    Raises:
+        HTTPException: If the catalog cannot be loaded.
+    """
     try:
-        with open(csv_path, "r", encoding="utf-8") as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                # Parse the Ingredients field into a dictionary
-                ingredients_str = row.get("Ingredients", "")
-                ingredients = {}
-                for item in ingredients_str.split(";"):
-                    if ":" in item:
-                        name, qty = item.strip().split(":")
-                        try:
-                            ingredients[name.strip()] = int(qty.strip())
-                        except ValueError:
-                            ingredients[name.strip()] = qty.strip()  # Handle non-integer quantities if any
-
-                # Construct the recipe dictionary
-                recipe_name = row.get("Recipe Name", "").strip()
-                if not recipe_name:
-                    continue  # Skip entries without a recipe name
-
-                recipe = {
-                    "name": recipe_name,
-                    "diet": row.get("Diet", "").strip(),
-                    "ingredients": ingredients,
-                    "calories": int(row.get("Calories", 0)),
-                    "protein_g": float(row.get("Protein (g)", 0)),
-                    "carbs_g": float(row.get("Carbs (g)", 0)),
-                    "fat_g": float(row.get("Fat (g)", 0))
-                }
-
-                recipe_name_lower = recipe_name.lower()
-                if recipe_name_lower in recipes_dict:
-                    print(f"⚠️ Duplicate recipe name found: {recipe_name}. Overwriting previous entry.")
-                recipes_dict[recipe_name_lower] = recipe
+        return get_catalog().snapshot()
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="recipes.csv file not found.")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred while processing the CSV file: {e}")
 
-    return recipes_dict
+def get_recipes() -> Mapping[str, Dict[str, Any]]:
+    """
+    Retrieve recipes from the shared recipe catalog, organized by recipe name.
 
-RECIPES_DATABASE = get_recipes()
+    The returned mapping is shared and read-only; copy a recipe before modifying it.
+
+    Returns:
+        A mapping where each key is a recipe name (lowercased) and the value is the recipe details.
+    """
+    return get_recipe_snapshot().recipes
 
 
 @router.get("/recipes")
@@ -70,9 +48,149 @@ def get_recipes_endpoint() -> Dict[str, Dict]:
     Returns:
         A dictionary of recipes where keys are recipe names and values are recipe details.
     """
-    if not RECIPES_DATABASE:
+    recipes = get_recipes()
+    if not recipes:
         raise HTTPException(status_code=404, detail="No recipes found.")
-    return RECIPES_DATABASE
+    return dict(recipes)
+
+def parse_have(have: str) -> Dict[str, float]:
+    """
+    Parse the `have` query parameter of the recipe search.
+
+    Args:
+        have (str): Comma-separated ingredients, each optionally with the grams on hand
+            (e.g. "tofu:300,broccoli"). Without an amount the ingredient counts as plentiful.
+
+    Returns:
+        Dict[str, float]: Grams on hand keyed by canonical ingredient name.
+
+    Raises:
+        HTTPException: If an amount is not a number.
+    """
+    registry = get_ingredient_registry()
+    available = {}
+    for item in have.split(","):
+        name, _, amount = item.partition(":")
+        name = registry.canonical(name)
+        if not name:
+            continue
+        try:
+            grams = float(amount) if amount.strip() else math.inf
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid amount '{amount}' for ingredient '{name}'.")
+        available[name] = available.get(name, 0.0) + grams
+    return available
+
+def rank_recipes(
+    available_grams: Mapping[str, float],
+    min_coverage: float = 0.0,
+    limit: int = 20,
+    diet: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Rank recipes by the fraction of their required grams that is already on hand.
+
+    Args:
+        available_grams (Mapping[str, float]): Grams on hand keyed by ingredient name (any spelling).
+        min_coverage (float): Only return recipes covered at least this much (0 to 1).
+        limit (int): Maximum number of recipes.
+        diet (Optional[str]): Only return recipes of this diet.
+
+    Returns:
+        List[Dict[str, Any]]: Recipes, best covered first, with their `name`, `diet`,
+        `coverage` and the `missing` ingredients (grams still needed).
+    """
+    snapshot = get_recipe_snapshot()
+    matrix = snapshot.ingredients
+    rows, coverage = matrix.search(available_grams)
+
+    keep = (coverage >= min_coverage) & (coverage > 0)
+    if diet:
+        keep &= snapshot.nutrition.diet_mask(diet)[rows]
+    rows, coverage = rows[keep], coverage[keep]
+
+    # Only the top `limit` matches need a full sort
+    if rows.size > limit:
+        top = np.argpartition(-coverage, limit - 1)[:limit]
+        rows, coverage = rows[top], coverage[top]
+    order = np.lexsort((rows, -coverage))
+
+    # Grams on hand per ingredient column, so missing amounts are a join on column ids
+    on_hand = matrix.pantry_vector(available_grams)
+
+    results = []
+    for row, score in zip(rows[order], coverage[order]):
+        recipe = snapshot.recipes[snapshot.nutrition.names[row]]
+        start, end = matrix.quantities.indptr[row], matrix.quantities.indptr[row + 1]
+        columns, grams = matrix.quantities.indices[start:end], matrix.quantities.data[start:end]
+        short = grams > on_hand[columns]
+        missing = {
+            matrix.vocabulary[column]: float(needed - on_hand[column])
+            for column, needed in zip(columns[short], grams[short])
+        }
+        results.append({
+            "name": recipe["name"],
+            "diet": recipe["diet"],
+            "coverage": round(float(score), 4),
+            "missing": missing
+        })
+    return results
+
+# Declared before /recipes/{recipe_name} so "autocomplete" is not taken for a recipe name
+@router.get("/recipes/autocomplete")
+def autocomplete_recipes(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50)
+) -> List[Dict[str, Any]]:
+    """
+    Suggest recipe names for a partial or misspelled query.
+
+    Names with a word starting with the query come first; when there are too
+    few, names sharing the most character trigrams with it fill the list.
+
+    Args:
+        q (str): What the user typed so far.
+        limit (int): Maximum number of suggestions.
+
+    Returns:
+        A list of suggestions with the recipe `name` and a `score` between 0 and 1.
+    """
+    snapshot = get_recipe_snapshot()
+    return [
+        {"name": snapshot.names.names[row], "score": score}
+        for row, score in snapshot.names.search(q, limit)
+    ]
+
+# Declared before /recipes/{recipe_name} so "search" is not taken for a recipe name
+@router.get("/recipes/search")
+def search_recipes_endpoint(
+    have: Optional[str] = None,
+    min_coverage: float = Query(0.0, ge=0.0, le=1.0),
+    limit: int = Query(20, ge=1, le=100),
+    diet: Optional[str] = None,
+    user_id: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Find the recipes that can be cooked with the ingredients on hand.
+
+    Args:
+        have (Optional[str]): Ingredients on hand, e.g. "tofu:300,broccoli" (grams; no amount
+            means plentiful). Defaults to the user's pantry.
+        min_coverage (float): Minimum fraction of a recipe's grams on hand.
+        limit (int): Maximum number of recipes.
+        diet (Optional[str]): Only return recipes of this diet.
+        user_id (Optional[str]): Whose pantry to use when `have` is not given; defaults to the default user.
+
+    Returns:
+        A list of recipes ranked by coverage, see `rank_recipes`.
+    """
+    if have is None:
+        # Imported here because routes.ingredients imports this module
+        from .ingredients import get_pantry_grams
+        available_grams = get_pantry_grams(user_id)
+    else:
+        available_grams = parse_have(have)
+    return rank_recipes(available_grams, min_coverage, limit, diet)
 
 @router.get("/recipes/{recipe_name}")
 def get_recipe_by_name(recipe_name: str) -> Dict:
@@ -88,7 +206,7 @@ def get_recipe_by_name(recipe_name: str) -> Dict:
     Raises:
         HTTPException: If the recipe is not found.
     """
-    recipe = RECIPES_DATABASE.get(recipe_name.lower())
+    recipe = get_recipes().get(recipe_name.lower())
     if not recipe:
         raise HTTPException(status_code=404, detail=f"Recipe '{recipe_name}' not found.")
     return recipe
@@ -1,8 +1,12 @@
+import anyio
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Optional
 import json
 import os
+from services.plan_cache import get_plan_cache
+from services.user_store import DEFAULT_USER_ID, get_user_repository
 
 router = APIRouter()
 
@@ -15,22 +19,26 @@ class UserPreferences(BaseModel):
 
 # Route to get current user preferences
 @router.get("/preferences")
-def get_preferences():
-    """Get the current user preferences."""
+async def get_preferences(user_id: Optional[str] = None):
+    """Get the preferences of the given user, or of the default user if none is given."""
     try:
         current_dir = os.path.dirname(os.path.abspath(__file__))
-        user_data_path = os.path.join(current_dir, "../user_data.json")
         diet_preferences_path = os.path.join(current_dir, "../diet_preferences.json")
 
         # Read current user data
-        with open(user_data_path, "r") as f:
-            user_data = json.load(f)
+        repository = get_user_repository()
+        if user_id:
+            user = await run_in_threadpool(repository.get, user_id)
+        else:
+            user = await run_in_threadpool(repository.get_default)
 
         # Read diet preferences for reference
-        with open(diet_preferences_path, "r") as f:
-            diet_preferences = json.load(f)
+        async with await anyio.open_file(diet_preferences_path, "r") as f:
+            diet_preferences = json.loads(await f.read())
 
-        if not user_data.get("users"):
+        if user is None:
+            if user_id:
+                raise HTTPException(status_code=404, detail=f"User '{user_id}' not found")
             # Initialize with default preferences if no user exists
             return {
                 "name": "",
@@ -38,9 +46,6 @@ def get_preferences():
                 "nutritionalGoals": diet_preferences["user_preferences"][0]["nutritional_goals"]
             }
 
-        # Return first user's preferences (single user system)
-        user = user_data["users"][0]
-
         # Get the nutritional goals for the user's dietary goal
         user_pref = next(
             (pref for pref in diet_preferences["user_preferences"]
@@ -54,25 +59,17 @@ def get_preferences():
             "nutritionalGoals": user_pref["nutritional_goals"]
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # Route to update user preferences
 @router.post("/preferences")
-def update_preferences(preferences: UserPreferences):
-    """Update the user preferences."""
+async def update_preferences(preferences: UserPreferences, user_id: Optional[str] = None):
+    """Update the preferences of the given user, or of the default user if none is given."""
     try:
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        file_path = os.path.join(current_dir, "../user_data.json")
-
-        # Initialize or load existing data
-        if not os.path.exists(file_path):
-            data = {"users": []}
-        else:
-            with open(file_path, "r") as f:
-                data = json.load(f)
-
         # Create/update user preferences
         new_user = {
             "name": preferences.name,
@@ -80,15 +77,10 @@ def update_preferences(preferences: UserPreferences):
             "currentMealPlan": {}  # Initialize empty meal plan
         }
 
-        if not data["users"]:
-            data["users"].append(new_user)
-        else:
-            # Update existing user (first user in single user system)
-            data["users"][0] = new_user
+        await run_in_threadpool(get_user_repository().save, new_user, user_id)
 
-        # Write updated data back to file
-        with open(file_path, "w") as f:
-            json.dump(data, f, indent=4)
+        # The user's cached meal plans were made for the old preferences
+        get_plan_cache().invalidate(user_id or DEFAULT_USER_ID)
 
         return {"message": "Preferences updated successfully"}
 
@@ -0,0 +1,48 @@
+"""
+Benchmark /api/chat offline against the replay LLM backend.
+
+Run from the backend root:
+    LLM_BACKEND=replay python -m scripts.bench_chat --requests 200 --concurrency 16
+"""
+import argparse
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("LLM_BACKEND", "replay")
+
+from fastapi.testclient import TestClient
+from main import app
+
+MESSAGES = ["Hello", "What meals do I have this week?", "What should I eat on Friday?"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100, help="Number of chat requests to send")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight at once")
+    parser.add_argument("--stream", action="store_true", help="Benchmark /api/chat/stream instead of /api/chat")
+    args = parser.parse_args()
+
+    path = "/api/chat/stream" if args.stream else "/api/chat"
+    with TestClient(app) as client:
+        def send(i):
+            started = time.perf_counter()
+            response = client.post(path, json={"message": MESSAGES[i % len(MESSAGES)]})
+            response.raise_for_status()
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            latencies = sorted(pool.map(send, range(args.requests)))
+        elapsed = time.perf_counter() - started
+
+    print(f"{args.requests} requests to {path} in {elapsed:.2f}s ({args.requests / elapsed:.1f} req/s)")
+    print(f"latency p50 {statistics.median(latencies) * 1000:.1f} ms, "
+          f"p95 {latencies[int(0.95 * (len(latencies) - 1))] * 1000:.1f} ms, "
+          f"max {latencies[-1] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
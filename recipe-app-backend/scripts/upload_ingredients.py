@@ -1,44 +1,193 @@
+"""
+Bulk-load ingredients from a CSV or Parquet file into a user's pantry in the database.
+
+The file is streamed in chunks, so memory stays flat whatever its size. Each
+chunk is validated with vectorized pandas operations, then upserted in one
+statement (COPY into a staging table on PostgreSQL with psycopg2,
+multi-row INSERT ... ON CONFLICT batches elsewhere) and committed. Invalid rows
+are skipped and counted. Columns are `Ingredient`, `Quantity` and `Unit`
+(or `name`, `quantity` and `unit`).
+
+Run from the backend root:
+    python -m scripts.upload_ingredients available_ingredients.csv --user alex --chunk-size 50000
+"""
+import argparse
+import io
+import os
+import sys
+import time
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine, Column, Integer, String, Float
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection, Engine
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from config import DATABASE_URL
+from db import Base
+from models import Ingredient
+from services.ingredient_registry import get_ingredient_registry
+from services.pantry_store import upsert_statement
+from services.units import normalize_unit
+from services.user_store import DEFAULT_USER_ID
+
+COLUMNS = {"Ingredient": "name", "Quantity": "quantity", "Unit": "unit"}
+
+# Rows per chunk read, validated and committed together
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+def read_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Stream a CSV or Parquet file in chunks of at most `chunk_size` rows.
+
+    Args:
+        path (str): File to read; ".parquet" and ".pq" files are read as Parquet, anything else as CSV.
+        chunk_size (int): Rows per chunk.
+
+    Yields:
+        pd.DataFrame: The next chunk, with string columns left unparsed.
+    """
+    if path.endswith((".parquet", ".pq")):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size, dtype=str, keep_default_na=False, skipinitialspace=True)
+
+
+def validate_chunk(chunk: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
+    """
+    Canonicalize and check a chunk of ingredient rows.
+
+    Names and units are normalized once per distinct value and mapped back
+    onto the column; quantities are parsed in one vectorized call. A row is
+    kept when it has a name, a known unit and a finite, non-negative quantity.
+    Within the chunk, the last row of an ingredient wins.
+
+    Args:
+        chunk (pd.DataFrame): Rows with Ingredient/Quantity/Unit (or name/quantity/unit) columns.
+
+    Returns:
+        Tuple[pd.DataFrame, int]: The valid rows (`name`, `quantity`, `unit`) and the number of invalid rows.
+
+    Raises:
+        ValueError: If a column is missing.
+    """
+    chunk = chunk.rename(columns=COLUMNS)
+    missing = set(COLUMNS.values()) - set(chunk.columns)
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(sorted(missing))}")
+
+    registry = get_ingredient_registry()
+    raw_names = chunk["name"].astype(str)
+    names = raw_names.map({raw: registry.canonical(raw) for raw in raw_names.unique()})
+    raw_units = chunk["unit"].astype(str)
+    units = raw_units.map({raw: normalize_unit(raw) for raw in raw_units.unique()})
+    quantities = pd.to_numeric(chunk["quantity"], errors="coerce").to_numpy(dtype=np.float64)
+
+    valid = (names != "").to_numpy() & units.notna().to_numpy() & np.isfinite(quantities) & (quantities >= 0)
+    rows = pd.DataFrame({"name": names[valid], "quantity": quantities[valid], "unit": raw_units[valid].str.strip()})
+    rows = rows.drop_duplicates(subset="name", keep="last")
+    return rows, int((~valid).sum())
+
+
+def _copy_upsert(connection: Connection, rows: pd.DataFrame) -> bool:
+    """Upsert through COPY into a staging table; returns False if the driver cannot COPY."""
+    driver_connection = connection.connection.driver_connection
+    cursor = driver_connection.cursor()
+    if not hasattr(cursor, "copy_expert"):  # psycopg2 only
+        return False
+    buffer = io.StringIO()
+    rows.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    connection.execute(text(
+        "CREATE TEMP TABLE IF NOT EXISTS ingredients_load "
+        "(user_id TEXT, name TEXT, quantity DOUBLE PRECISION, unit TEXT, revision BIGINT) ON COMMIT DELETE ROWS"
+    ))
+    cursor.copy_expert("COPY ingredients_load (user_id, name, quantity, unit, revision) FROM STDIN WITH CSV", buffer)
+    connection.execute(text(
+        "INSERT INTO ingredients (user_id, name, quantity, unit, revision) "
+        "SELECT user_id, name, quantity, unit, revision FROM ingredients_load "
+        "ON CONFLICT (user_id, name) DO UPDATE SET "
+        "quantity = EXCLUDED.quantity, unit = EXCLUDED.unit, revision = EXCLUDED.revision"
+    ))
+    return True
+
+
+def load_chunk(connection: Connection, user_id: str, rows: pd.DataFrame) -> None:
+    """
+    Upsert validated rows into a user's pantry.
+
+    Args:
+        connection (Connection): Connection with an open transaction.
+        user_id (str): Owner of the pantry.
+        rows (pd.DataFrame): Rows from `validate_chunk`.
 
-# Create SQLAlchemy engine and session
-engine = create_engine(DATABASE_URL)
-Session = sessionmaker(bind=engine)
-session = Session()
+    Raises:
+        RuntimeError: If the database has no ON CONFLICT clause.
+    """
+    rows = rows.assign(revision=time.time_ns())
+    rows.insert(0, "user_id", user_id)
+    dialect = connection.dialect.name
+    if dialect == "postgresql" and _copy_upsert(connection, rows):
+        return
+    statement = upsert_statement(dialect)
+    if statement is None:
+        raise RuntimeError(f"Bulk upserts are not supported on {dialect}; use PUT /api/ingredients instead")
+    connection.execute(statement, rows.to_dict("records"))
 
-# Define the Ingredient model
-Base = declarative_base()
 
-class Ingredient(Base):
-    __tablename__ = 'ingredients'
+def upload(path: str, user_id: str, engine: Engine, chunk_size: int = DEFAULT_CHUNK_SIZE,
+           quiet: bool = False) -> Tuple[int, int, int, float]:
+    """
+    Stream a file into a user's pantry, committing chunk by chunk.
 
-    id = Column(Integer, primary_key=True)
-    name = Column(String, nullable=False)
-    quantity = Column(Float, nullable=False)
-    unit = Column(String, nullable=False)
+    Args:
+        path (str): CSV or Parquet file.
+        user_id (str): Owner of the pantry.
+        engine (Engine): Database to load into; the `ingredients` table is created if needed.
+        chunk_size (int): Rows per chunk.
+        quiet (bool): Only return the totals instead of reporting every chunk.
 
-# Create the table
-Base.metadata.create_all(engine)
+    Returns:
+        Tuple[int, int, int, float]: Rows read, rows upserted (an ingredient repeated within a
+        chunk counts once), rows skipped as invalid, and seconds taken.
+    """
+    Base.metadata.create_all(engine, tables=[Ingredient.__table__])
+    read = loaded = skipped = 0
+    started = time.perf_counter()
+    for chunk in read_chunks(path, chunk_size):
+        rows, invalid = validate_chunk(chunk)
+        if not rows.empty:
+            with engine.begin() as connection:
+                load_chunk(connection, user_id, rows)
+        read += len(chunk)
+        loaded += len(rows)
+        skipped += invalid
+        if not quiet:
+            elapsed = time.perf_counter() - started
+            print(f"{read} rows read, {loaded} upserted, {skipped} skipped ({read / max(elapsed, 1e-9):,.0f} rows/s)")
+    return read, loaded, skipped, time.perf_counter() - started
 
-# Read CSV file
-df = pd.read_csv('available_ingredients.csv')
 
-# Upload data to the database
-for _, row in df.iterrows():
-    ingredient = Ingredient(
-        name=row['Ingredient'],
-        quantity=row['Quantity'],
-        unit=row['Unit']
-    )
-    session.add(ingredient)
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", nargs="?", default="available_ingredients.csv", help="CSV or Parquet file to load")
+    parser.add_argument("--user", default=DEFAULT_USER_ID, help="Owner of the pantry")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per chunk")
+    parser.add_argument("--database-url", default=DATABASE_URL, help="Database to load into (defaults to DB_URL)")
+    parser.add_argument("--quiet", action="store_true", help="Only report the totals")
+    args = parser.parse_args(argv)
 
-# Commit the changes
-session.commit()
+    engine = create_engine(args.database_url)
+    read, loaded, skipped, elapsed = upload(args.path, args.user, engine, args.chunk_size, args.quiet)
+    print(f"{read} rows read in {elapsed:.2f}s ({read / max(elapsed, 1e-9):,.0f} rows/s): "
+          f"{loaded} ingredients upserted for '{args.user}', {skipped} invalid rows skipped")
 
-print("Ingredients have been successfully uploaded to the database.")
 
-# Close the session
-session.close()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import csv
+import os
+import threading
+from dataclasses import dataclass
+from functools import cached_property
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+import numpy as np
+from .ingredient_matrix import IngredientMatrix
+from .fiber import estimate_fiber
+from .ingredient_registry import get_ingredient_registry
+from .name_index import RecipeNameIndex
+from .nutrition_matrix import NutritionMatrix
+
+# Default location of the recipe catalog, relative to the backend root
+RECIPES_CSV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "recipes.csv")
+
+
+def parse_recipes(csv_path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Parse a recipes CSV file and organize the recipes by name.
+
+    Args:
+        csv_path (str): Path to the recipes CSV file.
+
+    Returns:
+        A dictionary where each key is a recipe name (lowercased) and the value is the recipe details.
+        Ingredient names are canonicalized (see services.ingredient_registry).
+    """
+    registry = get_ingredient_registry()
+    recipes_dict = {}
+    with open(csv_path, "r", encoding="utf-8") as csvfile:
+        reader = csv.DictReader(csvfile)
+        for row in reader:
+            # Parse the Ingredients field into a dictionary
+            ingredients_str = row.get("Ingredients", "")
+            ingredients = {}
+            for item in ingredients_str.split(";"):
+                if ":" in item:
+                    name, qty = item.strip().split(":")
+                    name = registry.canonical(name)
+                    try:
+                        # Spellings of the same ingredient ("tortilla", "tortillas") add up
+                        ingredients[name] = ingredients.get(name, 0) + int(qty.strip())
+                    except (ValueError, TypeError):
+                        ingredients[name] = qty.strip()  # Handle non-integer quantities if any
+
+            # Construct the recipe dictionary
+            recipe_name = row.get("Recipe Name", "").strip()
+            if not recipe_name:
+                continue  # Skip entries without a recipe name
+
+            recipe = {
+                "name": recipe_name,
+                "diet": row.get("Diet", "").strip(),
+                "ingredients": ingredients,
+                "calories": int(row.get("Calories", 0)),
+                "protein_g": float(row.get("Protein (g)", 0)),
+                "carbs_g": float(row.get("Carbs (g)", 0)),
+                "fat_g": float(row.get("Fat (g)", 0))
+            }
+
+            recipe_name_lower = recipe_name.lower()
+            if recipe_name_lower in recipes_dict:
+                print(f"⚠️ Duplicate recipe name found: {recipe_name}. Overwriting previous entry.")
+            recipes_dict[recipe_name_lower] = recipe
+
+    return recipes_dict
+
+
+@dataclass(frozen=True)
+class RecipeSnapshot:
+    """
+    An immutable, fully parsed view of the recipe catalog.
+
+    Recipe dictionaries are shared between every request that holds the
+    snapshot, so callers must copy a recipe before modifying it. Derived
+    views are built lazily on first use and live exactly as long as the
+    snapshot they were built from.
+    """
+    recipes: Mapping[str, Dict[str, Any]]
+    version: int
+    mtime_ns: int
+    size: int
+
+    @cached_property
+    def nutrition(self) -> NutritionMatrix:
+        """Columnar nutrition matrix with rows in catalog order."""
+        return NutritionMatrix.from_recipes(self.recipes)
+
+    @cached_property
+    def ingredients(self) -> IngredientMatrix:
+        """Sparse recipe x ingredient gram matrix with rows in catalog order."""
+        return IngredientMatrix.from_recipes(self.recipes)
+
+    @cached_property
+    def fiber(self) -> np.ndarray:
+        """Estimated grams of fiber per recipe, with rows in catalog order."""
+        return estimate_fiber(self.ingredients)
+
+    @cached_property
+    def names(self) -> RecipeNameIndex:
+        """Prefix and fuzzy index of the recipe names with rows in catalog order."""
+        return RecipeNameIndex([recipe["name"] for recipe in self.recipes.values()])
+
+
+class RecipeCatalog:
+    """
+    Holds the parsed recipe catalog and reloads it when the CSV file changes.
+
+    Every call to `snapshot()` costs a single `os.stat`. The CSV is only
+    re-parsed when the file's mtime or size differs from the current
+    snapshot, and the new snapshot replaces the old one in a single
+    reference assignment, so readers never see a half-built catalog.
+    """
+
+    def __init__(self, csv_path: str = RECIPES_CSV_PATH):
+        self.csv_path = csv_path
+        self._snapshot: Optional[RecipeSnapshot] = None
+        self._failed_signature: Optional[Tuple[int, int]] = None
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> RecipeSnapshot:
+        """
+        Return the current snapshot, reloading it first if the file changed.
+
+        Returns:
+            RecipeSnapshot: The latest successfully parsed catalog.
+
+        Raises:
+            FileNotFoundError: If the CSV file has never been loaded and does not exist.
+        """
+        current = self._snapshot
+        try:
+            stat = os.stat(self.csv_path)
+        except FileNotFoundError:
+            if current is None:
+                raise
+            return current  # Keep serving the last good catalog
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if current is not None and (
+            signature == (current.mtime_ns, current.size) or signature == self._failed_signature
+        ):
+            return current
+
+        if current is None:
+            self._lock.acquire()
+        elif not self._lock.acquire(blocking=False):
+            return current  # Another request is already reloading; serve the old snapshot meanwhile
+
+        try:
+            current = self._snapshot
+            if current is not None and signature == (current.mtime_ns, current.size):
+                return current
+            try:
+                recipes = parse_recipes(self.csv_path)
+            except Exception as e:
+                if current is None:
+                    raise
+                print(f"⚠️ Failed to reload {self.csv_path}, keeping version {current.version}: {e}")
+                self._failed_signature = signature
+                return current
+
+            self._version += 1
+            self._failed_signature = None
+            self._snapshot = RecipeSnapshot(
+                recipes=MappingProxyType(recipes),
+                version=self._version,
+                mtime_ns=signature[0],
+                size=signature[1],
+            )
+            return self._snapshot
+        finally:
+            self._lock.release()
+
+    @property
+    def recipes(self) -> Mapping[str, Dict[str, Any]]:
+        """Recipes of the current snapshot, keyed by lowercased name."""
+        return self.snapshot().recipes
+
+    def get(self, recipe_name: str) -> Optional[Dict[str, Any]]:
+        """Look up a recipe by name (case-insensitive)."""
+        return self.snapshot().recipes.get(recipe_name.lower())
+
+
+# Global instance
+recipe_catalog = RecipeCatalog()
+
+def get_catalog() -> RecipeCatalog:
+    """Getter function for the shared recipe catalog"""
+    return recipe_catalog
@@ -0,0 +1,49 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterator, TypeVar
+
+from config import AGENT_THREADS, PLANNER_THREADS
+
+T = TypeVar("T")
+
+# Separate bounded pools keep slow LLM calls from starving meal planning and
+# leave the default threadpool free for short file and database work
+planner_executor = ThreadPoolExecutor(max_workers=PLANNER_THREADS, thread_name_prefix="planner")
+agent_executor = ThreadPoolExecutor(max_workers=AGENT_THREADS, thread_name_prefix="agent")
+
+
+async def run_in_executor(executor: ThreadPoolExecutor, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking function on the given executor without blocking the event loop.
+
+    Args:
+        executor (ThreadPoolExecutor): Pool to run the function on.
+        func (Callable[..., T]): The blocking function.
+        *args: Positional arguments for the function.
+        **kwargs: Keyword arguments for the function.
+
+    Returns:
+        T: The function's return value.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+
+async def iterate_in_executor(executor: ThreadPoolExecutor, iterator: Iterator[T]) -> AsyncIterator[T]:
+    """
+    Consume a blocking iterator on the given executor, yielding its items to async code.
+
+    Args:
+        executor (ThreadPoolExecutor): Pool that advances the iterator.
+        iterator (Iterator[T]): The blocking iterator, e.g. a generator reading a network stream.
+
+    Yields:
+        T: The iterator's items, as soon as each one is produced.
+    """
+    done = object()
+    while True:
+        item = await run_in_executor(executor, next, iterator, done)
+        if item is done:
+            return
+        yield item
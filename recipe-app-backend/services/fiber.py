@@ -0,0 +1,41 @@
+import numpy as np
+
+from .ingredient_matrix import IngredientMatrix
+
+# Dietary fiber in grams per 100 g, by canonical ingredient name (approximate USDA values).
+# recipes.csv has no fiber column, so recipe fiber is estimated from the ingredients.
+FIBER_PER_100G = {
+    "almond_flour": 10.0, "arborio_rice": 1.0, "asparagus": 2.1, "avocado": 6.7, "banana": 2.6,
+    "basil": 1.6, "bean": 6.4, "bell_pepper": 2.1, "berry": 5.3, "black_bean": 8.7, "bread": 2.7,
+    "breadcrumb": 4.5, "broccoli": 2.6, "brown_rice": 1.8, "cabbage": 2.5, "carrot": 2.8,
+    "cashew": 3.3, "cauliflower": 2.0, "cauliflower_rice": 2.0, "celery": 1.6, "cherry_tomato": 1.2,
+    "chickpea": 7.6, "cocoa": 33.0, "corn": 2.7, "couscous": 1.4, "cucumber": 0.5, "dill": 2.1,
+    "dried_fruit": 7.0, "eggplant": 3.0, "falafel": 4.9, "fennel": 3.1, "flour": 2.7, "garlic": 2.1,
+    "granola": 7.0, "grape_leaf": 11.0, "herb": 3.0, "hummus": 6.0, "jackfruit": 1.5, "kale": 4.1,
+    "lemon": 2.8, "lentil": 7.9, "lettuce": 1.3, "lime": 2.8, "low_carb_bread": 9.0,
+    "mixed_vegetable": 4.0, "mushroom": 1.0, "nori": 36.0, "nut": 7.0, "nutritional_yeast": 20.0,
+    "oat_flour": 10.0, "oats": 10.6, "olive": 3.2, "onion": 1.7, "oregano": 42.5, "pasta": 3.2,
+    "pea": 5.1, "peanut_butter": 6.0, "phyllo": 1.9, "pickle": 1.2, "pie_crust": 1.5,
+    "pine_nut": 3.7, "pita": 2.2, "pizza_dough": 2.0, "potato": 2.2, "quinoa": 2.8, "rice": 0.4,
+    "romaine": 2.1, "salsa": 1.9, "sauerkraut": 2.9, "snap_pea": 2.6, "spaghetti_squash": 1.5,
+    "spinach": 2.2, "sundried_tomato": 12.3, "sweet_potato": 3.0, "tahini": 9.3, "tempeh": 5.0,
+    "tofu": 2.3, "tomato": 1.2, "tomato_sauce": 1.5, "marinara": 1.8, "tortilla": 3.5,
+    "vegetable": 3.0, "vegan_protein": 5.0, "walnut": 6.7, "water_chestnut": 3.0, "zucchini": 1.0,
+    "zucchini_noodle": 1.0,
+}
+
+
+def estimate_fiber(ingredients: IngredientMatrix) -> np.ndarray:
+    """
+    Estimate the fiber of every recipe from its ingredient grams.
+
+    Args:
+        ingredients (IngredientMatrix): Ingredient matrix of the catalog.
+
+    Returns:
+        np.ndarray: Grams of fiber per recipe row; ingredients without an entry count as fiber-free.
+    """
+    per_gram = np.array([FIBER_PER_100G.get(name, 0.0) / 100.0 for name in ingredients.vocabulary], dtype=np.float64)
+    fiber = ingredients.quantities @ per_gram
+    fiber.flags.writeable = False
+    return fiber
@@ -0,0 +1,206 @@
+import itertools
+import re
+from fractions import Fraction
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .units import UNITS, normalize_unit
+
+# Largest quantity accepted for one entry
+MAX_QUANTITY = 10000
+
+# Lines read and validated together
+CHUNK_LINES = 10000
+
+# Columns of the error report
+ERROR_FIELDS = ["line", "input", "field", "error"]
+
+# Quantities: whole numbers, decimals, fractions ("3/4") and mixed numbers ("1 1/2")
+QUANTITY = r"[+-]?(?:\d+\s+\d+/\d+|\d+/\d+|\d+(?:\.\d*)?|\.\d+)"
+
+# Compiled once. ENTRY_PATTERN matches a well-formed "ingredient, quantity, unit" line in one
+# pass, capturing the stripped fields (units may contain spaces, as in "fl oz"); only lines it
+# rejects are checked field by field.
+INGREDIENT_NAME_PATTERN = re.compile(r"^[a-zA-Z\s'-]+$")
+QUANTITY_PATTERN = re.compile(rf"^{QUANTITY}$")
+ENTRY_PATTERN = re.compile(
+    rf"^\s*([a-zA-Z'-](?:[a-zA-Z\s'-]*[a-zA-Z'-])?)\s*,\s*({QUANTITY})\s*,\s*([^,\s](?:[^,]*[^,\s])?)\s*$"
+)
+HEADER_PATTERN = re.compile(r"^\s*ingredient\s*,\s*quantity\s*,\s*unit\s*$", re.IGNORECASE)
+
+FORMAT_ERROR = "Invalid format, required format: ingredient, quantity, unit"
+NAME_ERROR = "Invalid ingredient name, use only letters, spaces, and hyphens"
+UNIT_ERROR = f"Invalid unit, valid units are: {', '.join(UNITS)} (singular or plural)"
+
+Entry = Tuple[str, float, str]
+
+
+def validate_ingredient_name(ingredient: str) -> bool:
+    """Check that an ingredient name contains only letters, spaces, apostrophes and hyphens."""
+    return bool(INGREDIENT_NAME_PATTERN.match(ingredient))
+
+
+def validate_unit(unit: str) -> bool:
+    """Check that a unit is known to the conversion table (see services.units), in any common spelling."""
+    return bool(unit.strip()) and normalize_unit(unit) is not None
+
+
+def parse_quantity(text: str) -> Optional[float]:
+    """
+    Parse a quantity: "2", "0.5", "3/4" or "1 1/2".
+
+    Returns:
+        Optional[float]: The quantity, or None if it is not a number.
+    """
+    text = text.strip()
+    if not QUANTITY_PATTERN.match(text):
+        return None
+    sign = -1 if text.startswith("-") else 1
+    try:
+        return sign * float(sum(Fraction(part) for part in text.lstrip("+-").split()))
+    except ZeroDivisionError:
+        return None
+
+
+def validate_quantity(quantity_str: str) -> Tuple[bool, float, str]:
+    """
+    Validate that a quantity is a positive number no larger than MAX_QUANTITY.
+
+    Args:
+        quantity_str (str): The quantity as typed; fractions are accepted.
+
+    Returns:
+        Tuple[bool, float, str]: Whether it is valid, the quantity, and the error message.
+    """
+    quantity = parse_quantity(quantity_str)
+    if quantity is None:
+        return False, 0.0, "Quantity must be a number, e.g. 2, 0.5 or 1 1/2"
+    if quantity <= 0:
+        return False, 0.0, "Quantity must be a positive number"
+    if quantity > MAX_QUANTITY:
+        return False, 0.0, f"Quantity seems too large (max: {MAX_QUANTITY})"
+    return True, quantity, ""
+
+
+def validate_entry(line: str) -> Tuple[Optional[Entry], str, str]:
+    """
+    Parse and validate one "ingredient, quantity, unit" line.
+
+    Args:
+        line (str): The input line.
+
+    Returns:
+        Tuple[Optional[Entry], str, str]: The (ingredient, quantity, unit) entry with the name and
+        unit lowercased, or None; and the failing field and its error message (empty if valid).
+    """
+    parts = [part.strip() for part in line.split(",")]
+    if len(parts) != 3:
+        return None, "format", FORMAT_ERROR
+    ingredient, quantity_str, unit = parts
+    if not ingredient or not validate_ingredient_name(ingredient):
+        return None, "ingredient", NAME_ERROR
+    is_valid, quantity, error_msg = validate_quantity(quantity_str)
+    if not is_valid:
+        return None, "quantity", error_msg
+    if not validate_unit(unit):
+        return None, "unit", UNIT_ERROR
+    return (ingredient.lower(), quantity, unit.lower()), "", ""
+
+
+def validate_batch(lines: List[str], first_line: int = 1) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Validate a batch of "ingredient, quantity, unit" lines at once.
+
+    Every line is matched once against the compiled ENTRY_PATTERN; plain
+    numbers are parsed and range-checked as one column, units are checked
+    once per distinct spelling. Lines the pattern rejects are checked field
+    by field (see validate_entry); those that pass are accepted, the others
+    go to the error report with their first failing field. Empty lines and a
+    CSV header ("Ingredient,Quantity,Unit") on line 1 are ignored.
+
+    Args:
+        lines (List[str]): Raw input lines.
+        first_line (int): Line number of the first line, for the error report.
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame]: The valid entries (`ingredient`, `quantity`, `unit`)
+        and the rejected lines (`line`, `input`, `field`, `error`).
+    """
+    if first_line == 1 and lines and HEADER_PATTERN.match(lines[0]):
+        lines = [""] + lines[1:]
+    match = ENTRY_PATTERN.match
+    matches = [match(line) for line in lines]
+    matched = np.fromiter((m is not None for m in matches), dtype=bool, count=len(lines))
+    entries = pd.DataFrame(
+        [m.groups() for m in matches if m is not None],
+        columns=["ingredient", "quantity", "unit"],
+        dtype=object,
+    )
+    line_numbers = np.arange(first_line, first_line + len(lines))
+
+    # Plain numbers in one vectorized call; only fractions are parsed one by one
+    quantity = pd.to_numeric(entries["quantity"], errors="coerce").to_numpy(dtype=np.float64)
+    for i in np.flatnonzero(np.isnan(quantity)):
+        quantity[i] = parse_quantity(entries["quantity"].iat[i]) or 0.0
+    unit = entries["unit"].str.lower()
+    known_units = unit.map({spelling: validate_unit(spelling) for spelling in unit.unique()})
+
+    failed = [quantity <= 0, quantity > MAX_QUANTITY, ~known_units.to_numpy(dtype=bool)]
+    field = np.select(failed, ["quantity", "quantity", "unit"], default="")
+    error = np.select(failed, [
+        "Quantity must be a positive number",
+        f"Quantity seems too large (max: {MAX_QUANTITY})",
+        UNIT_ERROR,
+    ], default="")
+    accepted = error == ""
+    valid = pd.DataFrame({
+        "ingredient": entries["ingredient"][accepted].str.lower().to_numpy(),
+        "quantity": quantity[accepted],
+        "unit": unit[accepted].to_numpy(),
+    }, index=line_numbers[matched][accepted])
+
+    # Rejected lines: the failed checks of the well-formed ones, the others checked field by field
+    rejected = [(line, lines[line - first_line].strip(), f, e)
+                for line, f, e in zip(line_numbers[matched][~accepted], field[~accepted], error[~accepted])]
+    fallback = {}
+    for line in line_numbers[~matched]:
+        text = lines[line - first_line].strip()
+        if text:
+            entry, f, e = validate_entry(text)
+            if entry is None:
+                rejected.append((line, text, f, e))
+            else:
+                fallback[line] = entry
+    if fallback:
+        # Keep the entries in line order, so a later line still overrides an earlier one
+        extra = pd.DataFrame(list(fallback.values()), index=list(fallback), columns=valid.columns)
+        valid = pd.concat([valid, extra]).sort_index(kind="stable")
+    rejected.sort()
+    return valid.reset_index(drop=True), pd.DataFrame(rejected, columns=ERROR_FIELDS)
+
+
+def validate_stream(
+    stream: Iterable[str], chunk_lines: int = CHUNK_LINES
+) -> Iterator[Tuple[int, pd.DataFrame, pd.DataFrame]]:
+    """
+    Read and validate input in chunks of lines.
+
+    Args:
+        stream (Iterable[str]): Input lines, e.g. sys.stdin.
+        chunk_lines (int): Lines per chunk.
+
+    Yields:
+        Tuple[int, pd.DataFrame, pd.DataFrame]: Lines in the chunk, valid entries and rejected
+        lines, see validate_batch.
+    """
+    lines = iter(stream)
+    first_line = 1
+    while True:
+        chunk = list(itertools.islice(lines, chunk_lines))
+        if not chunk:
+            return
+        valid, errors = validate_batch(chunk, first_line)
+        yield len(chunk), valid, errors
+        first_line += len(chunk)
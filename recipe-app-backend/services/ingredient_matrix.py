@@ -0,0 +1,215 @@
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from .ingredient_registry import IngredientRegistry, get_ingredient_registry
+
+
+class IngredientMatrix:
+    """
+    Sparse recipe x ingredient quantity matrix.
+
+    Rows follow the catalog order (the same rows as the NutritionMatrix) and
+    columns follow the ingredient vocabulary, whose canonical names are
+    interned in the IngredientRegistry; pantries join on those integer ids.
+    Values are grams. The
+    ingredient requirements of any multiset of recipes are one sparse
+    matrix-vector product, and the shortfall against a pantry is one
+    vectorized subtraction.
+    """
+
+    def __init__(
+        self,
+        vocabulary: Sequence[str],
+        quantities: sparse.csr_matrix,
+        registry: Optional[IngredientRegistry] = None,
+    ):
+        self.registry = registry if registry is not None else get_ingredient_registry()
+        self.vocabulary = tuple(self.registry.canonical(name) for name in vocabulary)
+        self.index = {name: column for column, name in enumerate(self.vocabulary)}
+        self.ids = self.registry.intern_all(self.vocabulary)
+        # Ingredient id -> column, -1 for ingredients no recipe uses
+        self._columns = np.full(int(self.ids.max(initial=-1)) + 1, -1, dtype=np.int64)
+        self._columns[self.ids] = np.arange(self.ids.size)
+        self.quantities = quantities
+        # Transposed CSR copy so requirement products are a plain CSR mat-vec; its rows
+        # double as an inverted index from each ingredient to the recipes using it
+        self._by_ingredient = quantities.T.tocsr()
+        self._by_ingredient.sort_indices()
+        self.totals = np.asarray(quantities.sum(axis=1), dtype=np.float64).ravel()
+
+    @classmethod
+    def from_recipes(cls, recipes: Mapping[str, Dict[str, Any]]) -> "IngredientMatrix":
+        """
+        Build the matrix from recipes keyed by lowercased name.
+
+        Args:
+            recipes (Mapping[str, Dict[str, Any]]): Recipes as produced by the catalog; their
+                ingredient names are canonicalized by the catalog already.
+
+        Returns:
+            IngredientMatrix: One row per recipe, one column per distinct ingredient.
+        """
+        vocabulary: Dict[str, int] = {}
+        indptr = [0]
+        indices = []
+        data = []
+
+        for recipe in recipes.values():
+            row: Dict[int, float] = {}
+            for ingredient, amount in recipe["ingredients"].items():
+                try:
+                    amount_value = float(amount)
+                except (ValueError, TypeError):
+                    print(f"Warning: Could not convert amount '{amount}' for ingredient '{ingredient}'")
+                    continue
+                column = vocabulary.setdefault(get_ingredient_registry().canonical(ingredient), len(vocabulary))
+                row[column] = row.get(column, 0.0) + amount_value
+            indices.extend(row.keys())
+            data.extend(row.values())
+            indptr.append(len(indices))
+
+        quantities = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(recipes), len(vocabulary)),
+        )
+        quantities.sort_indices()
+        return cls(list(vocabulary.keys()), quantities)
+
+    @property
+    def shape(self):
+        return self.quantities.shape
+
+    def counts(self, rows: Sequence[int]) -> np.ndarray:
+        """
+        Turn recipe rows (repeated once per portion) into a portion count vector.
+
+        Args:
+            rows (Sequence[int]): Row indices of the planned recipes.
+
+        Returns:
+            np.ndarray: Number of portions per recipe row.
+        """
+        return np.bincount(np.asarray(rows, dtype=np.int64), minlength=self.quantities.shape[0]).astype(np.float64)
+
+    def requirements(self, counts: np.ndarray, columns: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Grams of every ingredient needed to cook `counts[r]` portions of each recipe `r`.
+
+        Args:
+            counts (np.ndarray): Portions per recipe row.
+            columns (Optional[np.ndarray]): Only compute these ingredient columns; defaults to all.
+
+        Returns:
+            np.ndarray: Grams needed per (selected) column.
+        """
+        by_ingredient = self._by_ingredient if columns is None else self._by_ingredient[np.asarray(columns, dtype=np.int64)]
+        return by_ingredient @ np.asarray(counts, dtype=np.float64)
+
+    def recipe_columns(self, rows: Sequence[int]) -> np.ndarray:
+        """Ingredient columns used by any of the given recipe rows, ascending."""
+        rows = np.asarray(rows, dtype=np.int64)
+        return np.unique(np.concatenate(
+            [self.quantities.indices[self.quantities.indptr[row]:self.quantities.indptr[row + 1]] for row in rows]
+            + [np.empty(0, dtype=self.quantities.indices.dtype)]
+        )).astype(np.int64)
+
+    def columns(self, ingredient_ids: np.ndarray) -> np.ndarray:
+        """Column of each ingredient id, or -1 for ingredients no recipe uses (and for id -1)."""
+        ingredient_ids = np.asarray(ingredient_ids, dtype=np.int64)
+        known = (ingredient_ids >= 0) & (ingredient_ids < self._columns.size)
+        return np.where(known, self._columns[np.where(known, ingredient_ids, 0)], -1)
+
+    def pantry_vector_from_ids(self, ingredient_ids: np.ndarray, grams: np.ndarray) -> np.ndarray:
+        """
+        Align pantry stock given by ingredient id with the ingredient columns.
+
+        Args:
+            ingredient_ids (np.ndarray): Registry ids of the pantry ingredients.
+            grams (np.ndarray): Grams on hand per ingredient.
+
+        Returns:
+            np.ndarray: Grams on hand per column; ingredients no recipe uses are dropped.
+        """
+        pantry = np.zeros(len(self.vocabulary), dtype=np.float64)
+        columns = self.columns(ingredient_ids)
+        used = columns >= 0
+        np.add.at(pantry, columns[used], np.asarray(grams, dtype=np.float64)[used])
+        return pantry
+
+    def pantry_vector(self, available_grams: Mapping[str, float]) -> np.ndarray:
+        """
+        Align pantry stock keyed by name with the ingredient columns.
+
+        Args:
+            available_grams (Mapping[str, float]): Grams on hand keyed by ingredient name (any spelling).
+
+        Returns:
+            np.ndarray: Grams on hand per column; ingredients no recipe uses are dropped.
+        """
+        ids = (self.registry.lookup(name) for name in available_grams)
+        return self.pantry_vector_from_ids(
+            np.fromiter((-1 if ingredient_id is None else ingredient_id for ingredient_id in ids), dtype=np.int64),
+            np.fromiter(available_grams.values(), dtype=np.float64),
+        )
+
+    def coverage(self, pantry: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Fraction of each recipe's grams that the pantry already covers.
+
+        Args:
+            pantry (np.ndarray): Grams on hand per column, see `pantry_vector`.
+            rows (Optional[np.ndarray]): Only score these recipe rows; defaults to every recipe.
+
+        Returns:
+            np.ndarray: Coverage in [0, 1] per (selected) recipe row; recipes without ingredients score 0.
+        """
+        if rows is None:
+            covered, totals = self.quantities.copy(), self.totals
+        else:
+            rows = np.asarray(rows, dtype=np.int64)
+            covered, totals = self.quantities[rows], self.totals[rows]
+        covered.data = np.minimum(covered.data, pantry[covered.indices])
+        on_hand = np.asarray(covered.sum(axis=1)).ravel()
+        return np.divide(on_hand, totals, out=np.zeros_like(on_hand, dtype=np.float64), where=totals > 0)
+
+    def search(self, available_grams: Mapping[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Coverage of the recipes that use at least one of the given ingredients.
+
+        Only the inverted index postings of the given ingredients are read, so
+        the cost grows with the number of matching recipes rather than with
+        the size of the catalog.
+
+        Args:
+            available_grams (Mapping[str, float]): Grams on hand keyed by ingredient name
+                (any spelling); `math.inf` means "as much as any recipe needs".
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The matching recipe rows (ascending) and their
+            coverage in [0, 1], i.e. the fraction of the recipe's grams on hand.
+        """
+        available_grams = self.registry.canonical_amounts(available_grams)
+        columns = np.asarray([self.index.get(name, -1) for name in available_grams], dtype=np.int64)
+        grams = np.asarray(list(available_grams.values()), dtype=np.float64)
+        used = columns >= 0
+        if not used.any():
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        columns, grams = columns[used], grams[used]
+
+        # Gather the postings (recipe row, grams needed) of every given ingredient
+        starts = self._by_ingredient.indptr[columns]
+        lengths = self._by_ingredient.indptr[columns + 1] - starts
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        postings = self._by_ingredient.indices[positions]
+        on_hand = np.minimum(self._by_ingredient.data[positions], np.repeat(grams, lengths))
+
+        rows, inverse = np.unique(postings, return_inverse=True)
+        covered = np.bincount(inverse, weights=on_hand, minlength=rows.size)
+        totals = self.totals[rows]
+        return rows.astype(np.int64), np.divide(covered, totals, out=np.zeros_like(covered), where=totals > 0)
+
+    def shortfall(self, counts: np.ndarray, pantry: np.ndarray) -> np.ndarray:
+        """Grams still missing per ingredient after using everything in the pantry."""
+        return np.maximum(self.requirements(counts) - pantry, 0.0)
@@ -0,0 +1,163 @@
+import re
+import threading
+from typing import Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+
+# Plurals the suffix rules get wrong, by last word of the name
+IRREGULAR_PLURALS = {
+    "leaves": "leaf",
+    "loaves": "loaf",
+    "halves": "half",
+    "knives": "knife",
+    "pies": "pie",
+    "cookies": "cookie",
+    "brownies": "brownie",
+    "smoothies": "smoothie",
+    "geese": "goose",
+    "teeth": "tooth",
+}
+
+# Words that end in "s" without being plural (besides those ending in "ss", "us" or "is")
+INVARIANT_WORDS = frozenset({
+    "molasses", "grits", "oats",
+})
+
+# Raw spellings whose canonical form is memoized; beyond this, names are normalized on every call
+MAX_MEMOIZED = 100_000
+
+# Alternative names, by canonical (singular, snake_case) form
+SYNONYMS = {
+    "scallion": "green_onion",
+    "spring_onion": "green_onion",
+    "garbanzo_bean": "chickpea",
+    "garbanzo": "chickpea",
+    "courgette": "zucchini",
+    "aubergine": "eggplant",
+    "coriander": "cilantro",
+    "mayonnaise": "mayo",
+    "prawn": "shrimp",
+    "yoghurt": "yogurt",
+    "greek_yoghurt": "greek_yogurt",
+    "soya_sauce": "soy_sauce",
+    "extra_virgin_olive_oil": "olive_oil",
+    "evoo": "olive_oil",
+    "parmesan_cheese": "parmesan",
+    "parmigiano_reggiano": "parmesan",
+    "cheddar_cheese": "cheddar",
+    "feta_cheese": "feta",
+    "mozzarella_cheese": "mozzarella",
+    "ricotta_cheese": "ricotta",
+    "provolone_cheese": "provolone",
+    "capsicum": "bell_pepper",
+    "sweet_pepper": "bell_pepper",
+    "rolled_oats": "oats",
+    "sun_dried_tomato": "sundried_tomato",
+    "romaine_lettuce": "romaine",
+}
+
+
+def singularize(word: str) -> str:
+    """Singular form of an English ingredient word (best effort)."""
+    if word in IRREGULAR_PLURALS:
+        return IRREGULAR_PLURALS[word]
+    if word in INVARIANT_WORDS or len(word) <= 3 or not word.endswith("s") or word.endswith(("ss", "us", "is")):
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith("oes") or word.endswith(("sses", "xes", "zes", "ches", "shes")):
+        return word[:-2]
+    if word.endswith("ses"):
+        return word[:-1]  # The singular ends in -e: cheeses, cases, vases
+    return word[:-1]
+
+
+def canonical_name(raw: str) -> str:
+    """
+    Normalize an ingredient name: lowercase snake_case, last word singular, synonyms resolved.
+
+    "Soy Sauce" -> "soy_sauce", "Bell Peppers" -> "bell_pepper", "sweet_potatoes" -> "sweet_potato".
+    """
+    words = re.findall(r"[a-z0-9]+", raw.lower())
+    if not words:
+        return ""
+    words[-1] = singularize(words[-1])
+    name = "_".join(words)
+    return SYNONYMS.get(name, name)
+
+
+class IngredientRegistry:
+    """
+    Interns canonical ingredient names as small integer ids.
+
+    Names are canonicalized once when recipes and the pantry are loaded;
+    from then on ingredients are joined by id. Ids are never reused or
+    reassigned, so they stay valid across catalog and pantry reloads.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._canonical: Dict[str, str] = {}  # Raw spelling -> canonical name
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def canonical(self, raw: str) -> str:
+        """Canonical form of an ingredient name, memoized per raw spelling."""
+        name = self._canonical.get(raw)
+        if name is None:
+            name = canonical_name(raw)
+            if len(self._canonical) < MAX_MEMOIZED:
+                self._canonical[raw] = name
+        return name
+
+    def intern(self, raw: str) -> int:
+        """
+        Id of an ingredient, assigning a new one for names not seen before.
+
+        Args:
+            raw (str): Ingredient name in any spelling.
+
+        Returns:
+            int: The id of the canonical name.
+        """
+        name = self.canonical(raw)
+        ingredient_id = self._ids.get(name)
+        if ingredient_id is None:
+            with self._lock:
+                ingredient_id = self._ids.get(name)
+                if ingredient_id is None:
+                    ingredient_id = len(self._names)
+                    self._names.append(name)
+                    self._ids[name] = ingredient_id
+        return ingredient_id
+
+    def lookup(self, raw: str) -> Optional[int]:
+        """Id of an ingredient, or None if it was never interned."""
+        return self._ids.get(self.canonical(raw))
+
+    def name(self, ingredient_id: int) -> str:
+        """Canonical name of an interned ingredient."""
+        return self._names[ingredient_id]
+
+    def intern_all(self, names: Iterable[str]) -> np.ndarray:
+        """Ids of several ingredients, as an array."""
+        return np.fromiter((self.intern(name) for name in names), dtype=np.int64)
+
+    def canonical_amounts(self, amounts: Mapping[str, float]) -> Dict[str, float]:
+        """Re-key amounts by canonical name, adding up spellings of the same ingredient."""
+        merged: Dict[str, float] = {}
+        for raw, amount in amounts.items():
+            name = self.canonical(raw)
+            merged[name] = merged.get(name, 0.0) + amount
+        return merged
+
+
+# Global instance
+ingredient_registry = IngredientRegistry()
+
+def get_ingredient_registry() -> IngredientRegistry:
+    """Getter function for the shared ingredient registry"""
+    return ingredient_registry
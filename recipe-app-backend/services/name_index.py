@@ -0,0 +1,175 @@
+import heapq
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Matches kept per trie node; prefix lookups never return more than this
+MAX_COMPLETIONS = 32
+
+# Trigram similarity a misspelled name needs to be taken for a recipe (see RecipeNameIndex.resolve)
+RESOLVE_MIN_SCORE = 0.75
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase a recipe name and reduce it to single-spaced words."""
+    return " ".join(re.findall(r"[a-z0-9]+", name.lower()))
+
+
+def trigrams(text: str) -> List[str]:
+    """Distinct character trigrams of a normalized name, padded so word edges count."""
+    padded = f"  {text} "
+    return sorted({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+
+class _TrieNode:
+    __slots__ = ("children", "matches")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.matches: list = []  # Heap of (-rank, row) while building, then rows best first
+
+
+class RecipeNameIndex:
+    """
+    Autocomplete and typo-tolerant lookup of recipe names.
+
+    A prefix trie answers keystroke-by-keystroke completion: every word of a
+    name is inserted, and each node keeps its best completions precomputed,
+    so a lookup is one walk down the trie. A trigram inverted index scores
+    names by trigram overlap (Dice coefficient) for misspelled queries such
+    as "vegan tofu scrambel". Both are built once per catalog snapshot.
+    """
+
+    def __init__(self, names: Sequence[str]):
+        """
+        Args:
+            names (Sequence[str]): Display names of the recipes, in catalog row order.
+        """
+        self.names = tuple(names)
+        self.normalized = tuple(normalize_name(name) for name in self.names)
+        self._exact: Dict[str, int] = {}
+        for row, name in enumerate(self.normalized):
+            self._exact.setdefault(name, row)
+        self._root = _TrieNode()
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+
+        # Shorter names first, so "Tofu Bowl" completes before "Tofu Bowl with Rice"
+        ranks = {row: rank for rank, row in enumerate(sorted(range(len(self.names)),
+                                                              key=lambda row: (len(self.normalized[row]), self.normalized[row])))}
+        for row, name in enumerate(self.normalized):
+            words = name.split()
+            for start in range(len(words)):
+                self._insert(" ".join(words[start:]), ranks[row], row)
+            for gram in trigrams(name):
+                self._postings[gram].append(row)
+        self._finalize()
+
+        self._gram_counts = np.array([len(trigrams(name)) for name in self.normalized], dtype=np.float64)
+        self._postings = {gram: np.asarray(rows, dtype=np.int64) for gram, rows in self._postings.items()}
+
+    def _insert(self, key: str, rank: int, row: int) -> None:
+        node = self._root
+        for char in key:
+            node = node.children.setdefault(char, _TrieNode())
+            if (-rank, row) not in node.matches:
+                heapq.heappush(node.matches, (-rank, row))
+                if len(node.matches) > MAX_COMPLETIONS:
+                    heapq.heappop(node.matches)
+
+    def _finalize(self) -> None:
+        """Turn every node's heap into its rows, best first."""
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            node.matches = [row for _, row in sorted(node.matches, reverse=True)]
+            stack.extend(node.children.values())
+
+    def complete(self, prefix: str, limit: int = 10) -> List[int]:
+        """
+        Rows of the names that contain a word starting with `prefix` (shortest names first).
+
+        Args:
+            prefix (str): What the user typed so far.
+            limit (int): Maximum number of rows.
+
+        Returns:
+            List[int]: Matching catalog rows; names starting with the prefix come first.
+        """
+        key = normalize_name(prefix)
+        if not key:
+            return []
+        node = self._root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        rows = sorted(node.matches, key=lambda row: not self.normalized[row].startswith(key))
+        return rows[:limit]
+
+    def similar(self, query: str, limit: int = 10, min_score: float = 0.3) -> List[Tuple[int, float]]:
+        """
+        Names sharing the most trigrams with the query.
+
+        Args:
+            query (str): Possibly misspelled name.
+            limit (int): Maximum number of matches.
+            min_score (float): Minimum Dice similarity (0 to 1).
+
+        Returns:
+            List[Tuple[int, float]]: (row, score) pairs, best first.
+        """
+        grams = [gram for gram in trigrams(normalize_name(query)) if gram in self._postings]
+        if not grams or not self.names:
+            return []
+        shared = np.bincount(np.concatenate([self._postings[gram] for gram in grams]), minlength=len(self.names))
+        scores = 2.0 * shared / (self._gram_counts + len(trigrams(normalize_name(query))))
+        candidates = np.flatnonzero(scores >= min_score)
+        order = candidates[np.lexsort((candidates, -scores[candidates]))][:limit]
+        return [(int(row), float(scores[row])) for row in order]
+
+    def search(self, query: str, limit: int = 10, min_score: float = 0.3) -> List[Tuple[int, float]]:
+        """
+        Autocomplete with fuzzy fallback: prefix matches first, then similar names.
+
+        Prefix matches score 1.0 for an exact name, otherwise at least 0.9;
+        similar names score their trigram similarity.
+
+        Returns:
+            List[Tuple[int, float]]: (row, score) pairs, best first.
+        """
+        key = normalize_name(query)
+        results: Dict[int, float] = {}
+        for row in self.complete(key, limit):
+            name = self.normalized[row]
+            results[row] = 1.0 if name == key else 0.9 + 0.09 * len(key) / len(name)
+        if len(results) < limit:
+            for row, score in self.similar(key, limit, min_score):
+                results.setdefault(row, min(score, 0.89))
+        ranked = sorted(results.items(), key=lambda item: (-item[1], item[0]))
+        return [(row, round(score, 4)) for row, score in ranked[:limit]]
+
+    def resolve(self, query: str, min_score: float = RESOLVE_MIN_SCORE) -> Optional[int]:
+        """
+        Row of the recipe a name stands for: its exact (normalized) name, or a misspelling of it.
+
+        Prefix matches are not accepted, so partial input such as "a" or
+        "chicken" is not taken for a recipe; use `suggest` for those.
+
+        Args:
+            query (str): Recipe name as given.
+            min_score (float): Minimum trigram similarity of a misspelled name.
+
+        Returns:
+            Optional[int]: The row, or None if no name is close enough.
+        """
+        key = normalize_name(query)
+        if key in self._exact:
+            return self._exact[key]
+        matches = self.similar(key, limit=1, min_score=min_score)
+        return matches[0][0] if matches else None
+
+    def suggest(self, query: str, limit: int = 3) -> List[str]:
+        """Names to offer for a name that did not resolve, best first (see `search`)."""
+        return [self.names[row] for row, _ in self.search(query, limit)]
@@ -0,0 +1,194 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .nutrition_matrix import NUTRIENTS
+
+# Nutrients tracked by the ledger: the catalog's, plus fiber estimated from the ingredients
+LEDGER_NUTRIENTS = NUTRIENTS + ("fiber",)
+
+
+class NutritionLedger:
+    """
+    Running nutrition totals of one user's meal plan.
+
+    Every (day, meal) slot holds the nutrients of the recipe planned there.
+    Day and week totals are kept alongside and updated by the difference
+    when a slot changes, so adding, swapping or removing a meal costs a few
+    vector additions whatever the plan length, instead of re-aggregating
+    every recipe.
+    """
+
+    def __init__(self, days: Sequence[str], meals: Sequence[str], goals: Mapping[str, float]):
+        """
+        Args:
+            days (Sequence[str]): Day names, in order.
+            meals (Sequence[str]): Meal names of a day, in order.
+            goals (Mapping[str, float]): Daily goals keyed by nutrient; missing goals are not tracked.
+        """
+        self.days = tuple(days)
+        self.meals = tuple(meals)
+        self._day_index = {day.lower(): d for d, day in enumerate(self.days)}
+        self._meal_index = {meal.lower(): m for m, meal in enumerate(self.meals)}
+        self.goals = np.array([goals.get(nutrient, np.nan) for nutrient in LEDGER_NUTRIENTS], dtype=np.float64)
+        self.slots = np.zeros((len(self.days), len(self.meals), len(LEDGER_NUTRIENTS)), dtype=np.float64)
+        self.recipes: Dict[Tuple[int, int], Tuple[str, int]] = {}
+        self.day_totals = np.zeros((len(self.days), len(LEDGER_NUTRIENTS)), dtype=np.float64)
+        self.week_totals = np.zeros(len(LEDGER_NUTRIENTS), dtype=np.float64)
+        self._lock = threading.Lock()
+
+    def slot(self, day: str, meal: str) -> Tuple[int, int]:
+        """
+        Position of a (day, meal) slot.
+
+        Raises:
+            KeyError: If the day or meal is unknown.
+        """
+        try:
+            return self._day_index[day.lower()], self._meal_index[meal.lower()]
+        except KeyError:
+            raise KeyError(f"Unknown meal slot {day} {meal}") from None
+
+    def set_meal(self, day: str, meal: str, recipe: Optional[str], values: np.ndarray, portions: int = 1) -> None:
+        """
+        Put a recipe in a slot (or empty it), updating the day and week totals.
+
+        Args:
+            day (str): Day name (case-insensitive).
+            meal (str): Meal name (case-insensitive).
+            recipe (Optional[str]): Recipe name, or None to empty the slot.
+            values (np.ndarray): Nutrients of the serving, in LEDGER_NUTRIENTS order.
+            portions (int): Portions in the serving (informational; `values` are already scaled).
+
+        Raises:
+            KeyError: If the day or meal is unknown.
+        """
+        d, m = self.slot(day, meal)
+        values = np.asarray(values, dtype=np.float64)
+        with self._lock:
+            delta = values - self.slots[d, m]
+            self.slots[d, m] = values
+            self.day_totals[d] += delta
+            self.week_totals += delta
+            if recipe is None:
+                self.recipes.pop((d, m), None)
+            else:
+                self.recipes[(d, m)] = (recipe, portions)
+
+    def _deviation(self, totals: np.ndarray, goals: np.ndarray) -> Dict[str, Optional[Dict[str, float]]]:
+        return {
+            nutrient: None if np.isnan(goal) else {
+                "difference": float(total - goal),
+                "percent_of_goal": float(100.0 * total / goal) if goal else None,
+            }
+            for nutrient, total, goal in zip(LEDGER_NUTRIENTS, totals, goals)
+        }
+
+    def day_report(self, day: str) -> Dict[str, Any]:
+        """
+        Totals of one day and their deviation from the daily goals.
+
+        Raises:
+            KeyError: If the day is unknown.
+        """
+        d = self._day_index.get(day.lower())
+        if d is None:
+            raise KeyError(f"Unknown day {day}")
+        with self._lock:
+            totals = self.day_totals[d].copy()
+            meals = {
+                meal: self._serving(d, m)
+                for m, meal in enumerate(self.meals)
+            }
+        return {
+            "day": self.days[d],
+            "meals": meals,
+            "totals": dict(zip(LEDGER_NUTRIENTS, totals.tolist())),
+            "deviation": self._deviation(totals, self.goals),
+        }
+
+    def _serving(self, d: int, m: int) -> Optional[Dict[str, Any]]:
+        if (d, m) not in self.recipes:
+            return None
+        recipe, portions = self.recipes[(d, m)]
+        return {"name": recipe, "portions": portions, **dict(zip(LEDGER_NUTRIENTS, self.slots[d, m].tolist()))}
+
+    def week_report(self) -> Dict[str, Any]:
+        """Totals of the whole plan and their deviation from the goals over all its days."""
+        with self._lock:
+            totals = self.week_totals.copy()
+        return {
+            "totals": dict(zip(LEDGER_NUTRIENTS, totals.tolist())),
+            "deviation": self._deviation(totals, self.goals * len(self.days)),
+        }
+
+    def report(self) -> Dict[str, Any]:
+        """Every day's report, the week's report and the daily goals."""
+        return {
+            "goals": {nutrient: None if np.isnan(goal) else float(goal) for nutrient, goal in zip(LEDGER_NUTRIENTS, self.goals)},
+            "days": [self.day_report(day) for day in self.days],
+            "week": self.week_report(),
+        }
+
+
+class LedgerStore:
+    """
+    Per-user nutrition ledgers, kept while the user's meal plan version stays the same.
+
+    A ledger is built from the user's meal plan on first use; when the plan's
+    version changes (see routes.meal_plan.plan_version), because its inputs
+    changed or a meal was swapped, it is rebuilt from the new plan. The least
+    recently used ledgers are dropped beyond `max_entries`.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._ledgers: "OrderedDict[str, Tuple[Hashable, NutritionLedger]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user: str, version: Hashable, build: Callable[[], NutritionLedger]) -> NutritionLedger:
+        """
+        Return the user's ledger for the given plan version, building it if needed.
+
+        Args:
+            user (str): User key.
+            version (Hashable): Current version of the user's meal plan.
+            build (Callable[[], NutritionLedger]): Builds the ledger from the current plan.
+
+        Returns:
+            NutritionLedger: The user's ledger.
+        """
+        with self._lock:
+            entry = self._ledgers.get(user)
+            if entry is not None and entry[0] == version:
+                self._ledgers.move_to_end(user)
+                return entry[1]
+
+        ledger = build()
+        with self._lock:
+            entry = self._ledgers.get(user)
+            if entry is not None and entry[0] == version:
+                return entry[1]  # Built concurrently by another request
+            self._ledgers[user] = (version, ledger)
+            self._ledgers.move_to_end(user)
+            while len(self._ledgers) > self.max_entries:
+                self._ledgers.popitem(last=False)
+        return ledger
+
+    def invalidate(self, user: Optional[str] = None) -> None:
+        """Drop one user's ledger, or every ledger."""
+        with self._lock:
+            if user is None:
+                self._ledgers.clear()
+            else:
+                self._ledgers.pop(user, None)
+
+
+# Global instance
+ledger_store = LedgerStore()
+
+def get_ledger_store() -> LedgerStore:
+    """Getter function for the shared nutrition ledger store"""
+    return ledger_store
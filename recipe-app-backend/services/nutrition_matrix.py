@@ -0,0 +1,126 @@
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+# Nutrient columns of the matrix, in order
+NUTRIENTS = ("calories", "protein", "carbs", "fat")
+
+# Recipe dictionary field backing each nutrient column
+RECIPE_FIELDS = ("calories", "protein_g", "carbs_g", "fat_g")
+
+
+class NutritionMatrix:
+    """
+    Columnar view of the recipe catalog's nutrition data.
+
+    Row `i` of `values` holds the calories, protein, carbs and fat of recipe
+    `names[i]`; `diet_codes[i]` is the index of that recipe's diet in `diets`.
+    Totals, diet filters and goal checks over any set of recipes are single
+    NumPy operations on these arrays. All arrays are read-only because the
+    matrix is shared by every request holding the same catalog snapshot.
+    """
+
+    def __init__(self, names: Sequence[str], values: np.ndarray, diet_codes: np.ndarray, diets: Sequence[str]):
+        self.names = tuple(names)
+        self.index = {name: row for row, name in enumerate(self.names)}
+        self.values = values
+        self.diet_codes = diet_codes
+        self.diets = tuple(diets)
+        self._diet_lookup = {diet: code for code, diet in enumerate(self.diets)}
+        for array in (self.values, self.diet_codes):
+            array.flags.writeable = False
+
+    @classmethod
+    def from_recipes(cls, recipes: Mapping[str, Dict[str, Any]]) -> "NutritionMatrix":
+        """
+        Build the matrix from recipes keyed by lowercased name.
+
+        Args:
+            recipes (Mapping[str, Dict[str, Any]]): Recipes as produced by the catalog.
+
+        Returns:
+            NutritionMatrix: Rows in the same order as `recipes`.
+        """
+        names = list(recipes.keys())
+        values = np.zeros((len(names), len(NUTRIENTS)), dtype=np.float32)
+        diet_codes = np.zeros(len(names), dtype=np.int16)
+        diets: Dict[str, int] = {}
+
+        for row, name in enumerate(names):
+            recipe = recipes[name]
+            values[row] = [float(recipe.get(field, 0) or 0) for field in RECIPE_FIELDS]
+            diet = recipe.get("diet", "").lower()
+            diet_codes[row] = diets.setdefault(diet, len(diets))
+
+        return cls(names, values, diet_codes, list(diets.keys()))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def rows(self, recipe_names: Iterable[str]) -> np.ndarray:
+        """
+        Resolve recipe names to row indices.
+
+        Args:
+            recipe_names (Iterable[str]): Recipe names (case-insensitive).
+
+        Returns:
+            np.ndarray: Row index per name, or -1 when the recipe is unknown.
+        """
+        return np.fromiter(
+            (self.index.get(name.lower(), -1) for name in recipe_names),
+            dtype=np.int64,
+        )
+
+    def diet_mask(self, diet: str) -> np.ndarray:
+        """Boolean mask of the recipes that belong to `diet` (case-insensitive)."""
+        code = self._diet_lookup.get(diet.lower())
+        if code is None:
+            return np.zeros(len(self.names), dtype=bool)
+        return self.diet_codes == code
+
+    def diet_rows(self, diet: str) -> np.ndarray:
+        """Row indices of the recipes that belong to `diet`."""
+        return np.flatnonzero(self.diet_mask(diet))
+
+    def totals(self, rows: np.ndarray, counts: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Sum the nutrition of a set of recipes.
+
+        Args:
+            rows (np.ndarray): Row indices; may repeat.
+            counts (Optional[np.ndarray]): Portion multiplier per row, defaults to 1.
+
+        Returns:
+            np.ndarray: Totals per nutrient, accumulated in float64.
+        """
+        selected = self.values[rows].astype(np.float64)
+        if counts is None:
+            return selected.sum(axis=0)
+        return np.asarray(counts, dtype=np.float64) @ selected
+
+    @staticmethod
+    def goal_vector(goals: Mapping[str, float]) -> np.ndarray:
+        """Goals aligned with the nutrient columns; NaN where a goal is not set."""
+        return np.array([goals.get(nutrient, np.nan) for nutrient in NUTRIENTS], dtype=np.float64)
+
+    @staticmethod
+    def exceeded(totals: np.ndarray, goals: Mapping[str, float], fraction: float = 1.0) -> List[str]:
+        """
+        List the nutrients whose totals exceed `fraction` of their goal.
+
+        Args:
+            totals (np.ndarray): Totals per nutrient.
+            goals (Mapping[str, float]): Nutritional goals keyed by nutrient name.
+            fraction (float): Share of each goal that may be consumed.
+
+        Returns:
+            List[str]: Names of the exceeded nutrients, in column order.
+        """
+        over = totals > NutritionMatrix.goal_vector(goals) * fraction  # NaN goals never compare as exceeded
+        return [NUTRIENTS[i] for i in np.flatnonzero(over)]
+
+    @staticmethod
+    def as_dict(totals: np.ndarray) -> Dict[str, float]:
+        """Convert a nutrient vector into the API's dictionary shape."""
+        return {nutrient: float(value) for nutrient, value in zip(NUTRIENTS, totals)}
@@ -0,0 +1,317 @@
+import copy
+import csv
+import os
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from config import BASE_DIR, PANTRY_CACHE_SIZE, PANTRY_STORE
+from .ingredient_registry import get_ingredient_registry
+from .plan_cache import file_version
+
+PANTRY_CSV_PATH = os.path.join(BASE_DIR, "user_available_ingredients.csv")
+
+
+def parse_available_ingredients(lines: Iterable[str]) -> List[Dict[str, str]]:
+    """
+    Parse the rows of the available ingredients CSV file.
+
+    Args:
+        lines (Iterable[str]): Lines of the CSV file, including the header.
+
+    Returns:
+        A list of dictionaries containing ingredient details.
+    """
+    ingredients = []
+    reader = csv.DictReader(lines)
+    for row in reader:
+        ingredient = {
+            "name": row.get("Ingredient", "").strip(),
+            "quantity": row.get("Quantity", "").strip(),
+            "unit": row.get("Unit", "").strip()
+        }
+        if not ingredient["name"]:
+            continue  # Skip entries without a name
+        ingredients.append(ingredient)
+    return ingredients
+
+
+def format_quantity(quantity: Any) -> str:
+    """Quantity as the pantry returns it: "200" rather than "200.0", and exact, so it parses back to the same float."""
+    try:
+        value = float(quantity)
+    except (TypeError, ValueError):
+        return str(quantity).strip()
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def merge_items(items: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
+    """
+    Key pantry items by canonical ingredient name; a later item replaces an earlier one.
+
+    Args:
+        items (Iterable[Dict[str, Any]]): Items with `name`, `quantity` and `unit`.
+
+    Returns:
+        Dict[str, Dict[str, str]]: The items, named canonically, keyed by that name.
+    """
+    registry = get_ingredient_registry()
+    merged = {}
+    for item in items:
+        name = registry.canonical(str(item["name"]))
+        if name:
+            merged[name] = {"name": name, "quantity": format_quantity(item["quantity"]), "unit": str(item["unit"]).strip()}
+    return merged
+
+
+def upsert_statement(dialect: str):
+    """
+    INSERT into the `ingredients` table that updates (user_id, name) conflicts in place.
+
+    Args:
+        dialect (str): Name of the database dialect.
+
+    Returns:
+        The statement, for executemany with one parameter set per item, or None
+        if the dialect has no ON CONFLICT clause.
+    """
+    from models import Ingredient
+
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    statement = insert(Ingredient.__table__)
+    return statement.on_conflict_do_update(
+        index_elements=["user_id", "name"],
+        set_={column: statement.excluded[column] for column in ("quantity", "unit", "revision")},
+    )
+
+
+class PantryRepository(ABC):
+    """
+    Storage for users' available ingredients.
+
+    Items are plain dictionaries with string `name`, `quantity` and `unit`,
+    as the pantry CSV file holds them. Every pantry has a version stamp that
+    changes whenever its items do, so derived data (pantry vectors, meal
+    plans) can be cached per version.
+    """
+
+    @abstractmethod
+    def list_items(self, user_id: str) -> List[Dict[str, str]]:
+        """Return the user's pantry items."""
+
+    @abstractmethod
+    def version(self, user_id: str) -> Hashable:
+        """Return the version stamp of the user's pantry."""
+
+    @abstractmethod
+    def upsert(self, user_id: str, items: Iterable[Dict[str, Any]]) -> int:
+        """
+        Add items to the user's pantry, replacing the quantity and unit of ingredients already in it.
+
+        Ingredient names are canonicalized (see services.ingredient_registry), so
+        "Tomatoes" and "tomato" are the same item.
+
+        Args:
+            user_id (str): Owner of the pantry.
+            items (Iterable[Dict[str, Any]]): Items with `name`, `quantity` and `unit`.
+
+        Returns:
+            int: Number of distinct items written.
+        """
+
+    @abstractmethod
+    def delete(self, user_id: str, names: Iterable[str]) -> int:
+        """Remove ingredients (any spelling) from the user's pantry; returns how many were removed."""
+
+
+class CsvPantryRepository(PantryRepository):
+    """
+    Pantry backed by user_available_ingredients.csv, intended for development.
+
+    There is one file, so every user shares the same pantry. The parsed file
+    is cached until its mtime or size changes, and writes replace the file
+    atomically.
+    """
+
+    def __init__(self, path: str = PANTRY_CSV_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        self._cache: Optional[Tuple[Tuple[int, int], List[Dict[str, str]]]] = None
+
+    def _load(self) -> List[Dict[str, str]]:
+        version = file_version(self.path)
+        if version is None:
+            raise FileNotFoundError(self.path)
+        cached = self._cache
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            items = parse_available_ingredients(f)
+        self._cache = (version, items)
+        return items
+
+    def _write(self, items: Iterable[Dict[str, str]]) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        with tempfile.NamedTemporaryFile("w", dir=directory, suffix=".tmp", delete=False, newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Ingredient", "Quantity", "Unit"])
+            writer.writerows([item["name"], item["quantity"], item["unit"]] for item in items)
+            temp_path = f.name
+        os.replace(temp_path, self.path)
+        self._cache = None
+
+    def list_items(self, user_id: str) -> List[Dict[str, str]]:
+        return copy.deepcopy(self._load())
+
+    def version(self, user_id: str) -> Hashable:
+        return file_version(self.path)
+
+    def upsert(self, user_id: str, items: Iterable[Dict[str, Any]]) -> int:
+        updates = merge_items(items)
+        with self._lock:
+            try:
+                current = merge_items(self._load())
+            except FileNotFoundError:
+                current = {}
+            current.update(updates)
+            self._write(current.values())
+        return len(updates)
+
+    def delete(self, user_id: str, names: Iterable[str]) -> int:
+        registry = get_ingredient_registry()
+        removed = {registry.canonical(name) for name in names}
+        with self._lock:
+            current = merge_items(self._load())
+            kept = [item for name, item in current.items() if name not in removed]
+            self._write(kept)
+        return len(current) - len(kept)
+
+
+class SqlPantryRepository(PantryRepository):
+    """
+    Per-user pantries backed by the SQLAlchemy engine in db.py.
+
+    Items live in the `ingredients` table, unique per (user_id, name), so a
+    user's pantry is one range scan of that index. Upserts of any size are a
+    single executemany statement using the database's ON CONFLICT clause.
+    Every write stamps its rows with a new revision, and a pantry's version
+    is (row count, latest revision), an aggregate over the user's index range
+    that is checked before serving the in-process copy of the pantry, so
+    writes made by other processes are picked up on the next read.
+    """
+
+    def __init__(self, session_factory, max_entries: int = PANTRY_CACHE_SIZE):
+        self.session_factory = session_factory
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[str, Tuple[Hashable, List[Dict[str, str]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def version(self, user_id: str) -> Hashable:
+        from sqlalchemy import func, select
+        from models import Ingredient
+
+        with self.session_factory() as session:
+            count, revision = session.execute(
+                select(func.count(), func.max(Ingredient.revision)).where(Ingredient.user_id == user_id)
+            ).one()
+        return count, revision
+
+    def list_items(self, user_id: str) -> List[Dict[str, str]]:
+        from sqlalchemy import select
+        from models import Ingredient
+
+        version = self.version(user_id)
+        with self._lock:
+            cached = self._cache.get(user_id)
+            if cached is not None and cached[0] == version:
+                self._cache.move_to_end(user_id)
+                return copy.deepcopy(cached[1])
+
+        with self.session_factory() as session:
+            rows = session.scalars(
+                select(Ingredient).where(Ingredient.user_id == user_id).order_by(Ingredient.name)
+            )
+            items = [row.to_dict() for row in rows]
+        with self._lock:
+            self._cache[user_id] = (version, items)
+            self._cache.move_to_end(user_id)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return copy.deepcopy(items)
+
+    def upsert(self, user_id: str, items: Iterable[Dict[str, Any]]) -> int:
+        from sqlalchemy import insert, select, update
+        from models import Ingredient
+
+        revision = time.time_ns()
+        rows = [
+            {"user_id": user_id, "name": name, "quantity": float(item["quantity"]), "unit": item["unit"], "revision": revision}
+            for name, item in merge_items(items).items()
+        ]
+        if not rows:
+            return 0
+
+        with self.session_factory() as session, session.begin():
+            statement = upsert_statement(session.get_bind().dialect.name)
+            if statement is not None:
+                session.execute(statement, rows)
+            else:
+                # No ON CONFLICT clause: update the existing items by primary key, insert the rest
+                existing = dict(session.execute(
+                    select(Ingredient.name, Ingredient.id)
+                    .where(Ingredient.user_id == user_id, Ingredient.name.in_([row["name"] for row in rows]))
+                ).all())
+                updates = [dict(row, id=existing[row["name"]]) for row in rows if row["name"] in existing]
+                inserts = [row for row in rows if row["name"] not in existing]
+                if updates:
+                    session.execute(update(Ingredient), updates)
+                if inserts:
+                    session.execute(insert(Ingredient), inserts)
+        return len(rows)
+
+    def delete(self, user_id: str, names: Iterable[str]) -> int:
+        from sqlalchemy import delete
+        from models import Ingredient
+
+        registry = get_ingredient_registry()
+        with self.session_factory() as session, session.begin():
+            result = session.execute(
+                delete(Ingredient)
+                .where(Ingredient.user_id == user_id, Ingredient.name.in_({registry.canonical(name) for name in names}))
+            )
+            return result.rowcount
+
+
+_repository: Optional[PantryRepository] = None
+_repository_lock = threading.Lock()
+
+def get_pantry_repository() -> PantryRepository:
+    """
+    Getter function for the configured pantry repository.
+
+    The backend is chosen with the PANTRY_STORE setting: "sql" keeps a pantry per
+    user in the database configured by DB_URL, anything else uses the shared
+    user_available_ingredients.csv.
+    """
+    global _repository
+    if _repository is None:
+        with _repository_lock:
+            if _repository is None:
+                if PANTRY_STORE == "sql":
+                    from db import Base, SessionLocal, engine
+                    from models import Ingredient
+
+                    Base.metadata.create_all(engine, tables=[Ingredient.__table__])
+                    _repository = SqlPantryRepository(SessionLocal)
+                else:
+                    _repository = CsvPantryRepository()
+    return _repository
@@ -0,0 +1,107 @@
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from config import PLAN_CACHE_SIZE, PLAN_CACHE_TTL
+
+
+def file_version(path: str) -> Optional[Tuple[int, int]]:
+    """
+    Cheap version stamp of a file: its modification time and size, or None if it is missing.
+
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        Optional[Tuple[int, int]]: (mtime in nanoseconds, size in bytes).
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class PlanCache:
+    """
+    LRU cache with a time-to-live for generated meal plans.
+
+    Keys start with the user id and include the versions of every input of
+    the plan (dietary goal, nutritional goals, recipe catalog, pantry), so a
+    change to any input misses naturally. Entries of a user can also be
+    dropped explicitly, e.g. when their preferences change.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 3600.0, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[Hashable, ...], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[Any]:
+        """Return a copy of the cached value for the key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Tuple[Hashable, ...], value: Any) -> None:
+        """Store a value, evicting the least recently used entries beyond `max_entries`."""
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: Optional[str] = None) -> int:
+        """
+        Drop the cached plans of one user, or of everyone.
+
+        Args:
+            user_id (Optional[str]): User whose plans are dropped; None clears the cache.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        with self._lock:
+            if user_id is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                return removed
+            stale = [key for key in self._entries if key[0] == user_id]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the hit and miss counters and the current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+            }
+
+
+# Global instance
+plan_cache = PlanCache(max_entries=PLAN_CACHE_SIZE, ttl=PLAN_CACHE_TTL)
+
+def get_plan_cache() -> PlanCache:
+    """Getter function for the shared meal plan cache"""
+    return plan_cache
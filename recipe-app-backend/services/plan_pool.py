@@ -0,0 +1,125 @@
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from config import PLANNER_WORKERS
+from .nutrition_matrix import NutritionMatrix
+from .planner import PlannerError, plan_meals
+
+# Per-process state of pool workers, set once by _init_worker
+_worker_nutrition: Optional[NutritionMatrix] = None
+
+
+def _init_worker(nutrition: NutritionMatrix) -> None:
+    """Receive the catalog's nutrition matrix once per worker process."""
+    global _worker_nutrition
+    _worker_nutrition = nutrition
+
+
+def _plan_chunk(jobs: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Plan a chunk of users inside a worker process.
+
+    Args:
+        jobs (Sequence[Dict[str, Any]]): One dict per user with `key`, `diet`,
+            `max_calories`, `protein_floor`, `days`, `meals_per_day`, `seed`
+            and `coverage` (the user's pantry coverage per catalog row, or None).
+
+    Returns:
+        List[Dict[str, Any]]: Per job, either the plan arrays or an error message.
+    """
+    results = []
+    for job in jobs:
+        try:
+            plan = plan_meals(
+                _worker_nutrition,
+                job["diet"],
+                max_calories=job["max_calories"],
+                protein_floor=job["protein_floor"],
+                coverage=job.get("coverage"),
+                days=job["days"],
+                meals_per_day=job["meals_per_day"],
+                seed=job.get("seed"),
+            )
+        except PlannerError as e:
+            results.append({"key": job["key"], "error": str(e)})
+            continue
+        results.append({
+            "key": job["key"],
+            "rows": plan.rows.tolist(),
+            "portions": plan.portions.tolist(),
+            "objective": plan.objective,
+            "status": plan.status,
+        })
+    return results
+
+
+class PlannerPool:
+    """
+    Process pool that runs the meal planner for many users in parallel.
+
+    Workers are started with the spawn method, so they do not inherit the
+    server's threads, and receive the nutrition matrix once through the pool
+    initializer instead of once per task. The pool is rebuilt when the
+    catalog version changes.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, chunk_size: int = 16):
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._catalog_version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self, catalog_version: int, nutrition: NutritionMatrix) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None or self._catalog_version != catalog_version:
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(nutrition,),
+                )
+                self._catalog_version = catalog_version
+            return self._executor
+
+    def submit(
+        self,
+        catalog_version: int,
+        nutrition: NutritionMatrix,
+        jobs: Sequence[Dict[str, Any]],
+    ) -> List[Future]:
+        """
+        Split the jobs into chunks and submit them to the pool.
+
+        Args:
+            catalog_version (int): Version of the catalog snapshot `nutrition` belongs to.
+            nutrition (NutritionMatrix): Nutrition matrix shared by all workers.
+            jobs (Sequence[Dict[str, Any]]): Planning jobs, see `_plan_chunk`.
+
+        Returns:
+            List[Future]: One future per chunk, each resolving to a list of results.
+        """
+        executor = self._get_executor(catalog_version, nutrition)
+        return [
+            executor.submit(_plan_chunk, jobs[start:start + self.chunk_size])
+            for start in range(0, len(jobs), self.chunk_size)
+        ]
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+                self._catalog_version = None
+
+
+# Global instance
+planner_pool = PlannerPool(max_workers=PLANNER_WORKERS)
+
+def get_planner_pool() -> PlannerPool:
+    """Getter function for the shared planner process pool"""
+    return planner_pool
@@ -0,0 +1,159 @@
+import csv
+import json
+import os
+import re
+import tempfile
+import threading
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from config import PLAN_EXPORT_DIR
+from .pantry_store import format_quantity
+from .user_store import DEFAULT_USER_ID, UserRepository, get_user_repository
+
+
+def load_saved_plan(user_id: Optional[str] = None, repository: Optional[UserRepository] = None) -> Optional[Dict[str, Any]]:
+    """
+    The meal plan saved in a user's record, with its grocery list.
+
+    Plans are saved in the user's `currentMealPlan` by routes.meal_plan, so
+    every user has their own plan in the user repository (user_data.json or
+    the users table) and it outlives caches and restarts.
+
+    Args:
+        user_id (Optional[str]): User to look up; defaults to the default user.
+        repository (Optional[UserRepository]): Repository to read; defaults to the configured one.
+
+    Returns:
+        Optional[Dict[str, Any]]: The saved `meal_plan`, `grocery_list`, `objective`, `status`,
+        `inputs` and `revision`, or None if the user is unknown or has no plan yet.
+    """
+    repository = repository or get_user_repository()
+    user = repository.get(user_id) if user_id else repository.get_default()
+    saved = (user or {}).get("currentMealPlan") or {}
+    return saved if saved.get("meal_plan") else None
+
+
+def apply_grocery_delta(grocery_list: Iterable[Dict[str, Any]], delta: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Update a grocery list with new missing amounts of some ingredients.
+
+    Args:
+        grocery_list (Iterable[Dict[str, Any]]): Missing ingredients.
+        delta (Iterable[Dict[str, Any]]): Ingredients with their new `missing_amount`; zero removes them.
+
+    Returns:
+        List[Dict[str, Any]]: The updated list, in the original order with new ingredients last.
+    """
+    items = {item["ingredient"]: dict(item) for item in grocery_list}
+    for change in delta:
+        if change["missing_amount"] > 0:
+            items[change["ingredient"]] = {
+                "ingredient": change["ingredient"],
+                "missing_amount": change["missing_amount"],
+                "unit": change["unit"],
+            }
+        else:
+            items.pop(change["ingredient"], None)
+    return list(items.values())
+
+
+def export_paths(user: str, directory: str = PLAN_EXPORT_DIR) -> Dict[str, str]:
+    """
+    Files a user's artifacts are exported to.
+
+    The default user keeps the historical names (meal_plan.txt,
+    grocery_list.csv, grocery_list.txt); other users get their id,
+    reduced to safe characters, as a suffix.
+    """
+    suffix = "" if user == DEFAULT_USER_ID else "." + re.sub(r"[^A-Za-z0-9_-]", "_", user)
+    return {
+        "meal_plan": os.path.join(directory, f"meal_plan{suffix}.txt"),
+        "grocery_csv": os.path.join(directory, f"grocery_list{suffix}.csv"),
+        "grocery_txt": os.path.join(directory, f"grocery_list{suffix}.txt"),
+    }
+
+
+def _write_atomic(path: str, lines: Iterable[Sequence[str]], as_csv: bool = False) -> None:
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile("w", dir=directory, suffix=".tmp", delete=False,
+                                     encoding="utf-8", newline="") as file:
+        try:
+            if as_csv:
+                csv.writer(file, lineterminator="\n").writerows(lines)
+            else:
+                file.writelines(lines)
+        except BaseException:
+            file.close()
+            os.remove(file.name)
+            raise
+    os.replace(file.name, path)
+
+
+class PlanExporter:
+    """
+    Writes users' saved meal plans and grocery lists to files.
+
+    Meant to run as a background task after the response is sent, so
+    requests never wait on the disk. Each file is written to a temporary file
+    and renamed into place, so readers never see a partly written file.
+
+    A user's plan is read and written under a per-user lock, so overlapping
+    exports run one after the other and the last one always writes the
+    latest saved plan. The stamp of the plan (its inputs and revision) is
+    recorded once all files are written, so an unchanged plan is not written
+    again and a failed export is retried by the next one.
+    """
+
+    def __init__(self, directory: str = PLAN_EXPORT_DIR, repository: Optional[UserRepository] = None,
+                 lock_stripes: int = 64):
+        self.directory = directory
+        self.repository = repository
+        self._exported: Dict[str, str] = {}
+        self._locks = [threading.Lock() for _ in range(lock_stripes)]
+
+    def export(self, user_id: Optional[str] = None) -> bool:
+        """
+        Write a user's saved meal plan and grocery list, unless the files are already current.
+
+        Args:
+            user_id (Optional[str]): User to export; defaults to the default user.
+
+        Returns:
+            bool: Whether files were written.
+        """
+        user = user_id or DEFAULT_USER_ID
+        with self._locks[zlib.crc32(user.encode("utf-8")) % len(self._locks)]:
+            # Read under the lock: an export that waited here writes the plan saved meanwhile
+            saved = load_saved_plan(user_id, self.repository)
+            if saved is None:
+                return False
+            stamp = json.dumps([saved.get("inputs"), saved.get("revision", 0)])
+            if self._exported.get(user) == stamp:
+                return False
+
+            grocery_list = saved.get("grocery_list", [])
+            paths = export_paths(user, self.directory)
+            _write_atomic(paths["meal_plan"], [
+                line
+                for day, meals in saved["meal_plan"].items()
+                for line in [f"{day}:\n"] + [f"  {meal}: {serving}\n" for meal, serving in meals.items()]
+            ])
+            _write_atomic(paths["grocery_csv"], [("ingredient", "missing_amount", "unit")] + [
+                (item["ingredient"], format_quantity(item["missing_amount"]), item["unit"])
+                for item in grocery_list
+            ], as_csv=True)
+            _write_atomic(paths["grocery_txt"], [
+                f"{item['ingredient']}: {format_quantity(item['missing_amount'])} {item['unit']}\n"
+                for item in grocery_list
+            ])
+            self._exported[user] = stamp
+        return True
+
+
+# Global instance
+plan_exporter = PlanExporter()
+
+def get_plan_exporter() -> PlanExporter:
+    """Getter function for the shared meal plan and grocery list exporter"""
+    return plan_exporter
@@ -0,0 +1,295 @@
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+from .nutrition_matrix import NutritionMatrix
+
+# Portion sizes the planner may assign to a slot (1 = single, 2 = double portion)
+PORTIONS = (1, 2)
+
+# Objective weights; lower objective values are better
+PANTRY_WEIGHT = 1.0     # reward per slot for a recipe fully covered by the pantry
+DOUBLE_PENALTY = 0.5    # cost of serving a double portion instead of a single one
+JITTER = 0.05           # random tie-breaking so equally good plans vary between seeds
+REPEAT_PENALTY = 0.25   # cost per time a swapped-in recipe is already served elsewhere in the week
+
+# Relative optimality gap at which the solver stops; the jitter makes closing it further pointless
+MIP_GAP = 0.02
+
+
+class PlannerError(Exception):
+    """Raised when no meal plan satisfies the dietary constraints."""
+
+
+@dataclass(frozen=True)
+class PlanResult:
+    """
+    Solution of the meal planning problem.
+
+    `rows[d, m]` is the catalog row of the recipe served at meal `m` of day `d`
+    and `portions[d, m]` the number of portions of it.
+    """
+    rows: np.ndarray
+    portions: np.ndarray
+    objective: float
+    status: str
+    elapsed: float
+
+
+def plan_meals(
+    nutrition: NutritionMatrix,
+    diet: str,
+    max_calories: float,
+    protein_floor: float,
+    coverage: Optional[np.ndarray] = None,
+    days: int = 7,
+    meals_per_day: int = 3,
+    seed: Optional[int] = None,
+    time_limit: float = 2.0,
+    max_candidates: int = 60,
+) -> PlanResult:
+    """
+    Fill every meal slot of the plan in one pass with an integer linear program.
+
+    Each slot gets exactly one recipe of the requested diet, as a single or
+    double portion, and each day's meals are ordered from lightest to
+    heaviest. Every day stays within `max_calories` and reaches at least
+    `protein_floor` grams of protein, and a recipe is served at most once
+    per day and as few times per week as the catalog allows. The objective
+    prefers recipes the pantry already covers and single portions. The
+    solver stops once the plan is within `MIP_GAP` of the optimum or the
+    `time_limit` budget runs out.
+
+    Args:
+        nutrition (NutritionMatrix): Nutrition matrix of the catalog.
+        diet (str): Dietary goal to plan for.
+        max_calories (float): Daily calorie cap.
+        protein_floor (float): Minimum daily protein in grams.
+        coverage (Optional[np.ndarray]): Pantry coverage per catalog row, see IngredientMatrix.coverage.
+        days (int): Number of days to plan.
+        meals_per_day (int): Number of meals per day.
+        seed (Optional[int]): Seed for tie-breaking; the same seed yields the same plan.
+        time_limit (float): Total solver time budget in seconds.
+        max_candidates (int): Number of recipes kept in the model for large catalogs.
+
+    Returns:
+        PlanResult: The chosen recipes, portions and objective value.
+
+    Raises:
+        PlannerError: If no recipes match the diet or the constraints cannot be met.
+    """
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+
+    candidates = nutrition.diet_rows(diet)
+    if candidates.size == 0:
+        raise PlannerError(f"No recipes found for diet '{diet}'")
+
+    calories = nutrition.values[candidates, 0].astype(np.float64)
+    protein = nutrition.values[candidates, 1].astype(np.float64)
+    pantry = np.zeros(candidates.size) if coverage is None else np.asarray(coverage, dtype=np.float64)[candidates]
+
+    # Drop recipes that cannot fit into a day on their own, then keep the most promising ones
+    keep = calories <= max_calories
+    if keep.sum() > max_candidates:
+        score = PANTRY_WEIGHT * pantry + protein / max(calories.max(), 1.0) + rng.uniform(0, JITTER, candidates.size)
+        keep &= score >= np.sort(score[keep])[-max_candidates]
+    candidates, calories, protein, pantry = candidates[keep], calories[keep], protein[keep], pantry[keep]
+    if candidates.size < meals_per_day:
+        raise PlannerError(f"Not enough recipes for diet '{diet}' fit within {max_calories:g} calories per day")
+
+    n_candidates = candidates.size
+    n_portions = len(PORTIONS)
+    n_x = days * n_candidates * n_portions
+
+    # Meals within a day are interchangeable, so the model picks a set of recipes
+    # per day with one binary x[day, candidate, portion] per choice. Keeping slots
+    # out of the model removes the symmetry that slows the solver down.
+    day, cand, portion = (a.ravel() for a in np.meshgrid(
+        np.arange(days), np.arange(n_candidates), np.arange(n_portions), indexing="ij"
+    ))
+    multiplier = np.asarray(PORTIONS, dtype=np.float64)[portion]
+    x = np.arange(n_x)
+
+    cost = (
+        -PANTRY_WEIGHT * pantry[cand]
+        + DOUBLE_PENALTY * (multiplier - 1)
+        + rng.uniform(0, JITTER, n_x)
+    )
+
+    row_meals = 0
+    row_calories = row_meals + days
+    row_protein = row_calories + days
+    row_daily_repeat = row_protein + days
+    row_weekly_use = row_daily_repeat + days * n_candidates
+    n_rows = row_weekly_use + n_candidates
+
+    matrix = sparse.csr_matrix(
+        (
+            np.concatenate([
+                np.ones(n_x),
+                calories[cand] * multiplier,
+                protein[cand] * multiplier,
+                np.ones(n_x),
+                np.ones(n_x),
+            ]),
+            (
+                np.concatenate([
+                    row_meals + day,                                # every meal of the day is filled
+                    row_calories + day,                             # daily calorie cap
+                    row_protein + day,                              # daily protein floor
+                    row_daily_repeat + day * n_candidates + cand,   # no recipe twice in one day
+                    row_weekly_use + cand,                          # weekly diversity cap
+                ]),
+                np.concatenate([x, x, x, x, x]),
+            ),
+        ),
+        shape=(n_rows, n_x),
+    )
+    lower = np.concatenate([
+        np.full(days, meals_per_day),
+        np.full(days, -np.inf),
+        np.full(days, protein_floor),
+        np.full(days * n_candidates + n_candidates, -np.inf),
+    ])
+    upper = np.concatenate([
+        np.full(days, meals_per_day),
+        np.full(days, max_calories),
+        np.full(days, np.inf),
+        np.ones(days * n_candidates),
+        np.zeros(n_candidates),  # filled in with the weekly cap below
+    ])
+
+    # Serve every recipe as few times a week as the catalog allows, relaxing the
+    # cap only when the nutrition constraints cannot be met otherwise
+    result = None
+    max_uses = max(1, -(-days * meals_per_day // n_candidates))
+    while max_uses <= days:
+        remaining = time_limit - (time.perf_counter() - started)
+        if remaining <= 0:
+            break
+        upper[row_weekly_use:] = max_uses
+        result = milp(
+            cost,
+            constraints=LinearConstraint(matrix, lower, upper),
+            integrality=np.ones(n_x),
+            bounds=Bounds(0, 1),
+            options={"time_limit": remaining, "mip_rel_gap": MIP_GAP},
+        )
+        if result.x is not None:
+            break
+        max_uses += 1
+
+    if result is None or result.x is None:
+        raise PlannerError(
+            f"Unable to meet protein goals within the calorie limit for diet '{diet}'. "
+            "Consider adding more high-protein recipes or increasing calorie limit."
+        )
+
+    # Exactly meals_per_day choices per day; serve them from the lightest to the heaviest meal
+    chosen = np.flatnonzero(result.x[:n_x] > 0.5)
+    chosen = chosen[np.lexsort((calories[cand[chosen]] * multiplier[chosen], day[chosen]))]
+    plan_rows = candidates[cand[chosen]].reshape(days, meals_per_day)
+    plan_portions = np.asarray(PORTIONS)[portion[chosen]].reshape(days, meals_per_day)
+
+    return PlanResult(
+        rows=plan_rows,
+        portions=plan_portions,
+        objective=float(result.fun),
+        status="solved" if result.status == 0 else "time_limit",
+        elapsed=time.perf_counter() - started,
+    )
+
+
+@dataclass(frozen=True)
+class SwapResult:
+    """Recipe row and portions chosen for one meal slot, with the slot's objective value."""
+    row: int
+    portions: int
+    objective: float
+
+
+def swap_meal(
+    nutrition: NutritionMatrix,
+    diet: str,
+    max_calories: float,
+    protein_floor: float,
+    day_rows: np.ndarray,
+    day_portions: np.ndarray,
+    slot: int,
+    week_rows: np.ndarray,
+    coverage_of: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+    recipe_row: Optional[int] = None,
+) -> SwapResult:
+    """
+    Choose a new recipe for one meal slot, keeping the rest of the plan fixed.
+
+    Only recipes of the diet that fit what is left of the day's budget are
+    considered: their calories must stay within the calories the other meals
+    leave, and their protein must cover what the other meals miss of the
+    floor. Among those the same objective as `plan_meals` applies (pantry
+    coverage, single portions), plus a penalty for recipes already served
+    elsewhere in the week. Recipes served in the same day are excluded.
+
+    Args:
+        nutrition (NutritionMatrix): Nutrition matrix of the catalog.
+        diet (str): Dietary goal of the plan.
+        max_calories (float): Daily calorie cap.
+        protein_floor (float): Minimum daily protein in grams.
+        day_rows (np.ndarray): Catalog rows of the day's meals.
+        day_portions (np.ndarray): Portions of the day's meals.
+        slot (int): Meal of the day to replace.
+        week_rows (np.ndarray): Catalog rows of every meal of the plan, including this day.
+        coverage_of (Optional[Callable[[np.ndarray], np.ndarray]]): Pantry coverage of the
+            given catalog rows, see IngredientMatrix.coverage; called for the fitting candidates only.
+        recipe_row (Optional[int]): Serve this recipe instead of searching; it must be of the diet
+            and fit the budget.
+
+    Returns:
+        SwapResult: The recipe row, its portions and the slot's objective value.
+
+    Raises:
+        PlannerError: If no recipe (or not the requested one) fits the day, or the
+            requested recipe is not of the diet.
+    """
+    others = np.arange(len(day_rows)) != slot
+    totals = nutrition.totals(day_rows[others], day_portions[others])
+    calorie_budget = max_calories - totals[0]
+    protein_needed = protein_floor - totals[1]
+
+    if recipe_row is None:
+        candidates = nutrition.diet_rows(diet)
+        candidates = candidates[~np.isin(candidates, day_rows)]
+    elif not nutrition.diet_mask(diet)[recipe_row]:
+        raise PlannerError(f"'{nutrition.names[recipe_row]}' is not a {diet} recipe")
+    elif recipe_row in day_rows[others]:
+        raise PlannerError(f"'{nutrition.names[recipe_row]}' is already served on that day")
+    else:
+        candidates = np.asarray([recipe_row], dtype=np.int64)
+
+    # Every (candidate, portion) pair that fits the rest of the day
+    candidate, portion = (a.ravel() for a in np.meshgrid(candidates, np.asarray(PORTIONS), indexing="ij"))
+    values = nutrition.values[candidate].astype(np.float64) * portion[:, None]
+    fits = (values[:, 0] <= calorie_budget) & (values[:, 1] >= protein_needed)
+    candidate, portion = candidate[fits], portion[fits]
+    if candidate.size == 0:
+        raise PlannerError(
+            f"No recipe for diet '{diet}' fits the remaining {calorie_budget:g} calories "
+            f"and {max(protein_needed, 0):g} g of protein of the day"
+        )
+
+    rows, inverse = np.unique(candidate, return_inverse=True)
+    pantry = np.zeros(rows.size) if coverage_of is None else np.asarray(coverage_of(rows), dtype=np.float64)
+    week_uses = np.bincount(np.asarray(week_rows, dtype=np.int64), minlength=len(nutrition))
+    week_uses[day_rows[slot]] -= 1  # The meal being replaced no longer counts
+    cost = (
+        -PANTRY_WEIGHT * pantry[inverse]
+        + DOUBLE_PENALTY * (portion - 1)
+        + REPEAT_PENALTY * week_uses[candidate]
+    )
+    best = np.lexsort((portion, candidate, cost))[0]
+    return SwapResult(row=int(candidate[best]), portions=int(portion[best]), objective=float(cost[best]))
@@ -0,0 +1,184 @@
+import re
+import threading
+from typing import Optional, Sequence
+
+import numpy as np
+
+from .ingredient_registry import IngredientRegistry, get_ingredient_registry
+
+# Canonical units by kind, with their size in the kind's base unit (grams, millilitres or items).
+# A garlic clove and a standard can weigh about the same whatever the ingredient.
+MASS_UNITS = {"g": 1.0, "kg": 1000.0, "mg": 0.001, "oz": 28.3495, "lb": 453.592, "clove": 5.0, "can": 400.0}
+VOLUME_UNITS = {"ml": 1.0, "l": 1000.0, "tsp": 4.92892, "tbsp": 14.7868, "cup": 240.0, "fl_oz": 29.5735}
+COUNT_UNITS = {"piece": 1.0, "slice": 1.0}
+
+UNITS = tuple(MASS_UNITS) + tuple(VOLUME_UNITS) + tuple(COUNT_UNITS)
+UNIT_CODES = {unit: code for code, unit in enumerate(UNITS)}
+
+# Spellings accepted for each canonical unit (plurals are handled separately)
+UNIT_ALIASES = {
+    "gram": "g", "gr": "g", "grm": "g",
+    "kilogram": "kg", "kilo": "kg",
+    "milligram": "mg",
+    "ounce": "oz",
+    "pound": "lb", "lbs": "lb",
+    "millilitre": "ml", "milliliter": "ml",
+    "litre": "l", "liter": "l",
+    "teaspoon": "tsp",
+    "tablespoon": "tbsp", "tbs": "tbsp",
+    "fluid_ounce": "fl_oz", "floz": "fl_oz",
+    "pc": "piece", "pcs": "piece", "each": "piece", "whole": "piece", "unit": "piece", "item": "piece",
+}
+
+# Density in g/ml of ingredients measured by volume; others are taken to weigh like water
+DENSITIES = {
+    "milk": 1.03, "whole_milk": 1.03, "almond_milk": 1.01, "coconut_milk": 0.97, "plant_milk": 1.02,
+    "cream": 1.01, "yogurt": 1.03, "greek_yogurt": 1.1, "sour_cream": 1.0,
+    "olive_oil": 0.91, "sesame_oil": 0.92, "butter": 0.91,
+    "soy_sauce": 1.2, "honey": 1.42, "maple_syrup": 1.32, "vinegar": 1.01,
+    "flour": 0.53, "almond_flour": 0.4, "oat_flour": 0.43, "cocoa": 0.45, "protein_powder": 0.4,
+    "rice": 0.85, "brown_rice": 0.85, "arborio_rice": 0.85, "quinoa": 0.72, "oats": 0.41,
+    "couscous": 0.7, "lentil": 0.8, "granola": 0.45, "breadcrumb": 0.45,
+    "peanut_butter": 1.09, "tahini": 1.05, "mayo": 0.91, "hummus": 1.05,
+    "salsa": 1.05, "marinara": 1.05, "tomato_sauce": 1.05,
+    "spinach": 0.13, "kale": 0.14, "lettuce": 0.2, "berry": 0.6, "pea": 0.6,
+}
+
+# Weight in grams of one piece of ingredients counted in pieces
+PIECE_GRAMS = {
+    "egg": 50.0, "egg_white": 33.0, "avocado": 150.0, "banana": 120.0, "lemon": 100.0, "lime": 67.0,
+    "tomato": 120.0, "cherry_tomato": 17.0, "onion": 110.0, "potato": 170.0, "sweet_potato": 130.0,
+    "carrot": 60.0, "cucumber": 300.0, "zucchini": 200.0, "bell_pepper": 120.0, "eggplant": 450.0,
+    "garlic": 40.0, "bread": 30.0, "low_carb_bread": 30.0, "tortilla": 45.0, "pita": 60.0,
+    "chicken": 170.0, "salmon": 150.0, "cod": 150.0, "steak": 225.0, "sausage": 75.0,
+}
+
+# Fallback for counted ingredients without a known piece weight
+DEFAULT_PIECE_GRAMS = 100.0
+
+
+class UnknownUnitError(ValueError):
+    """Raised for a unit of measurement the conversion table does not know."""
+
+
+def normalize_unit(unit: str) -> Optional[str]:
+    """
+    Canonical spelling of a unit ("Tablespoons" -> "tbsp", "grams" -> "g").
+
+    Returns:
+        Optional[str]: The canonical unit, or None if it is unknown.
+    """
+    key = "_".join(re.findall(r"[a-z]+", (unit or "").lower()))
+    # Plural suffixes are only stripped from a non-empty stem, so "s" or "es" alone is no unit
+    stems = [key[:-len(suffix)] for suffix in ("es", "s") if key.endswith(suffix) and len(key) > len(suffix)]
+    for candidate in [key] + stems:
+        candidate = UNIT_ALIASES.get(candidate, candidate)
+        if candidate in UNIT_CODES:
+            return candidate
+    return None
+
+
+def unit_codes(units: Sequence[str]) -> np.ndarray:
+    """Column of each unit in the conversion table, or -1 for unknown units."""
+    codes = {}
+    return np.fromiter(
+        (codes.setdefault(unit, UNIT_CODES.get(normalize_unit(unit), -1)) for unit in units),
+        dtype=np.int64,
+        count=len(units),
+    )
+
+
+class ConversionTable:
+    """
+    Grams per unit for every (ingredient id, unit) pair.
+
+    The table is a dense array with a row per interned ingredient and a
+    column per unit, precompiled from the unit sizes, ingredient densities
+    and piece weights, so converting any number of quantities is one fancy
+    index and one multiplication. Rows are added as the ingredient registry
+    grows.
+    """
+
+    def __init__(self, registry: Optional[IngredientRegistry] = None):
+        self.registry = registry if registry is not None else get_ingredient_registry()
+        self._table = np.empty((0, len(UNITS)), dtype=np.float64)
+        self._lock = threading.Lock()
+
+    def _row(self, name: str) -> np.ndarray:
+        density = DENSITIES.get(name, 1.0)
+        piece = PIECE_GRAMS.get(name, DEFAULT_PIECE_GRAMS)
+        return np.array(
+            [MASS_UNITS[unit] for unit in MASS_UNITS]
+            + [VOLUME_UNITS[unit] * density for unit in VOLUME_UNITS]
+            + [COUNT_UNITS[unit] * piece for unit in COUNT_UNITS],
+            dtype=np.float64,
+        )
+
+    @property
+    def table(self) -> np.ndarray:
+        """The grams-per-unit array, covering every ingredient interned so far."""
+        table = self._table
+        size = len(self.registry)
+        if table.shape[0] < size:
+            with self._lock:
+                table = self._table
+                if table.shape[0] < size:
+                    rows = [self._row(self.registry.name(i)) for i in range(table.shape[0], size)]
+                    table = np.vstack([table] + rows)
+                    self._table = table
+        return table
+
+    def to_grams(self, quantities: np.ndarray, ingredient_ids: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """
+        Convert quantities to grams.
+
+        Args:
+            quantities (np.ndarray): Amounts in the given units.
+            ingredient_ids (np.ndarray): Registry id of each ingredient.
+            codes (np.ndarray): Unit of each amount, see `unit_codes`.
+
+        Returns:
+            np.ndarray: Grams per amount; NaN where the unit is unknown.
+        """
+        codes = np.asarray(codes, dtype=np.int64)
+        factors = self.table[np.asarray(ingredient_ids, dtype=np.int64), np.maximum(codes, 0)]
+        return np.where(codes >= 0, np.asarray(quantities, dtype=np.float64) * factors, np.nan)
+
+    def grams_per_unit(self, ingredient: str, unit: str) -> float:
+        """
+        Grams in one `unit` of an ingredient.
+
+        Raises:
+            UnknownUnitError: If the unit is unknown.
+        """
+        code = UNIT_CODES.get(normalize_unit(unit), -1)
+        if code < 0:
+            raise UnknownUnitError(f"Unknown unit '{unit}'")
+        ingredient_id = self.registry.intern(ingredient)
+        return float(self.table[ingredient_id, code])
+
+
+# Global instance
+conversion_table = ConversionTable()
+
+def get_conversion_table() -> ConversionTable:
+    """Getter function for the shared unit conversion table"""
+    return conversion_table
+
+def convert_to_grams(quantity: float, unit: str, ingredient: str = "") -> float:
+    """
+    Convert an amount of an ingredient to grams.
+
+    Args:
+        quantity (float): Amount of the ingredient.
+        unit (str): Unit of measurement, in any common spelling ("Tablespoons", "g", "cups").
+        ingredient (str): Ingredient name, for its density and piece weight; without it,
+            volumes weigh like water and pieces 100 g.
+
+    Returns:
+        float: Equivalent amount in grams.
+
+    Raises:
+        UnknownUnitError: If the unit is unknown.
+    """
+    return quantity * conversion_table.grams_per_unit(ingredient, unit)
@@ -0,0 +1,193 @@
+import copy
+import json
+import os
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import USER_DATA_PATH, USER_STORE
+
+# Id of the user served when a request does not name one (single-user frontend)
+DEFAULT_USER_ID = "default"
+
+
+def user_key(user: Dict[str, Any]) -> str:
+    """Id of a stored user; records without an explicit id are addressed by name."""
+    return str(user.get("id") or user.get("name", ""))
+
+
+class UserRepository(ABC):
+    """
+    Storage for user records.
+
+    Users are plain dictionaries with `id`, `name`, `dietaryGoal` and
+    `currentMealPlan`. Returned dictionaries are copies and may be modified
+    freely by the caller.
+    """
+
+    @abstractmethod
+    def list_users(self) -> List[Dict[str, Any]]:
+        """Return every stored user."""
+
+    @abstractmethod
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Return the user with the given id, or None."""
+
+    @abstractmethod
+    def get_default(self) -> Optional[Dict[str, Any]]:
+        """Return the user served when a request does not name one, or None."""
+
+    @abstractmethod
+    def save(self, user: Dict[str, Any], user_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Create or replace a user.
+
+        Args:
+            user (Dict[str, Any]): The user's fields.
+            user_id (Optional[str]): Id of the user to write; None writes the default user.
+
+        Returns:
+            Dict[str, Any]: The stored user.
+        """
+
+
+class JsonUserRepository(UserRepository):
+    """
+    User repository backed by a JSON file, intended for development.
+
+    The parsed file is cached until its mtime or size changes, so reads do
+    not re-parse it. Writes hold a lock across the read-modify-write cycle
+    and replace the file atomically, so concurrent updates in one process no
+    longer overwrite each other and readers never see a partial file.
+    """
+
+    def __init__(self, path: str = USER_DATA_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        self._cache: Optional[Tuple[Tuple[int, int], Dict[str, Any], Dict[str, int]]] = None
+
+    def _load(self) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        """Return the parsed file and an id -> position index, re-reading only after a change."""
+        stat = os.stat(self.path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._cache
+        if cached is not None and cached[0] == signature:
+            return cached[1], cached[2]
+
+        with open(self.path, "r") as f:
+            data = json.load(f)
+        index = {user_key(user): i for i, user in reversed(list(enumerate(data.get("users", []))))}
+        self._cache = (signature, data, index)
+        return data, index
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        with tempfile.NamedTemporaryFile("w", dir=directory, suffix=".tmp", delete=False) as f:
+            json.dump(data, f, indent=4)
+            temp_path = f.name
+        os.replace(temp_path, self.path)
+        self._cache = None
+
+    def list_users(self) -> List[Dict[str, Any]]:
+        data, _ = self._load()
+        return copy.deepcopy(data.get("users", []))
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        data, index = self._load()
+        position = index.get(user_id)
+        return copy.deepcopy(data["users"][position]) if position is not None else None
+
+    def get_default(self) -> Optional[Dict[str, Any]]:
+        data, _ = self._load()
+        users = data.get("users", [])
+        return copy.deepcopy(users[0]) if users else None
+
+    def save(self, user: Dict[str, Any], user_id: Optional[str] = None) -> Dict[str, Any]:
+        with self._lock:
+            try:
+                data, index = self._load()
+                data = copy.deepcopy(data)
+            except FileNotFoundError:
+                data, index = {"users": []}, {}
+            users = data.setdefault("users", [])
+
+            if user_id is None:
+                # Update the first user (single user system)
+                position = 0 if users else None
+            else:
+                user = {"id": user_id, **user}
+                position = index.get(user_id)
+
+            if position is None:
+                users.append(user)
+            else:
+                users[position] = user
+            self._write(data)
+        return copy.deepcopy(user)
+
+
+class SqlUserRepository(UserRepository):
+    """
+    User repository backed by the SQLAlchemy engine in db.py.
+
+    Users are looked up by primary key and every call borrows a pooled
+    connection through the session factory, so concurrent requests update
+    different users independently and the same user transactionally.
+    """
+
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+
+    def list_users(self) -> List[Dict[str, Any]]:
+        from models import User
+
+        with self.session_factory() as session:
+            return [user.to_dict() for user in session.query(User).order_by(User.id)]
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        from models import User
+
+        with self.session_factory() as session:
+            user = session.get(User, user_id)
+            return user.to_dict() if user is not None else None
+
+    def get_default(self) -> Optional[Dict[str, Any]]:
+        return self.get(DEFAULT_USER_ID)
+
+    def save(self, user: Dict[str, Any], user_id: Optional[str] = None) -> Dict[str, Any]:
+        from models import User
+
+        with self.session_factory() as session, session.begin():
+            record = session.merge(User(
+                id=user_id or DEFAULT_USER_ID,
+                name=user.get("name", ""),
+                dietary_goal=user.get("dietaryGoal"),
+                current_meal_plan=user.get("currentMealPlan") or {},
+            ))
+            return record.to_dict()
+
+
+_repository: Optional[UserRepository] = None
+_repository_lock = threading.Lock()
+
+def get_user_repository() -> UserRepository:
+    """
+    Getter function for the configured user repository.
+
+    The backend is chosen with the USER_STORE setting: "sql" stores users in the
+    database configured by DB_URL, anything else uses user_data.json.
+    """
+    global _repository
+    if _repository is None:
+        with _repository_lock:
+            if _repository is None:
+                if USER_STORE == "sql":
+                    from db import Base, SessionLocal, engine
+                    from models import User
+
+                    Base.metadata.create_all(engine, tables=[User.__table__])
+                    _repository = SqlUserRepository(SessionLocal)
+                else:
+                    _repository = JsonUserRepository()
+    return _repository
@@ -0,0 +1,15 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+# Tests read and write a copy of user_data.json, so meal plans saved by the tests never change the tracked file,
+# and plan files are not exported unless a test asks for it, then into the same temporary directory.
+# Set before any test module imports config.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEST_DATA_DIR = tempfile.mkdtemp(prefix="recipe-app-tests-")
+atexit.register(shutil.rmtree, TEST_DATA_DIR, True)
+
+os.environ["USER_DATA_PATH"] = shutil.copy(os.path.join(BACKEND_DIR, "user_data.json"), TEST_DATA_DIR)
+os.environ["PLAN_EXPORT"] = "false"
+os.environ["PLAN_EXPORT_DIR"] = TEST_DATA_DIR
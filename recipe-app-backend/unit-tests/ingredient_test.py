@@ -7,6 +7,8 @@ from fastapi.testclient import TestClient
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from routes.ingredients import router
+from services.plan_store import export_paths
+from services.user_store import DEFAULT_USER_ID
 
 # Create a TestClient using the FastAPI router
 client = TestClient(router)
@@ -22,8 +24,8 @@ def test_get_available_ingredients():
 
 
 def test_output_grocery_list():
-    # Ensure the grocery_list.csv file exists and has the expected format
-    with open('grocery_list.csv', 'w', encoding='utf-8') as file:
+    # Ensure the exported grocery_list.csv file exists and has the expected format
+    with open(export_paths(DEFAULT_USER_ID)["grocery_csv"], 'w', encoding='utf-8') as file:
         file.write("ingredient,missing_amount,unit\n")
         file.write("sugar,200,grams\n")
 
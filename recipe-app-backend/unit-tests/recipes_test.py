@@ -6,7 +6,8 @@ from fastapi.testclient import TestClient
 # Add the parent directory to the sys.path to ensure routes can be imported
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from routes.recipes import router
+from fastapi import HTTPException
+from routes.recipes import parse_have, router
 
 # Create a TestClient using the FastAPI router
 client = TestClient(router)
@@ -29,4 +30,41 @@ def test_get_recipe_by_name_not_found():
     recipe_name = "non_existent_recipe"
     response = client.get(f"/recipes/{recipe_name}")
     assert response.status_code == 404
-    assert response.json() == {"detail": f"Recipe '{recipe_name}' not found."}
\ No newline at end of file
+    assert response.json() == {"detail": f"Recipe '{recipe_name}' not found."}
+
+
+def test_search_recipes_by_ingredients():
+    response = client.get("/recipes/search", params={"have": "tofu,broccoli,soy_sauce,garlic"})
+    assert response.status_code == 200
+    results = response.json()
+    assert results[0]["name"] == "High Protein Tofu Bowl"
+    assert results[0]["coverage"] == 1.0
+    assert results[0]["missing"] == {}
+    assert [r["coverage"] for r in results] == sorted((r["coverage"] for r in results), reverse=True)
+
+
+def test_search_recipes_counts_grams_on_hand():
+    response = client.get("/recipes/search", params={"have": "tofu:150,broccoli,soy_sauce,garlic", "min_coverage": 0.6})
+    bowl = next(r for r in response.json() if r["name"] == "High Protein Tofu Bowl")
+    assert bowl["missing"] == {"tofu": 150.0}
+    assert all(r["coverage"] >= 0.6 for r in response.json())
+
+
+def test_search_recipes_uses_pantry_by_default():
+    response = client.get("/recipes/search", params={"limit": 3})
+    assert response.status_code == 200
+    assert len(response.json()) <= 3
+
+
+def test_search_recipes_invalid_amount():
+    with pytest.raises(HTTPException) as error:
+        parse_have("tofu:lots")
+    assert error.value.status_code == 400
+
+
+def test_autocomplete_recipes():
+    response = client.get("/recipes/autocomplete", params={"q": "Vegan Tofu Scrambel", "limit": 3})
+    assert response.status_code == 200
+    suggestions = response.json()
+    assert suggestions[0]["name"] == "Vegan Tofu Scramble"
+    assert len(suggestions) <= 3
@@ -0,0 +1,128 @@
+import sys
+import os
+import json
+import pytest
+from fastapi.testclient import TestClient
+
+# Add the parent directory to the sys.path to ensure routes can be imported
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from RecipeAgent.agent import RecipeAgent, get_agent
+from RecipeAgent.llm import LLMError, ReplayClient
+from RecipeAgent.response_cache import get_response_cache
+from RecipeAgent.tools import ToolRegistry
+from routes.agent import router
+
+# Create a TestClient using the FastAPI router
+client = TestClient(router)
+
+
+class CountingClient(ReplayClient):
+    def __init__(self, rules):
+        super().__init__(rules)
+        self.calls = 0
+
+    def complete(self, messages, tools=None):
+        self.calls += 1
+        return super().complete(messages, tools)
+
+
+@pytest.fixture(autouse=True)
+def replay_backend(monkeypatch):
+    replay = ReplayClient.from_file()
+    client = CountingClient(replay.rules)
+    monkeypatch.setattr(get_agent(), "_client", client)
+    get_response_cache().clear()
+    return client
+
+
+def parse_sse(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_chat_without_function_call():
+    response = client.post("/chat", json={"message": "Hello there"})
+    assert response.status_code == 200
+    assert response.json()["reply"].startswith("Hello!")
+    assert response.json()["chart"] is None
+
+
+def test_chat_dispatches_function_call():
+    response = client.post("/chat", json={"message": "What meals do I have this week?"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["reasoning"] == "Used get_meal_plan to process your request"
+    assert set(body["chart"]) == {"Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"}
+
+
+def test_chat_stream_events():
+    response = client.post("/chat/stream", json={"message": "What should I eat on Monday?"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = parse_sse(response.text)
+    kinds = [kind for kind, _ in events]
+    assert kinds[0] == "function_call"
+    assert kinds[1] == "function_result"
+    assert kinds[-1] == "done"
+    assert "Monday" in events[1][1]["data"]
+
+    tokens = "".join(data["content"] for kind, data in events if kind == "token")
+    assert tokens == events[-1][1]["reply"]
+
+
+def test_repeated_chat_is_served_from_cache(replay_backend):
+    first = client.post("/chat", json={"message": "What meals do I have this week?"}).json()
+    calls = replay_backend.calls
+
+    second = client.post("/chat", json={"message": "what meals do I have this week"}).json()
+    assert second == first
+    assert replay_backend.calls == calls
+
+    # The cached answer is replayed on the streaming endpoint too
+    events = parse_sse(client.post("/chat/stream", json={"message": "What meals do I have this week?"}).text)
+    assert [kind for kind, _ in events][:2] == ["function_call", "function_result"]
+    assert events[-1][1]["reply"] == first["reply"]
+    assert replay_backend.calls == calls
+
+
+def test_chat_runs_several_tools():
+    response = client.post("/chat", json={"message": "What groceries do I need?"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["reasoning"] == "Used get_grocery_list, get_pantry to process your request"
+    assert set(body["chart"]) == {"get_grocery_list", "get_pantry"}
+
+
+def test_failed_tool_is_reported_to_the_model():
+    registry = ToolRegistry()
+
+    @registry.register(description="Always fails.")
+    def get_meal_plan():
+        raise RuntimeError("planner unavailable")
+
+    rules = [
+        {"when": {"role": "user"}, "response": {"tool_calls": [{"name": "get_meal_plan"}]}},
+        {"when": {"role": "tool"}, "response": {"content": "Sorry, I could not load your plan."}},
+    ]
+    agent = RecipeAgent(client=ReplayClient(rules), tools=registry)
+    response = agent.process_message("Show my meals")
+    assert response["reply"] == "Sorry, I could not load your plan."
+    assert response["data"] is None
+    assert response["tools"] == [{"name": "get_meal_plan", "error": "planner unavailable"}]
+    assert agent.response_cache.stats()["size"] == 0
+
+
+def test_replay_without_matching_fixture():
+    client = ReplayClient(rules=[])
+    with pytest.raises(LLMError):
+        client.complete([{"role": "user", "content": "Hello"}])
+
+    agent = RecipeAgent(client=client)
+    response = agent.process_message("Hello")
+    assert response["reply"].startswith("I apologize")
+    assert agent.response_cache.stats()["size"] == 0  # Errors are not cached
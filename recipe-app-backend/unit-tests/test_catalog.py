@@ -0,0 +1,123 @@
+import sys
+import os
+import pytest
+
+# Add the parent directory to the sys.path to ensure services can be imported
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.catalog import RecipeCatalog
+
+HEADER = "Recipe Name,Diet,Ingredients,Calories,Protein (g),Carbs (g),Fat (g)\n"
+
+
+def write_csv(path, rows, mtime_ns):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(HEADER)
+        f.writelines(rows)
+    # Set an explicit mtime so the change is detected regardless of filesystem timestamp resolution
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_snapshot_is_reused_until_file_changes(tmp_path):
+    csv_path = tmp_path / "recipes.csv"
+    write_csv(csv_path, ['Tofu Bowl,vegan,"tofu:300; garlic:10",400,35,25,22\n'], 1_000_000_000)
+
+    catalog = RecipeCatalog(str(csv_path))
+    first = catalog.snapshot()
+    assert catalog.snapshot() is first
+    assert first.recipes["tofu bowl"]["ingredients"] == {"tofu": 300, "garlic": 10}
+
+    write_csv(csv_path, [
+        'Tofu Bowl,vegan,"tofu:300; garlic:10",400,35,25,22\n',
+        'Bean Chili,vegan,"black_beans:200",380,20,50,8\n',
+    ], 2_000_000_000)
+
+    second = catalog.snapshot()
+    assert second is not first
+    assert second.version == first.version + 1
+    assert "bean chili" in second.recipes
+    # The old snapshot is untouched by the reload
+    assert "bean chili" not in first.recipes
+
+
+def test_snapshot_is_read_only(tmp_path):
+    csv_path = tmp_path / "recipes.csv"
+    write_csv(csv_path, ['Tofu Bowl,vegan,"tofu:300",400,35,25,22\n'], 1_000_000_000)
+
+    recipes = RecipeCatalog(str(csv_path)).recipes
+    with pytest.raises(TypeError):
+        recipes["new recipe"] = {}
+
+
+def test_last_good_snapshot_survives_missing_file(tmp_path):
+    csv_path = tmp_path / "recipes.csv"
+    write_csv(csv_path, ['Tofu Bowl,vegan,"tofu:300",400,35,25,22\n'], 1_000_000_000)
+
+    catalog = RecipeCatalog(str(csv_path))
+    first = catalog.snapshot()
+    os.remove(csv_path)
+    assert catalog.snapshot() is first
+
+
+def test_missing_file_on_first_load(tmp_path):
+    catalog = RecipeCatalog(str(tmp_path / "missing.csv"))
+    with pytest.raises(FileNotFoundError):
+        catalog.snapshot()
+
+
+def test_nutrition_matrix_totals_and_diet_filter(tmp_path):
+    csv_path = tmp_path / "recipes.csv"
+    write_csv(csv_path, [
+        'Tofu Bowl,vegan,"tofu:300",400,35,25,22\n',
+        'Keto Chicken,keto,"chicken:250",650,75,8,45\n',
+        'Bean Chili,Vegan,"black_beans:200",380,20,50,8\n',
+    ], 1_000_000_000)
+
+    nutrition = RecipeCatalog(str(csv_path)).snapshot().nutrition
+    vegan_rows = nutrition.diet_rows("VEGAN")
+    assert [nutrition.names[row] for row in vegan_rows] == ["tofu bowl", "bean chili"]
+
+    rows = nutrition.rows(["Tofu Bowl", "bean chili", "unknown"])
+    assert rows.tolist() == [0, 2, -1]
+    assert nutrition.as_dict(nutrition.totals(rows[:2])) == {
+        "calories": 780.0, "protein": 55.0, "carbs": 75.0, "fat": 30.0,
+    }
+    assert nutrition.totals(rows[:2], counts=[2, 1])[0] == 1180.0
+    assert nutrition.exceeded(nutrition.totals(rows[:2]), {"calories": 2000, "protein": 50}, 0.4) == ["protein"]
+
+
+def test_ingredient_matrix_requirements_and_shortfall(tmp_path):
+    csv_path = tmp_path / "recipes.csv"
+    write_csv(csv_path, [
+        'Tofu Bowl,vegan,"tofu:300; garlic:10",400,35,25,22\n',
+        'Garlic Tofu,vegan,"Tofu:100; garlic:20",300,25,10,12\n',
+    ], 1_000_000_000)
+
+    matrix = RecipeCatalog(str(csv_path)).snapshot().ingredients
+    assert matrix.shape == (2, 2)
+
+    counts = matrix.counts([0, 0, 1])
+    required = dict(zip(matrix.vocabulary, matrix.requirements(counts)))
+    assert required == {"tofu": 700.0, "garlic": 40.0}
+
+    pantry = matrix.pantry_vector({"tofu": 1000.0, "garlic": 15.0, "rice": 500.0})
+    shortfall = dict(zip(matrix.vocabulary, matrix.shortfall(counts, pantry)))
+    assert shortfall == {"tofu": 0.0, "garlic": 25.0}
+
+
+def test_ingredient_matrix_search_matches_full_coverage(tmp_path):
+    csv_path = tmp_path / "recipes.csv"
+    write_csv(csv_path, [
+        'Tofu Bowl,vegan,"tofu:300; garlic:10",400,35,25,22\n',
+        'Rice Bowl,vegan,"rice:200; garlic:20",300,5,60,2\n',
+        'Omelette,vegetarian,"eggs:150",250,18,2,18\n',
+    ], 1_000_000_000)
+
+    matrix = RecipeCatalog(str(csv_path)).snapshot().ingredients
+    available = {"tofu": 150.0, "garlic": float("inf")}
+    rows, coverage = matrix.search(available)
+
+    assert rows.tolist() == [0, 1]
+    full = matrix.coverage(matrix.pantry_vector({"tofu": 150.0, "garlic": 1e9}))
+    assert coverage.tolist() == pytest.approx(full[rows].tolist())
+    assert full[2] == 0.0
@@ -0,0 +1,54 @@
+import sys
+import os
+import json
+
+# Add the parent directory to the sys.path to ensure routes can be imported
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from RecipeAgent.context import ContextBuilder, count_tokens, dedupe_results
+
+MEAL_PLAN = json.dumps({day: {"breakfast": {"name": "Oatmeal", "calories": 300}} for day in
+                        ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]})
+
+
+def conversation(turns):
+    history = []
+    for i in range(turns):
+        history.append({"role": "user", "content": f"Question number {i}. Tell me about meal {i} in detail please."})
+        history.append({"role": "assistant", "content": f"Answer number {i}. " + "Some words here. " * 20})
+    return history
+
+
+def test_short_conversation_is_sent_unchanged():
+    history = conversation(2)
+    messages = ContextBuilder(max_tokens=3000).build("You help.", history, "Hi")
+    assert messages == [{"role": "system", "content": "You help."}] + history + [{"role": "user", "content": "Hi"}]
+
+
+def test_long_conversation_fits_the_budget():
+    builder = ContextBuilder(max_tokens=600, summary_tokens=100)
+    history = conversation(40)
+    messages = builder.build("You help.", history, "What now?")
+
+    assert sum(count_tokens(m) for m in messages) <= 600
+    assert messages[0]["content"] == "You help."
+    assert messages[1]["content"].startswith("Summary of the earlier conversation:")
+    assert messages[-2] == history[-1]
+    assert messages[-1] == {"role": "user", "content": "What now?"}
+
+
+def test_client_system_messages_are_not_repeated():
+    history = [{"role": "system", "content": "You help."}, {"role": "user", "content": "Hi"}]
+    messages = ContextBuilder().build("You help.", history, "Hello")
+    assert [m["role"] for m in messages] == ["system", "user", "user"]
+
+
+def test_repeated_meal_plans_are_deduplicated():
+    history = [
+        {"role": "assistant", "content": MEAL_PLAN},
+        {"role": "user", "content": "Show it again"},
+        {"role": "assistant", "content": json.dumps(json.loads(MEAL_PLAN), indent=2)},
+    ]
+    deduped = dedupe_results(history)
+    assert deduped[0]["content"].startswith("[Same data")
+    assert deduped[1:] == history[1:]
@@ -0,0 +1,47 @@
+import sys
+import os
+import numpy as np
+
+# Add the parent directory to the sys.path to ensure services can be imported
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ingredient_matrix import IngredientMatrix
+from services.ingredient_registry import IngredientRegistry, canonical_name
+
+
+def test_canonical_names():
+    assert canonical_name("Soy Sauce") == "soy_sauce"
+    assert canonical_name("Bell Peppers") == "bell_pepper"
+    assert canonical_name("sweet_potatoes") == canonical_name("sweet_potato") == "sweet_potato"
+    assert canonical_name("berries") == "berry"
+    assert canonical_name("grape_leaves") == "grape_leaf"
+    assert canonical_name("hummus") == "hummus"
+    assert canonical_name("asparagus") == "asparagus"
+    assert canonical_name("Cheeses") == canonical_name("cheese") == "cheese"
+    assert canonical_name("glasses") == "glass"
+    assert canonical_name("Garbanzo Beans") == "chickpea"
+
+
+def test_interned_ids_are_stable():
+    registry = IngredientRegistry()
+    tomato = registry.intern("Tomatoes")
+    assert registry.intern("tomato") == tomato
+    assert registry.intern("garlic") != tomato
+    assert registry.name(tomato) == "tomato"
+    assert registry.lookup("TOMATOES") == tomato
+    assert registry.lookup("saffron") is None
+
+
+def test_pantry_joins_on_ids():
+    registry = IngredientRegistry()
+    recipes = {
+        "stir fry": {"ingredients": {"soy_sauce": 30, "bell_peppers": 100}},
+        "salad": {"ingredients": {"sweet_potatoes": 200, "bell_pepper": 50}},
+    }
+    matrix = IngredientMatrix.from_recipes(recipes)
+    matrix = IngredientMatrix(matrix.vocabulary, matrix.quantities, registry)
+    assert sorted(matrix.vocabulary) == ["bell_pepper", "soy_sauce", "sweet_potato"]
+
+    pantry = matrix.pantry_vector_from_ids(registry.intern_all(["Soy Sauce", "Bell Peppers", "Rice"]), np.array([10.0, 500.0, 100.0]))
+    shortfall = dict(zip(matrix.vocabulary, matrix.shortfall(matrix.counts([0, 1]), pantry)))
+    assert shortfall == {"soy_sauce": 20.0, "bell_pepper": 0.0, "sweet_potato": 200.0}
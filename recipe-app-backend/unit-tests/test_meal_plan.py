@@ -1,12 +1,17 @@
 import sys
 import os
-import pytest
+import json
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 # Add the parent directory to the sys.path to ensure routes can be imported
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from routes.meal_plan import router
+from routes.meal_plan import get_meal_plan_version, router, swap_planned_meal
+from services.plan_cache import get_plan_cache
+from services.plan_store import load_saved_plan
+import services.user_store as user_store
 
 # Create a TestClient using the FastAPI router
 client = TestClient(router)
@@ -21,8 +26,8 @@ def test_create_meal_plan():
     days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
     meals = ["Breakfast", "Lunch", "Dinner"]
     
-    # Check if meal_plan.txt was created
-    assert os.path.exists('meal_plan.txt')
+    # Check that the plan was saved with the user
+    assert load_saved_plan()["meal_plan"] == meal_plan
     
     # Read user's dietary goals
     current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -60,14 +65,91 @@ def test_create_meal_plan():
         # Verify protein goal is at least 80% met
         assert daily_protein >= (0.8 * protein_goal), f"{day} doesn't meet protein goal"
 
-def test_meal_plan_invalid_user():
-    # Temporarily rename user_data.json to simulate missing file
-    if os.path.exists('user_data.json'):
-        os.rename('user_data.json', 'user_data.json.bak')
-    
-    response = client.get("/meal-plan")
+def test_batch_meal_plans():
+    request = {
+        "user_ids": ["Nobody"],
+        "profiles": [
+            {"id": "a", "dietaryGoal": "vegan"},
+            {"id": "b", "dietaryGoal": "keto", "nutritionalGoals": {"calories": 2800, "protein": 120}},
+            {"id": "c", "dietaryGoal": "carnivore"},
+        ],
+        "seed": 1,
+    }
+    response = client.post("/meal-plan/batch", json=request)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = {line["user_id"]: line for line in map(json.loads, response.text.splitlines())}
+    assert set(lines) == {"Nobody", "a", "b", "c"}
+    assert "error" in lines["Nobody"]
+    assert "error" in lines["c"]
+    for user_id in ("a", "b"):
+        assert set(lines[user_id]["meal_plan"]) == {"Monday", "Tuesday", "Wednesday", "Thursday",
+                                                    "Friday", "Saturday", "Sunday"}
+        assert lines[user_id]["objective"] is not None
+
+def test_batch_plan_matches_single_plan():
+    single = client.get("/meal-plan", params={"user_id": "Jane Smith"}).json()["meal_plan"]
+    response = client.post("/meal-plan/batch", json={"user_ids": ["Jane Smith"]})
+    batch = json.loads(response.text.splitlines()[0])["meal_plan"]
+    assert {day: [meal["name"] for meal in meals.values()] for day, meals in batch.items()} == \
+        {day: [meal["name"] for meal in meals.values()] for day, meals in single.items()}
+
+def test_meal_plan_is_cached():
+    first = client.get("/meal-plan").json()
+    hits = client.get("/meal-plan/cache-stats").json()["hits"]
+
+    second = client.get("/meal-plan").json()
+    assert second == first
+    assert client.get("/meal-plan/cache-stats").json()["hits"] == hits + 1
+
+def test_swap_single_meal():
+    plan = client.get("/meal-plan").json()["meal_plan"]
+    version = get_meal_plan_version()
+
+    response = client.post("/meal-plan/monday/lunch/swap")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["previous"]["name"] == plan["Monday"]["Lunch"]["name"]
+    assert body["serving"]["name"] not in {plan["Monday"][meal]["name"] for meal in plan["Monday"]}
+    assert all(item["change"] != 0 for item in body["grocery_delta"])
+
+    # Only the swapped slot changed; the saved plan and grocery list follow it
+    swapped = client.get("/meal-plan").json()["meal_plan"]
+    assert swapped["Monday"]["Lunch"]["name"] == body["serving"]["name"]
+    assert {day: meals for day, meals in swapped.items() if day != "Monday"} == \
+        {day: meals for day, meals in plan.items() if day != "Monday"}
+    saved = load_saved_plan()
+    assert saved["meal_plan"] == swapped
+    grocery_list = {item["ingredient"]: item["missing_amount"] for item in saved["grocery_list"]}
+    for item in body["grocery_delta"]:
+        assert grocery_list.get(item["ingredient"], 0.0) == item["missing_amount"]
+
+    # The swap is saved with the user under a new plan version, so it outlives the plan cache
+    assert get_meal_plan_version() != version
+    get_plan_cache().invalidate()
+    assert client.get("/meal-plan").json()["meal_plan"] == swapped
+
+def test_concurrent_swaps_are_all_kept():
+    client.get("/meal-plan")
+    revision = get_meal_plan_version()[-1]
+
+    slots = [("Tuesday", "Breakfast"), ("Wednesday", "Dinner"), ("Thursday", "Lunch"), ("Friday", "Dinner")]
+    with ThreadPoolExecutor(max_workers=len(slots)) as pool:
+        swaps = list(pool.map(lambda slot: swap_planned_meal(*slot), slots))
+
+    assert get_meal_plan_version()[-1] == revision + len(slots)
+    saved = load_saved_plan()["meal_plan"]
+    assert client.get("/meal-plan").json()["meal_plan"] == saved
+    for swap in swaps:
+        assert saved[swap["day"]][swap["meal"]]["name"] == swap["serving"]["name"]
+
+def test_meal_plan_invalid_user(tmp_path, monkeypatch):
+    # Point the user repository at a missing file to simulate missing user data
+    monkeypatch.setattr(user_store, "_repository", user_store.JsonUserRepository(str(tmp_path / "user_data.json")))
+
+    # Mounted on an app, so the error reaches the client as a response
+    app = FastAPI()
+    app.include_router(router)
+    response = TestClient(app).get("/meal-plan")
     assert response.status_code == 500
-    
-    # Restore the file
-    if os.path.exists('user_data.json.bak'):
-        os.rename('user_data.json.bak', 'user_data.json')
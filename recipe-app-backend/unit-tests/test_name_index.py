@@ -0,0 +1,42 @@
+import sys
+import os
+
+# Add the parent directory to the sys.path to ensure services can be imported
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.name_index import RecipeNameIndex
+
+NAMES = ["Vegan Tofu Scramble", "High Protein Tofu Bowl", "Tofu Bowl", "Chicken Curry", "Chickpea Curry Bowl"]
+index = RecipeNameIndex(NAMES)
+
+
+def names(rows):
+    return [NAMES[row] for row in rows]
+
+
+def test_prefix_completion_prefers_names_starting_with_the_prefix():
+    assert names(index.complete("tof")) == ["Tofu Bowl", "Vegan Tofu Scramble", "High Protein Tofu Bowl"]
+    assert names(index.complete("chick")) == ["Chicken Curry", "Chickpea Curry Bowl"]
+    assert index.complete("zzz") == []
+    assert index.complete("") == []
+
+
+def test_exact_name_scores_highest():
+    row, score = index.search("tofu bowl")[0]
+    assert NAMES[row] == "Tofu Bowl"
+    assert score == 1.0
+
+
+def test_misspelled_name_is_found():
+    row, score = index.search("Vegan Tofu Scrambel")[0]
+    assert NAMES[row] == "Vegan Tofu Scramble"
+    assert 0.6 < score < 0.9
+    assert index.resolve("chicken cury") == NAMES.index("Chicken Curry")
+    assert index.resolve("lasagna") is None
+
+
+def test_partial_names_do_not_resolve():
+    assert index.resolve("Tofu  bowl!") == NAMES.index("Tofu Bowl")
+    assert index.resolve("tofu") is None
+    assert index.resolve("a") is None
+    assert index.suggest("tofu", limit=2) == ["Tofu Bowl", "Vegan Tofu Scramble"]
@@ -0,0 +1,89 @@
+import sys
+import os
+import pytest
+from fastapi.testclient import TestClient
+
+# Add the parent directory to the sys.path to ensure routes can be imported
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import routes.nutrition as nutrition
+from routes.nutrition import router, calculate_nutritional_value, check_recipes_compatibility, serving_nutrients
+from routes.recipes import get_recipes, get_recipe_snapshot
+from routes.meal_plan import DAYS_OF_WEEK, MEAL_TYPES
+from services.nutrition_ledger import NutritionLedger
+
+# Create a TestClient using the FastAPI router
+client = TestClient(router)
+
+BOWL = "High Protein Tofu Bowl"
+
+
+def test_totals_do_not_compound():
+    recipe = get_recipes()[BOWL.lower()]
+    result = calculate_nutritional_value([BOWL] * 4)
+    assert result["calories"] == recipe["calories"] * 4
+    assert result["protein"] == recipe["protein_g"] * 4
+
+
+def test_per_day_and_per_meal_breakdowns():
+    recipe = get_recipes()[BOWL.lower()]
+    response = client.post("/calculate-nutrition", json={"meals": [BOWL] * 270})
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["per_day"]) == 90
+    assert body["per_day"][0]["calories"] == recipe["calories"] * 3
+    assert set(body["per_meal"]) == {"Breakfast", "Lunch", "Dinner"}
+    assert body["per_meal"]["Lunch"]["calories"] == recipe["calories"] * 90
+    assert body["calories"] == recipe["calories"] * 270
+
+
+def test_plain_list_and_misspelled_names():
+    response = client.post("/calculate-nutrition", json=["Vegan Tofu Scrambel", "no such dish"])
+    assert response.status_code == 200
+    body = response.json()
+    assert body["resolved"] == {"Vegan Tofu Scrambel": "Vegan Tofu Scramble"}
+    assert body["unknown"] == ["no such dish"]
+    assert body["calories"] == get_recipes()["vegan tofu scramble"]["calories"]
+
+
+def test_partial_names_are_unknown_with_suggestions():
+    body = client.post("/calculate-nutrition", json=["a", "Chicken"]).json()
+    assert body["unknown"] == ["a", "Chicken"]
+    assert body["resolved"] == {}
+    assert body["calories"] == 0
+    assert all("Chicken" in name for name in body["suggestions"]["Chicken"])
+
+
+def test_compatibility_reads_catalog_rows():
+    bowl = get_recipes()[BOWL.lower()]
+    custom = {"name": "Custom Salad", "diet": bowl["diet"], "ingredients": {}, "calories": 100, "protein_g": 5}
+    compatible, reason, totals = check_recipes_compatibility([bowl, custom], {}, "keto", {"user_preferences": []})
+    assert not compatible and BOWL in reason and "Custom Salad" in reason
+    assert totals["calories"] == 0
+
+    compatible, reason, totals = check_recipes_compatibility([bowl, custom], {}, bowl["diet"], {"user_preferences": []})
+    assert totals["calories"] == bowl["calories"] + 100
+    assert totals["protein"] == bowl["protein_g"] + 5
+
+
+def test_ledger_swap_updates_day_totals(monkeypatch):
+    # Build the ledger directly, so the test does not depend on user_data.json
+    snapshot = get_recipe_snapshot()
+    plan = NutritionLedger(DAYS_OF_WEEK, MEAL_TYPES, {"calories": 2000, "protein": 100, "carbs": 200, "fat": 70, "fiber": 30})
+    for row, meal in enumerate(MEAL_TYPES):
+        plan.set_meal("Monday", meal, snapshot.nutrition.names[row], serving_nutrients(snapshot, row, 1))
+    monkeypatch.setattr(nutrition, "get_ledger", lambda user_id=None: plan)
+
+    ledger = client.get("/nutrition/ledger").json()
+    monday = ledger["days"][0]
+    assert set(ledger["goals"]) == {"calories", "protein", "carbs", "fat", "fiber"}
+
+    recipe = get_recipes()[BOWL.lower()]
+    lunch = monday["meals"]["Lunch"]
+    response = client.put("/nutrition/ledger/Monday/Lunch", json={"recipe": BOWL, "portions": 2})
+    assert response.status_code == 200
+    day = response.json()["day"]
+    assert day["meals"]["Lunch"]["name"] == BOWL
+    expected = monday["totals"]["calories"] - lunch["calories"] + 2 * recipe["calories"]
+    assert day["totals"]["calories"] == pytest.approx(expected)
+    assert day["totals"]["fiber"] > 0
@@ -0,0 +1,57 @@
+import sys
+import os
+import numpy as np
+import pytest
+
+# Add the parent directory to the sys.path to ensure services can be imported
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.nutrition_ledger import LedgerStore, NutritionLedger
+
+GOALS = {"calories": 2000, "protein": 60, "carbs": 220, "fat": 60, "fiber": 30}
+
+
+def make_ledger():
+    ledger = NutritionLedger(["Monday", "Tuesday"], ["Breakfast", "Lunch", "Dinner"], GOALS)
+    ledger.set_meal("Monday", "Breakfast", "Oatmeal", np.array([300, 10, 50, 5, 8]))
+    ledger.set_meal("Monday", "Lunch", "Tofu Bowl", np.array([400, 35, 25, 22, 11]))
+    ledger.set_meal("Tuesday", "Dinner", "Chili", np.array([500, 30, 40, 20, 12]))
+    return ledger
+
+
+def test_running_totals_follow_swaps():
+    ledger = make_ledger()
+    ledger.set_meal("monday", "lunch", "Salad", np.array([200, 5, 10, 15, 6]))
+    assert ledger.day_totals[0].tolist() == [500, 15, 60, 20, 14]
+    assert ledger.week_totals.tolist() == [1000, 45, 100, 40, 26]
+
+    ledger.set_meal("Tuesday", "Dinner", None, np.zeros(5))
+    assert ledger.week_totals.tolist() == [500, 15, 60, 20, 14]
+    assert ledger.day_report("Tuesday")["meals"]["Dinner"] is None
+
+
+def test_deviation_from_goals():
+    ledger = NutritionLedger(["Monday"], ["Lunch"], {"calories": 2000, "protein": 60})
+    ledger.set_meal("Monday", "Lunch", "Tofu Bowl", np.array([400, 35, 25, 22, 11]))
+    deviation = ledger.day_report("Monday")["deviation"]
+    assert deviation["calories"] == {"difference": -1600.0, "percent_of_goal": 20.0}
+    assert deviation["fiber"] is None  # No fiber goal for this diet
+
+
+def test_unknown_slot():
+    with pytest.raises(KeyError):
+        make_ledger().set_meal("Funday", "Lunch", "Soup", np.zeros(5))
+
+
+def test_store_rebuilds_when_plan_version_changes():
+    store = LedgerStore()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return make_ledger()
+
+    first = store.get("alice", 1, build)
+    assert store.get("alice", 1, build) is first
+    assert store.get("alice", 2, build) is not first
+    assert len(builds) == 2
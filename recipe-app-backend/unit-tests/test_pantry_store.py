@@ -0,0 +1,85 @@
+import sys
+import os
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add the parent directory to the sys.path to ensure services can be imported
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import Base
+from models import Ingredient
+import services.pantry_store as pantry_store
+from services.pantry_store import CsvPantryRepository, SqlPantryRepository
+
+
+@pytest.fixture
+def csv_repository(tmp_path):
+    path = tmp_path / "user_available_ingredients.csv"
+    path.write_text("Ingredient,Quantity,Unit\ntomatoes,1000,grams\n,5,grams\n")
+    return CsvPantryRepository(str(path))
+
+
+@pytest.fixture
+def sql_repository():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine, tables=[Ingredient.__table__])
+    return SqlPantryRepository(sessionmaker(bind=engine))
+
+
+def test_csv_repository_upserts_by_canonical_name(csv_repository):
+    assert csv_repository.list_items("anyone") == [{"name": "tomatoes", "quantity": "1000", "unit": "grams"}]
+    version = csv_repository.version("anyone")
+
+    assert csv_repository.upsert("anyone", [{"name": "Tomato", "quantity": 250.0, "unit": "g"},
+                                            {"name": "Bell Peppers", "quantity": 2, "unit": "pieces"}]) == 2
+    assert csv_repository.list_items("anyone") == [
+        {"name": "tomato", "quantity": "250", "unit": "g"},
+        {"name": "bell_pepper", "quantity": "2", "unit": "pieces"},
+    ]
+    assert csv_repository.version("anyone") != version
+
+    assert csv_repository.delete("anyone", ["tomatoes"]) == 1
+    assert [item["name"] for item in csv_repository.list_items("anyone")] == ["bell_pepper"]
+
+
+def test_sql_repository_keeps_a_pantry_per_user(sql_repository):
+    sql_repository.upsert("alex", [{"name": "Tofu", "quantity": 400, "unit": "grams"},
+                                   {"name": "tofu", "quantity": 300, "unit": "grams"}])
+    sql_repository.upsert("sam", [{"name": "eggs", "quantity": 12, "unit": "pieces"}])
+
+    assert sql_repository.list_items("alex") == [{"name": "tofu", "quantity": "300", "unit": "grams"}]
+    assert sql_repository.list_items("sam") == [{"name": "egg", "quantity": "12", "unit": "pieces"}]
+    assert sql_repository.list_items("nobody") == []
+
+
+def test_sql_repository_version_changes_on_every_write(sql_repository):
+    empty = sql_repository.version("alex")
+    sql_repository.upsert("alex", [{"name": "rice", "quantity": 500, "unit": "grams"}])
+    first = sql_repository.version("alex")
+    assert sql_repository.list_items("alex")[0]["quantity"] == "500"
+
+    sql_repository.upsert("alex", [{"name": "rice", "quantity": 200, "unit": "grams"}])
+    second = sql_repository.version("alex")
+    assert len({empty, first, second}) == 3
+    # The cached copy is not served once the pantry changed
+    assert sql_repository.list_items("alex")[0]["quantity"] == "200"
+
+    assert sql_repository.delete("alex", ["Rice"]) == 1
+    assert sql_repository.version("alex") != second
+    assert sql_repository.list_items("alex") == []
+
+
+def test_sql_repository_upserts_without_on_conflict(sql_repository, monkeypatch):
+    # Databases without ON CONFLICT update existing rows by primary key instead
+    monkeypatch.setattr(pantry_store, "upsert_statement", lambda dialect: None)
+    sql_repository.upsert("alex", [{"name": "oats", "quantity": 100, "unit": "grams"}])
+    sql_repository.upsert("alex", [{"name": "oats", "quantity": 150, "unit": "grams"},
+                                   {"name": "milk", "quantity": 1, "unit": "l"}])
+    assert sql_repository.list_items("alex") == [
+        {"name": "milk", "quantity": "1", "unit": "l"},
+        {"name": "oats", "quantity": "150", "unit": "grams"},
+    ]
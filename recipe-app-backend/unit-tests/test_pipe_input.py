@@ -0,0 +1,75 @@
+import sys
+import os
+import io
+import csv
+import json
+from fastapi.testclient import TestClient
+
+# Add the parent directory to the sys.path to ensure the input scripts can be imported
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import routes.ingredients as ingredients
+from routes.ingredients import router
+from pipe_a_text_into_csv import write_piped_csv
+from services.ingredient_input import parse_quantity, validate_batch, validate_entry
+from services.pantry_store import CsvPantryRepository
+
+client = TestClient(router)
+
+
+def test_validate_batch_reports_the_first_failing_field():
+    valid, errors = validate_batch([
+        "Tomatoes, 1000, Grams\n", "\n", "eggs,+3,pieces", "bad1, 1, grams", "rice, 2.5, cups",
+        "oats, 0, grams", "milk, 20000, ml", "tofu, 3, parsecs", "a,b", "flour, 1 1/2, cups", "lime, x, pieces",
+        "oat milk, 8, Fl Oz", "cheese, 1, es",
+    ], first_line=10)
+    assert list(valid.itertuples(index=False, name=None)) == [
+        ("tomatoes", 1000, "grams"), ("eggs", 3, "pieces"), ("rice", 2.5, "cups"), ("flour", 1.5, "cups"),
+        ("oat milk", 8, "fl oz"),
+    ]
+    assert list(zip(errors["line"], errors["field"])) == [
+        (13, "ingredient"), (15, "quantity"), (16, "quantity"), (17, "unit"), (18, "format"), (20, "quantity"), (22, "unit"),
+    ]
+
+
+def test_validate_entry_accepts_fractions_and_unit_spellings():
+    assert parse_quantity("3/4") == 0.75 and parse_quantity("1 1/2") == 1.5 and parse_quantity("1/0") is None
+    assert validate_entry("Olive Oil, 2, Tbsp") == (("olive oil", 2.0, "tbsp"), "", "")
+    assert validate_entry("salt, 1/2, handful")[1] == "unit"
+    assert validate_entry("salt, -1, g")[1:] == ("quantity", "Quantity must be a positive number")
+
+
+def test_write_piped_csv_streams_chunks_and_error_report(tmp_path):
+    output = tmp_path / "ingredients.csv"
+    report = tmp_path / "errors.csv"
+    stream = io.StringIO("Ingredient,Quantity,Unit\ntomatoes, 500, grams\nrice, x, grams\nEggs, 12, pieces\nmilk, 0.5, l\nrice, 1234.5678, g\n")
+
+    summary = write_piped_csv(str(output), str(report), quiet=True, chunk_lines=2, stream=stream)
+    assert summary["lines"] == 6 and summary["accepted"] == 4 and summary["rejected"] == 1
+    with open(output, newline="") as f:
+        assert list(csv.reader(f)) == [
+            ["Ingredient", "Quantity", "Unit"], ["tomatoes", "500", "grams"], ["eggs", "12", "pieces"], ["milk", "0.5", "l"],
+            ["rice", "1234.5678", "g"],  # Quantities are written exactly
+        ]
+    with open(report, newline="") as f:
+        assert list(csv.DictReader(f))[0]["line"] == "3"
+
+
+def test_bulk_endpoint_streams_results_per_chunk(tmp_path, monkeypatch):
+    repository = CsvPantryRepository(str(tmp_path / "pantry.csv"))
+    monkeypatch.setattr(ingredients, "get_pantry_repository", lambda: repository)
+    monkeypatch.setattr(ingredients, "CHUNK_LINES", 2)
+
+    body = "Ingredient,Quantity,Unit\nTomatoes, 500, grams\nrice, 1 1/2, cups\nbad1, 1, g\neggs, 12, pieces"
+    response = client.post("/ingredients/bulk?user_id=alex", content=body)
+    assert response.status_code == 200
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [result["lines"] for result in results[:-1]] == [2, 2, 1]
+    assert results[1]["errors"] == [{"line": 4, "input": "bad1, 1, g", "field": "ingredient",
+                                     "error": results[1]["errors"][0]["error"]}]
+    assert results[-1] == {"summary": {"lines": 5, "accepted": 3, "rejected": 1}}
+    assert repository.list_items("alex") == [
+        {"name": "tomato", "quantity": "500", "unit": "grams"},
+        {"name": "rice", "quantity": "1.5", "unit": "cups"},
+        {"name": "egg", "quantity": "12", "unit": "pieces"},
+    ]
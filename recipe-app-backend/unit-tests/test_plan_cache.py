@@ -0,0 +1,67 @@
+import sys
+import os
+
+# Add the parent directory to the sys.path to ensure services can be imported
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.plan_cache import PlanCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_hits_misses_and_lru_eviction():
+    cache = PlanCache(max_entries=2, ttl=60)
+    assert cache.get(("alex", "vegan")) is None
+
+    cache.put(("alex", "vegan"), {"plan": 1})
+    cache.put(("sam", "keto"), {"plan": 2})
+    assert cache.get(("alex", "vegan")) == {"plan": 1}
+
+    # "sam" is now the least recently used entry
+    cache.put(("kim", "paleo"), {"plan": 3})
+    assert cache.get(("sam", "keto")) is None
+    assert cache.get(("alex", "vegan")) == {"plan": 1}
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (2, 2, 2)
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = PlanCache(ttl=10, clock=clock)
+    cache.put(("alex", "vegan"), {"plan": 1})
+
+    clock.now = 9.9
+    assert cache.get(("alex", "vegan")) is not None
+    clock.now = 10.0
+    assert cache.get(("alex", "vegan")) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_cached_values_are_copies():
+    cache = PlanCache()
+    value = {"meal_plan": {"Monday": {}}}
+    cache.put(("alex",), value)
+    value["meal_plan"]["Tuesday"] = {}
+
+    cached = cache.get(("alex",))
+    cached["meal_plan"].clear()
+    assert cache.get(("alex",)) == {"meal_plan": {"Monday": {}}}
+
+
+def test_invalidate_one_user_or_everyone():
+    cache = PlanCache()
+    cache.put(("alex", "vegan"), 1)
+    cache.put(("alex", "keto"), 2)
+    cache.put(("sam", "keto"), 3)
+
+    assert cache.invalidate("alex") == 2
+    assert cache.get(("sam", "keto")) == 3
+    assert cache.invalidate() == 1
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,92 @@
+import sys
+import os
+import csv
+import json
+import pytest
+
+# Add the parent directory to the sys.path to ensure services can be imported
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import services.plan_store as plan_store
+from services.plan_store import PlanExporter, apply_grocery_delta, export_paths, load_saved_plan
+from services.user_store import JsonUserRepository
+
+MEAL_PLAN = {"Monday": {"Breakfast": {"name": "Oatmeal", "portions": 1}}}
+GROCERY_LIST = [
+    {"ingredient": "oats", "missing_amount": 80.0, "unit": "grams"},
+    {"ingredient": "milk", "missing_amount": 250.5, "unit": "grams"},
+]
+
+
+def saved_plan(revision, meal_plan=MEAL_PLAN, grocery_list=GROCERY_LIST):
+    return {"inputs": ["default", "vegan"], "revision": revision, "meal_plan": meal_plan, "grocery_list": grocery_list}
+
+
+def test_plans_are_read_from_the_user_repository(tmp_path):
+    path = tmp_path / "user_data.json"
+    path.write_text(json.dumps({"users": [
+        {"name": "Alex", "dietaryGoal": "vegan", "currentMealPlan": saved_plan(0)},
+        {"id": "sam", "name": "Sam", "dietaryGoal": "keto", "currentMealPlan": {}},
+    ]}))
+    repository = JsonUserRepository(str(path))
+    assert load_saved_plan(None, repository)["grocery_list"] == GROCERY_LIST
+    assert load_saved_plan("sam", repository) is None  # No plan yet
+    assert load_saved_plan("kim", repository) is None
+
+
+def test_apply_grocery_delta():
+    updated = apply_grocery_delta(GROCERY_LIST, [
+        {"ingredient": "oats", "missing_amount": 0.0, "change": -80.0, "unit": "grams"},
+        {"ingredient": "rice", "missing_amount": 120.0, "change": 120.0, "unit": "grams"},
+    ])
+    assert [(item["ingredient"], item["missing_amount"]) for item in updated] == [("milk", 250.5), ("rice", 120.0)]
+
+
+def test_export_writes_each_revision_once(tmp_path):
+    path = tmp_path / "user_data.json"
+    path.write_text(json.dumps({"users": [
+        {"name": "Alex", "dietaryGoal": "vegan", "currentMealPlan": saved_plan(0)},
+        {"id": "a/b", "name": "Sam", "dietaryGoal": "vegan", "currentMealPlan": saved_plan(0, grocery_list=[])},
+    ]}))
+    repository = JsonUserRepository(str(path))
+    exporter = PlanExporter(str(tmp_path), repository)
+    assert exporter.export()
+    assert not exporter.export()
+
+    paths = export_paths("default", str(tmp_path))
+    with open(paths["grocery_csv"], newline="", encoding="utf-8") as f:
+        assert list(csv.DictReader(f)) == [
+            {"ingredient": "oats", "missing_amount": "80", "unit": "grams"},
+            {"ingredient": "milk", "missing_amount": "250.5", "unit": "grams"},
+        ]
+    with open(paths["meal_plan"], encoding="utf-8") as f:
+        assert f.read().startswith("Monday:\n  Breakfast: {'name': 'Oatmeal'")
+
+    # A swap saves a new revision, which is exported again
+    repository.save({"name": "Alex", "dietaryGoal": "vegan", "currentMealPlan": saved_plan(1, grocery_list=[])})
+    assert exporter.export()
+    with open(paths["grocery_txt"], encoding="utf-8") as f:
+        assert f.read() == ""
+
+    assert exporter.export("a/b")
+    assert os.path.exists(tmp_path / "grocery_list.a_b.csv")
+
+
+def test_failed_export_is_retried(tmp_path, monkeypatch):
+    path = tmp_path / "user_data.json"
+    path.write_text(json.dumps({"users": [{"name": "Alex", "dietaryGoal": "vegan", "currentMealPlan": saved_plan(0)}]}))
+    exporter = PlanExporter(str(tmp_path), JsonUserRepository(str(path)))
+
+    write_atomic = plan_store._write_atomic
+    def fail_on_csv(path, lines, as_csv=False):
+        if as_csv:
+            raise OSError("No space left on device")
+        write_atomic(path, lines, as_csv)
+
+    monkeypatch.setattr(plan_store, "_write_atomic", fail_on_csv)
+    with pytest.raises(OSError):
+        exporter.export()
+
+    monkeypatch.setattr(plan_store, "_write_atomic", write_atomic)
+    assert exporter.export()
+    assert os.path.exists(export_paths("default", str(tmp_path))["grocery_csv"])
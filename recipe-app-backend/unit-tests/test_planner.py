@@ -0,0 +1,79 @@
+import sys
+import os
+import numpy as np
+import pytest
+
+# Add the parent directory to the sys.path to ensure services can be imported
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.catalog import get_catalog
+from services.planner import PlannerError, plan_meals, swap_meal
+
+
+@pytest.fixture
+def snapshot():
+    return get_catalog().snapshot()
+
+
+def test_plan_meets_daily_constraints(snapshot):
+    nutrition = snapshot.nutrition
+    plan = plan_meals(nutrition, "vegan", max_calories=2000, protein_floor=48, seed=7)
+
+    assert plan.rows.shape == (7, 3)
+    assert plan.status in ("solved", "time_limit")
+    assert set(nutrition.diet_codes[plan.rows.ravel()]) == {nutrition.diets.index("vegan")}
+    for day in range(7):
+        totals = nutrition.totals(plan.rows[day], plan.portions[day])
+        assert totals[0] <= 2000
+        assert totals[1] >= 48
+        # No recipe is served twice on the same day
+        assert len(set(plan.rows[day])) == 3
+
+
+def test_plan_is_deterministic_for_a_seed(snapshot):
+    first = plan_meals(snapshot.nutrition, "keto", max_calories=2800, protein_floor=96, seed=3)
+    second = plan_meals(snapshot.nutrition, "keto", max_calories=2800, protein_floor=96, seed=3)
+    assert np.array_equal(first.rows, second.rows)
+    assert np.array_equal(first.portions, second.portions)
+
+
+def test_plan_prefers_pantry_covered_recipes(snapshot):
+    nutrition = snapshot.nutrition
+    vegan_rows = nutrition.diet_rows("vegan")
+    coverage = np.zeros(len(nutrition))
+    coverage[vegan_rows[:3]] = 1.0
+
+    plan = plan_meals(nutrition, "vegan", max_calories=2000, protein_floor=48, coverage=coverage, seed=1)
+    assert set(vegan_rows[:3]) <= set(plan.rows.ravel())
+
+
+def test_infeasible_goals_raise(snapshot):
+    with pytest.raises(PlannerError):
+        plan_meals(snapshot.nutrition, "vegan", max_calories=500, protein_floor=48)
+
+    with pytest.raises(PlannerError):
+        plan_meals(snapshot.nutrition, "carnivore", max_calories=2000, protein_floor=48)
+
+
+def test_swap_keeps_the_day_within_budget(snapshot):
+    nutrition = snapshot.nutrition
+    plan = plan_meals(nutrition, "vegan", max_calories=2000, protein_floor=48, seed=7)
+    rows, portions = plan.rows[0], plan.portions[0]
+
+    choice = swap_meal(nutrition, "vegan", 2000, 48, rows, portions, slot=1, week_rows=plan.rows.ravel())
+    assert choice.row not in rows
+    day_rows = rows.copy()
+    day_portions = portions.copy()
+    day_rows[1], day_portions[1] = choice.row, choice.portions
+    totals = nutrition.totals(day_rows, day_portions)
+    assert totals[0] <= 2000
+    assert totals[1] >= 48
+
+    # A recipe already served that day cannot be swapped in
+    with pytest.raises(PlannerError):
+        swap_meal(nutrition, "vegan", 2000, 48, rows, portions, slot=1, week_rows=plan.rows.ravel(), recipe_row=int(rows[0]))
+
+    # Nor can a recipe of another diet
+    keto = int(nutrition.diet_rows("keto")[0])
+    with pytest.raises(PlannerError, match="not a vegan recipe"):
+        swap_meal(nutrition, "vegan", 2000, 48, rows, portions, slot=1, week_rows=plan.rows.ravel(), recipe_row=keto)
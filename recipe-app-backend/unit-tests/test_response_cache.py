@@ -0,0 +1,62 @@
+import sys
+import os
+
+# Add the parent directory to the sys.path to ensure RecipeAgent can be imported
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from RecipeAgent.response_cache import ResponseCache, normalize_message
+
+RESPONSE = {"reply": "Pasta", "reasoning": None, "data": None, "function": None}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_normalized_messages_share_an_entry():
+    assert normalize_message("What's for dinner, Tuesday?") == "what is for dinner tuesday"
+
+    cache = ResponseCache()
+    cache.put("What's for dinner Tuesday?", [], "v1", RESPONSE)
+    assert cache.get("what is for dinner tuesday", [], "v1") == RESPONSE
+    assert cache.stats()["hits"] == 1
+
+
+def test_entries_are_tied_to_plan_version_and_history():
+    cache = ResponseCache()
+    cache.put("What's for dinner Tuesday?", [], "v1", RESPONSE)
+
+    history = [{"role": "user", "content": "I am vegan"}]
+    assert cache.get("What's for dinner Tuesday?", history, "v1") is None
+    assert cache.get("What's for dinner Tuesday?", [], "v2") is None
+    # The stale entry is dropped once the plan changed
+    assert cache.get("What's for dinner Tuesday?", [], "v1") is None
+
+
+def test_ttl_and_size_bound():
+    clock = FakeClock()
+    cache = ResponseCache(max_entries=2, ttl=10, clock=clock)
+    cache.put("a", [], "v1", RESPONSE)
+    cache.put("b", [], "v1", RESPONSE)
+    cache.put("c", [], "v1", RESPONSE)
+    assert cache.get("a", [], "v1") is None
+    assert cache.stats()["size"] == 2
+
+    clock.now = 10
+    assert cache.get("b", [], "v1") is None
+
+
+def test_semantic_tier_matches_rephrasings_but_respects_guard_words():
+    cache = ResponseCache(semantic=True)
+    cache.put("Show my meal plan", [], "v1", RESPONSE)
+    cache.put("What is for dinner on Tuesday?", [], "v1", RESPONSE)
+
+    assert cache.get("show me my meal plan", [], "v1") == RESPONSE
+    assert cache.get("What is for dinner on Wednesday?", [], "v1") is None
+    assert cache.get("How much protein is in tofu?", [], "v1") is None
+    assert cache.get("show me my meal plan", [], "v2") is None
+    assert cache.stats()["semantic_hits"] == 1
@@ -0,0 +1,65 @@
+import sys
+import os
+import time
+import asyncio
+
+# Add the parent directory to the sys.path to ensure routes can be imported
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from RecipeAgent.llm import ToolCall
+from RecipeAgent.tools import ToolRegistry
+
+registry = ToolRegistry()
+
+
+@registry.register(description="Sleep, then echo the value.", timeout=1)
+def slow_echo(value, delay=0.2):
+    time.sleep(delay)
+    return value
+
+
+@registry.register(description="Always fails.")
+def broken():
+    raise ValueError("boom")
+
+
+def call(name, arguments="{}", index=0):
+    return ToolCall(id=f"call_{index}", name=name, arguments=arguments)
+
+
+def test_specs_list_registered_tools():
+    names = [spec["function"]["name"] for spec in registry.specs()]
+    assert names == ["slow_echo", "broken"]
+    assert "slow_echo" in registry
+
+
+def test_tool_calls_run_concurrently():
+    calls = [call("slow_echo", f'{{"value": {i}}}', i) for i in range(4)]
+    started = time.perf_counter()
+    results = registry.run(calls)
+    elapsed = time.perf_counter() - started
+
+    assert [result.data for result in results] == [0, 1, 2, 3]
+    assert elapsed < 0.6  # Four 0.2s calls, not run one after another
+
+
+def test_errors_become_results():
+    results = registry.run([
+        call("broken"),
+        call("missing", index=1),
+        call("slow_echo", '{"value": 1, "delay": 1.5}', 2),
+        call("slow_echo", '{"value": 2}', 3),
+    ])
+    assert [result.ok for result in results] == [False, False, False, True]
+    assert results[0].error == "boom"
+    assert results[1].error == "Unknown tool 'missing'"
+    assert "timed out" in results[2].error
+    assert results[3].data == 2
+
+
+def test_result_message_answers_the_call():
+    result = asyncio.run(registry.execute(call("broken", index=7)))
+    message = result.to_message()
+    assert message["role"] == "tool"
+    assert message["tool_call_id"] == "call_7"
+    assert '"error":"boom"' in message["content"]
@@ -0,0 +1,45 @@
+import sys
+import os
+import numpy as np
+import pytest
+
+# Add the parent directory to the sys.path to ensure services can be imported
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ingredient_registry import IngredientRegistry
+from services.units import ConversionTable, UnknownUnitError, convert_to_grams, normalize_unit, unit_codes
+
+
+def test_unit_spellings():
+    assert normalize_unit("grams") == "g"
+    assert normalize_unit("Tablespoons") == "tbsp"
+    assert normalize_unit("cups") == "cup"
+    assert normalize_unit("pieces") == "piece"
+    assert normalize_unit("lbs") == "lb"
+    assert normalize_unit("handful") is None
+    assert normalize_unit("") is None
+    assert normalize_unit("s") is None and normalize_unit("es") is None
+
+
+def test_ingredient_specific_conversions():
+    assert convert_to_grams(500, "grams", "rice") == 500
+    assert convert_to_grams(1, "kg", "rice") == 1000
+    assert convert_to_grams(3, "pieces", "eggs") == 150
+    assert convert_to_grams(1, "l", "milk") == pytest.approx(1030)
+    assert convert_to_grams(1, "cup", "flour") == pytest.approx(127.2)
+    # Volumes of unknown ingredients weigh like water
+    assert convert_to_grams(250, "ml", "stock") == 250
+
+
+def test_unknown_unit_is_an_error():
+    with pytest.raises(UnknownUnitError):
+        convert_to_grams(2, "handfuls", "spinach")
+
+
+def test_vectorized_conversion():
+    registry = IngredientRegistry()
+    table = ConversionTable(registry)
+    ids = registry.intern_all(["eggs", "olive oil", "rice", "spinach"])
+    grams = table.to_grams(np.array([2, 2, 300, 1]), ids, unit_codes(["pieces", "tbsp", "g", "bunch"]))
+    assert grams[:3] == pytest.approx([100.0, 2 * 14.7868 * 0.91, 300.0])
+    assert np.isnan(grams[3])
@@ -0,0 +1,36 @@
+import sys
+import os
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add the parent directory to the sys.path to ensure scripts can be imported
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.upload_ingredients import upload, validate_chunk
+from services.pantry_store import SqlPantryRepository
+
+
+def test_validate_chunk_skips_invalid_rows():
+    chunk = pd.DataFrame({
+        "Ingredient": ["Tomatoes", "", "rice", "tofu", "tomato", "oats"],
+        "Quantity": ["100", "5", "abc", "-1", "250", "1.5"],
+        "Unit": ["grams", "grams", "grams", "grams", "g", "parsecs"],
+    })
+    rows, invalid = validate_chunk(chunk)
+    assert invalid == 4
+    assert rows.to_dict("records") == [{"name": "tomato", "quantity": 250.0, "unit": "g"}]
+
+
+def test_upload_streams_chunks_and_upserts(tmp_path):
+    path = tmp_path / "ingredients.csv"
+    path.write_text("Ingredient,Quantity,Unit\nrice,500,grams\nEggs,12,pieces\nrice,200,grams\nbad,x,grams\n")
+    engine = create_engine(f"sqlite:///{tmp_path / 'pantry.db'}")
+
+    read, loaded, skipped, _ = upload(str(path), "alex", engine, chunk_size=2, quiet=True)
+    assert (read, loaded, skipped) == (4, 3, 1)
+    # The later chunk's rice replaced the earlier one
+    assert SqlPantryRepository(sessionmaker(bind=engine)).list_items("alex") == [
+        {"name": "egg", "quantity": "12", "unit": "pieces"},
+        {"name": "rice", "quantity": "200", "unit": "grams"},
+    ]
@@ -0,0 +1,73 @@
+import sys
+import os
+import json
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add the parent directory to the sys.path to ensure services can be imported
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import Base
+from models import User
+from services.user_store import JsonUserRepository, SqlUserRepository
+
+
+@pytest.fixture
+def json_repository(tmp_path):
+    path = tmp_path / "user_data.json"
+    path.write_text(json.dumps({"users": [{"name": "Alex", "dietaryGoal": "vegan", "currentMealPlan": {}}]}))
+    return JsonUserRepository(str(path))
+
+
+@pytest.fixture
+def sql_repository():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine, tables=[User.__table__])
+    return SqlUserRepository(sessionmaker(bind=engine))
+
+
+def test_json_repository_reads_and_updates_default_user(json_repository):
+    assert json_repository.get_default()["name"] == "Alex"
+    assert json_repository.get("Alex")["dietaryGoal"] == "vegan"
+
+    json_repository.save({"name": "Sam", "dietaryGoal": "keto", "currentMealPlan": {}})
+    assert json_repository.get_default()["name"] == "Sam"
+    assert len(json_repository.list_users()) == 1
+
+
+def test_json_repository_concurrent_saves_are_not_lost(json_repository):
+    def save(i):
+        json_repository.save({"name": f"user-{i}", "dietaryGoal": "vegan", "currentMealPlan": {}}, f"user-{i}")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(save, range(40)))
+
+    ids = {user.get("id") for user in json_repository.list_users()}
+    assert {f"user-{i}" for i in range(40)} <= ids
+
+
+def test_json_repository_missing_file(tmp_path):
+    repository = JsonUserRepository(str(tmp_path / "missing.json"))
+    with pytest.raises(FileNotFoundError):
+        repository.get_default()
+
+    repository.save({"name": "Alex", "dietaryGoal": "vegan", "currentMealPlan": {}})
+    assert repository.get_default()["name"] == "Alex"
+
+
+def test_sql_repository_round_trip(sql_repository):
+    assert sql_repository.get_default() is None
+
+    sql_repository.save({"name": "Alex", "dietaryGoal": "vegan"})
+    sql_repository.save({"name": "Sam", "dietaryGoal": "keto"}, "sam")
+    sql_repository.save({"name": "Sam", "dietaryGoal": "paleo"}, "sam")
+
+    assert sql_repository.get_default()["name"] == "Alex"
+    assert sql_repository.get("sam")["dietaryGoal"] == "paleo"
+    assert sql_repository.get("nobody") is None
+    assert len(sql_repository.list_users()) == 2